@@ -0,0 +1 @@
+"""har_minimizer 的本地基准测试脚本。"""
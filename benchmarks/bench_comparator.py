@@ -0,0 +1,114 @@
+"""比较器微基准：惰性短路求值与逐项全部求值的单次比较耗时。
+
+构造带大量关键字的大响应正文，在几种典型场景下分别计时当前的
+``ResponseComparator.equivalent``（含接收时的特征提取）与等价的全部求值实现：
+
+    python -m benchmarks.bench_comparator --body-bytes 1000000 --tokens 40 --iterations 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import time
+from typing import Callable, Dict, List
+
+from har_minimizer.comparator import ResponseComparator
+from har_minimizer.config import ComparatorConfig
+from har_minimizer.models import ResponseSnapshot
+
+
+class _EagerComparator:
+    """改造前的实现：先计算全部检查，再按 AND/OR 合并。"""
+
+    def __init__(self, config: ComparatorConfig):
+        self.config = config
+        self.need_all = [token.encode("utf-8") for token in config.need_all]
+        self.need_any = [token.encode("utf-8") for token in config.need_any]
+        self.regex = [re.compile(expr.encode("utf-8"), re.MULTILINE) for expr in config.regex]
+
+    def equivalent(self, baseline: ResponseSnapshot, candidate: ResponseSnapshot) -> bool:
+        config = self.config
+        body = candidate.body or b""
+        checks = [
+            (config.status_code, baseline.status_code == candidate.status_code),
+            (config.length_check, abs(baseline.length - candidate.length) / baseline.length <= config.length_tolerance),
+            (bool(self.need_all), all(token in body for token in self.need_all)),
+            (bool(self.need_any), any(token in body for token in self.need_any)),
+            (bool(self.regex), all(pattern.search(body) for pattern in self.regex)),
+        ]
+        active = [result for enabled, result in checks if enabled]
+        if not active:
+            return True
+        if config.logic.upper() == "OR":
+            return any(active)
+        return all(active)
+
+
+def _snapshot(status: int, body: bytes) -> ResponseSnapshot:
+    return ResponseSnapshot(status_code=status, body=body, error=None, elapsed=0.0)
+
+
+def _time(func: Callable[[], bool], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def run(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    rng = random.Random(args.seed)
+    filler = bytes(rng.choice(b"abcdefghijklmnopqrstuvwxyz0123456789 {}:,") for _ in range(args.body_bytes))
+    tokens: List[str] = [f"marker-{rng.randrange(1 << 30):x}-{i}" for i in range(args.tokens)]
+    present = filler + " ".join(tokens).encode("utf-8")
+    # 缺少最后一个关键字：逐项扫描需要先扫完其余所有关键字才发现
+    missing = filler + " ".join(tokens[:-1]).encode("utf-8")
+    base_config = dict(need_all=tokens, regex=[r'"id":\s*\d+', r"marker-[0-9a-f]+-0\b"], length_check=True, length_tolerance=1.0)
+    scenarios = {
+        # 状态码不同，AND 逻辑下无需扫描正文
+        "status_mismatch_and": (ComparatorConfig(**base_config), _snapshot(403, present)),
+        # 缺少最后一个关键字，AND 逻辑：仍需逐项扫描，与全部求值持平
+        "missing_token_and": (ComparatorConfig(**base_config), _snapshot(200, missing)),
+        # OR 逻辑下状态码一致即可确定结论
+        "status_match_or": (ComparatorConfig(logic="OR", **base_config), _snapshot(200, missing)),
+        # 全部满足：两种实现都需要完整扫描
+        "all_match_and": (ComparatorConfig(**base_config), _snapshot(200, present + b'"id": 1')),
+    }
+    baseline = _snapshot(200, present + b'"id": 1')
+    results: Dict[str, Dict[str, float]] = {}
+    for name, (config, candidate) in scenarios.items():
+        comparator = ResponseComparator(config)
+        eager = _EagerComparator(config)
+        expected = eager.equivalent(baseline, candidate)
+
+        def lazy() -> bool:
+            probe = _snapshot(candidate.status_code, candidate.body)
+            probe.features = comparator.extract_features(probe.body, baseline, probe)
+            return comparator.equivalent(baseline, probe.compact())
+
+        assert lazy() == expected, name
+        eager_us = _time(lambda: eager.equivalent(baseline, candidate), args.iterations)
+        lazy_us = _time(lazy, args.iterations)
+        results[name] = {
+            "verdict": expected,
+            "eager_us": round(eager_us, 1),
+            "lazy_us": round(lazy_us, 1),
+            "speedup": round(eager_us / lazy_us, 2) if lazy_us else None,
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--body-bytes", type=int, default=1_000_000)
+    parser.add_argument("--tokens", type=int, default=40, help="need_all 关键字数量")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps({"params": vars(args), "scenarios": run(args)}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""探测载荷构造微基准：按片段拼接与逐次构造字典再整体序列化的耗时对比。
+
+为大 JSON/表单请求体生成 ddmin 风格的随机保留子集，分别用改造前的实现
+（合并字典后 ``json.dumps``/``urlencode``）与 ``payloads.BodyFragments`` 构造
+请求体，先逐字节校验两者一致，再计时：
+
+    python -m benchmarks.bench_payloads --keys 5000 --probes 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+from urllib.parse import urlencode
+
+from har_minimizer.minimizer import _headers_list_to_dict
+from har_minimizer.payloads import BodyFragments, HeaderFragments
+
+
+def _legacy_body(
+    kind: str, parsed: Dict[str, Any], candidate_keys: Sequence[str], active: Sequence[str], blank_missing: bool
+) -> str:
+    """改造前 ``_minimize_body`` 的 build_body + ``_build_body_text``。"""
+    candidates = set(candidate_keys)
+    merged = {k: v for k, v in parsed.items() if k not in candidates}
+    active_lookup = {k: parsed[k] for k in active}
+    for key, value in active_lookup.items():
+        merged[key] = value
+    if blank_missing:
+        for key in candidate_keys:
+            if key not in active_lookup:
+                merged[key] = ""
+    return json.dumps(merged, separators=(",", ":")) if kind == "json" else urlencode(merged)
+
+
+def _fragment_body(
+    fragments: BodyFragments,
+    fixed: List[str],
+    candidate_keys: Sequence[str],
+    active: Sequence[str],
+    blank_missing: bool,
+) -> str:
+    keep = dict.fromkeys(active)
+    parts = fixed + [fragments.fragment(k) for k in keep]
+    if blank_missing:
+        parts += [fragments.blank(k) for k in candidate_keys if k not in keep]
+    return fragments.join(parts)
+
+
+def _value(rng: random.Random, index: int) -> Any:
+    choice = index % 5
+    if choice == 0:
+        return f"值-{rng.randrange(1 << 30)} &=+/?#\"\\"
+    if choice == 1:
+        return rng.random() * 1e6
+    if choice == 2:
+        return {"nested": [1, None, True, f"x{index}"]}
+    if choice == 3:
+        return rng.randrange(-(1 << 40), 1 << 40)
+    return ""
+
+
+def _time(func: Callable[[], Any], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def run(args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    rng = random.Random(args.seed)
+    json_body = {f"key_{i}_{'é' if i % 7 == 0 else ''}": _value(rng, i) for i in range(args.keys)}
+    form_body = {f"field[{i}]": str(_value(rng, i)) for i in range(args.keys)}
+    headers = [{"name": f"X-Header-{i}", "value": f"v{i}"} for i in range(args.headers)]
+    results: Dict[str, Dict[str, Any]] = {}
+    for kind, parsed in (("json", json_body), ("form", form_body)):
+        keys = list(parsed)
+        candidate_keys = keys[args.keys // 10 :]
+        subsets: List[Tuple[List[str], bool]] = []
+        for _ in range(args.probes):
+            size = rng.randint(0, len(candidate_keys))
+            start = rng.randint(0, len(candidate_keys) - size)
+            subsets.append((candidate_keys[start : start + size], rng.random() < 0.5))
+        fragments = BodyFragments(kind, parsed)
+        candidate_set = set(candidate_keys)
+        fixed = [fragments.fragment(k) for k in keys if k not in candidate_set]
+        for active, blank in subsets:
+            expected = _legacy_body(kind, parsed, candidate_keys, active, blank)
+            assert _fragment_body(fragments, fixed, candidate_keys, active, blank) == expected, kind
+
+        def legacy() -> None:
+            for active, blank in subsets:
+                _legacy_body(kind, parsed, candidate_keys, active, blank)
+
+        def fragmented() -> None:
+            for active, blank in subsets:
+                _fragment_body(fragments, fixed, candidate_keys, active, blank)
+
+        def setup() -> None:
+            BodyFragments(kind, parsed)
+
+        legacy_us = _time(legacy, args.repeat) / len(subsets)
+        fragment_us = _time(fragmented, args.repeat) / len(subsets)
+        results[kind] = {
+            "legacy_us_per_probe": round(legacy_us, 1),
+            "fragments_us_per_probe": round(fragment_us, 1),
+            "fragments_setup_us": round(_time(setup, args.repeat), 1),
+            "speedup": round(legacy_us / fragment_us, 2) if fragment_us else None,
+        }
+
+    fixed_headers, candidates = headers[: args.headers // 4], headers[args.headers // 4 :]
+    header_fragments = HeaderFragments(fixed_headers, candidates)
+    header_subsets = [rng.sample(candidates, rng.randint(0, len(candidates))) for _ in range(args.probes)]
+    for active in header_subsets:
+        assert header_fragments.build(active) == _headers_list_to_dict(fixed_headers + active)
+    legacy_us = _time(lambda: [_headers_list_to_dict(fixed_headers + a) for a in header_subsets], args.repeat)
+    fragment_us = _time(lambda: [header_fragments.build(a) for a in header_subsets], args.repeat)
+    results["headers"] = {
+        "legacy_us_per_probe": round(legacy_us / len(header_subsets), 2),
+        "fragments_us_per_probe": round(fragment_us / len(header_subsets), 2),
+        "speedup": round(legacy_us / fragment_us, 2) if fragment_us else None,
+    }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keys", type=int, default=5000, help="请求体字段数量")
+    parser.add_argument("--headers", type=int, default=40, help="请求头数量")
+    parser.add_argument("--probes", type=int, default=200, help="随机保留子集（探测）数量")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps({"params": vars(args), "results": run(args)}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
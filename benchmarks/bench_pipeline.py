@@ -0,0 +1,166 @@
+"""端到端基准：合成 HAR + 本地 oracle 服务 + 完整的 ``cli.main`` 流程。
+
+生成带已知最小集合的 HAR，启动本地服务（线程或 asyncio，可配置延迟与
+不稳定率），运行一次完整最小化，以 JSON 输出耗时、探测数、峰值内存与
+准确率，便于跨版本对比：
+
+    python -m benchmarks.bench_pipeline --entries 200 --headers 20 --body-keys 10 \\
+        --latency 0.005 --server asyncio --override '{"minimization": {"parallel": true}}' \\
+        --output bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+import yaml
+
+from har_minimizer.cli import main as cli_main
+
+from .oracle_server import AsyncioOracleServer, Oracle, ThreadedOracleServer
+from .synthetic import SyntheticHar, generate_har
+
+
+def _deep_merge(base: Dict[str, Any], extra: Dict[str, Any]) -> Dict[str, Any]:
+    for key, value in extra.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _deep_merge(base[key], value)
+        else:
+            base[key] = value
+    return base
+
+
+def _base_config(workdir: str, concurrency: int) -> Dict[str, Any]:
+    return {
+        "input_har": os.path.join(workdir, "input.har"),
+        "report_path": os.path.join(workdir, "report.json"),
+        "max_rounds_per_request": 100000,
+        "client": {
+            "timeout": 10,
+            "rate_limit": {"requests_per_second": None, "max_concurrent": concurrency},
+        },
+        "minimization": {"headers": {"protected": [], "ignore": ["content-length"]}},
+        "comparator": {"status_code": True},
+    }
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def _accuracy(report_path: str, synthetic: SyntheticHar) -> Dict[str, Any]:
+    """对比报告与 ground truth：精确命中率以及请求头/字段级的精确率与召回率。"""
+    with open(report_path, "r", encoding="utf-8") as handle:
+        report = json.load(handle)
+    exact = kept = relevant = truth_total = 0
+    for item in report:
+        truth = synthetic.truth[item["index"]]
+        headers = {h["name"].lower() for h in item["minimized_headers"]}
+        body = item.get("minimized_body")
+        keys = set(json.loads(body)) if body else set()
+        expected = truth.required_headers | {f"body:{k}" for k in truth.required_body_keys}
+        actual = headers | {f"body:{k}" for k in keys}
+        exact += actual == expected
+        kept += len(actual)
+        relevant += len(actual & expected)
+        truth_total += len(expected)
+    count = len(report)
+    return {
+        "entries": count,
+        "exact_rate": round(exact / count, 4) if count else None,
+        "precision": round(relevant / kept, 4) if kept else None,
+        "recall": round(relevant / truth_total, 4) if truth_total else None,
+    }
+
+
+def run(args: argparse.Namespace, override: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    workdir = tempfile.mkdtemp(prefix="har-bench-")
+    oracle = Oracle({}, latency=args.latency, flakiness=args.flakiness, seed=args.seed)
+    server = AsyncioOracleServer(oracle) if args.server == "asyncio" else ThreadedOracleServer(oracle)
+    base_url = server.start()
+    try:
+        synthetic = generate_har(
+            base_url,
+            entries=args.entries,
+            headers=args.headers,
+            body_keys=args.body_keys,
+            response_bytes=args.response_bytes,
+            required_headers=args.required_headers,
+            required_body_keys=args.required_body_keys,
+            seed=args.seed,
+            templates=args.templates,
+            heavy=args.heavy,
+            heavy_headers=args.heavy_headers,
+        )
+        oracle.endpoints = synthetic.endpoints
+        config = _deep_merge(_base_config(workdir, args.concurrency), override or {})
+        if config.get("report_format") == "jsonl":
+            raise SystemExit("基准需要 JSON 数组报告，请勿覆盖 report_format")
+        synthetic.write(config["input_har"])
+        del synthetic.har
+        config_path = os.path.join(workdir, "config.yaml")
+        with open(config_path, "w", encoding="utf-8") as handle:
+            yaml.safe_dump(config, handle, allow_unicode=True)
+
+        start = time.perf_counter()
+        cli_main(["--config", config_path, "--log-level", args.log_level])
+        wall = time.perf_counter() - start
+    finally:
+        server.stop()
+    return {
+        "params": vars(args),
+        "config_override": override or {},
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "metrics": {
+            "wall_seconds": round(wall, 3),
+            "probes": oracle.hits,
+            "flaky_responses": oracle.flaky_hits,
+            "probes_per_entry": round(oracle.hits / args.entries, 2) if args.entries else None,
+            "probes_per_sec": round(oracle.hits / wall, 1) if wall else None,
+            "peak_rss_mb": _peak_rss_mb(),
+            "accuracy": _accuracy(config["report_path"], synthetic),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100)
+    parser.add_argument("--headers", type=int, default=20, help="每个请求的请求头数量")
+    parser.add_argument("--body-keys", type=int, default=10, help="POST 请求体的字段数量")
+    parser.add_argument("--response-bytes", type=int, default=2048)
+    parser.add_argument("--required-headers", type=int, default=2)
+    parser.add_argument("--required-body-keys", type=int, default=2)
+    parser.add_argument("--server", choices=("threaded", "asyncio"), default="threaded")
+    parser.add_argument("--latency", type=float, default=0.0, help="服务端每个请求的固定延迟（秒）")
+    parser.add_argument("--flakiness", type=float, default=0.0, help="服务端返回 503 的概率")
+    parser.add_argument("--concurrency", type=int, default=8, help="client.rate_limit.max_concurrent")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--templates", type=int, help="端点模板数量；同一模板的请求共享必需集合")
+    parser.add_argument("--heavy", type=int, default=0, help="末尾携带大量请求头的条目数")
+    parser.add_argument("--heavy-headers", type=int, default=60, help="大条目的请求头数量")
+    parser.add_argument("--override", default="{}", help="以 JSON 给出的配置覆盖项，按层级合并")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", help="把结果追加写入该 JSONL 文件")
+    args = parser.parse_args()
+
+    result = run(args, json.loads(args.override))
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""对比 requests 与 asyncio 两种后端在相同调用路径下的探测吞吐量。
+
+在本机启动一个带固定延迟的 HTTP/1.1 keep-alive 服务，两种后端分别经过
+同样的两条路径发送相同数量的探测并输出 probes/sec（探测完全相同，因此关闭
+探测缓存）：
+
+- ``send``：``concurrency`` 个线程各自阻塞调用 ``HttpClient.send``，与流水线中
+  每个条目的串行 ddmin 相同（在途探测数等于线程数，即 ``rate_limit.max_concurrent``）；
+- ``send_many``：每批 ``concurrency`` 个探测一次交给 ``HttpClient.send_many``，
+  与并行 ddmin、空闲名额借给运行中条目时相同。
+
+    python -m benchmarks.bench_transport --probes 2000 --latency 0.05 --concurrency 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+from har_minimizer.config import CacheConfig, ClientConfig, RateLimitConfig
+from har_minimizer.http_client import HttpClient
+from har_minimizer.models import RequestData
+
+
+def _make_handler(latency: float, payload: bytes):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _respond(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                self.rfile.read(length)
+            if latency:
+                time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        do_GET = _respond
+        do_POST = _respond
+
+        def log_message(self, format, *args):  # noqa: A002 - 保持基类签名
+            return
+
+    return Handler
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def _request(url: str) -> RequestData:
+    return RequestData(
+        index=0,
+        method="GET",
+        url=url,
+        path="/",
+        query={},
+        headers=[],
+        body_text=None,
+        mime_type=None,
+        raw_entry={},
+    )
+
+
+def _client(backend: str, concurrency: int) -> HttpClient:
+    return HttpClient(
+        ClientConfig(
+            backend=backend,
+            pool_size=concurrency,
+            rate_limit=RateLimitConfig(max_concurrent=concurrency),
+            cache=CacheConfig(enabled=False),
+        )
+    )
+
+
+def _bench_send(client: HttpClient, url: str, probes: int, concurrency: int) -> float:
+    request = _request(url)
+    headers: Dict[str, str] = {"X-Bench": "1"}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: client.send(request, headers, None), range(probes)))
+    elapsed = time.perf_counter() - start
+    _assert_ok(results)
+    return elapsed
+
+
+def _bench_send_many(client: HttpClient, url: str, probes: int, concurrency: int) -> float:
+    request = _request(url)
+    headers: Dict[str, str] = {"X-Bench": "1"}
+    start = time.perf_counter()
+    results = []
+    for offset in range(0, probes, concurrency):
+        batch = min(concurrency, probes - offset)
+        results.extend(client.send_many(request, [(headers, None)] * batch))
+    elapsed = time.perf_counter() - start
+    _assert_ok(results)
+    return elapsed
+
+
+def _assert_ok(results) -> None:
+    failed = [r.error for r in results if not r.ok()]
+    if failed:
+        raise SystemExit(f"{len(failed)} 个探测失败，例如：{failed[0]}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--probes", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.05, help="服务端每个请求的固定延迟（秒）")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--payload-bytes", type=int, default=2048)
+    args = parser.parse_args()
+
+    server = _Server(("127.0.0.1", 0), _make_handler(args.latency, b"x" * args.payload_bytes))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/bench"
+    try:
+        results: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for backend in ("requests", "asyncio"):
+            client = _client(backend, args.concurrency)
+            try:
+                for path, runner in (("send", _bench_send), ("send_many", _bench_send_many)):
+                    elapsed = runner(client, url, args.probes, args.concurrency)
+                    results.setdefault(backend, {})[path] = {
+                        "seconds": round(elapsed, 3),
+                        "probes_per_sec": round(args.probes / elapsed, 1),
+                    }
+            finally:
+                client.close()
+        print(json.dumps({"params": vars(args), "results": results}, indent=2))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""按合成端点的 ground truth 应答探测的本地 HTTP 服务（线程或 asyncio 实现）。"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from .synthetic import EndpointSpec
+
+_REJECT = b'{"error":"denied"}'
+
+
+class Oracle:
+    """判定逻辑与计数，两种服务实现共用。
+
+    ``flakiness`` 为返回 503（带 ``Retry-After: 0``）的概率，用于模拟不稳定的接口。
+    """
+
+    def __init__(self, endpoints: Dict[str, EndpointSpec], latency: float = 0.0, flakiness: float = 0.0, seed: int = 0):
+        self.endpoints = endpoints
+        self.latency = latency
+        self.flakiness = flakiness
+        self.hits = 0
+        self.flaky_hits = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def respond(self, path: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        with self._lock:
+            self.hits += 1
+            flaky = self.flakiness > 0 and self._rng.random() < self.flakiness
+            if flaky:
+                self.flaky_hits += 1
+        if flaky:
+            return 503, {"Retry-After": "0"}, b""
+        spec = self.endpoints.get(path.split("?", 1)[0])
+        if spec is None:
+            return 404, {}, b""
+        if not spec.required_headers <= {name.lower() for name in headers}:
+            return 403, {"Content-Type": "application/json"}, _REJECT
+        if spec.required_body_keys:
+            try:
+                fields = json.loads(body or b"{}")
+            except ValueError:
+                fields = {}
+            if not isinstance(fields, dict) or any(fields.get(key) in (None, "") for key in spec.required_body_keys):
+                return 403, {"Content-Type": "application/json"}, _REJECT
+        return 200, {"Content-Type": "application/json"}, spec.payload
+
+
+class ThreadedOracleServer:
+    """基于 ``ThreadingHTTPServer`` 的 HTTP/1.1 keep-alive 服务。"""
+
+    def __init__(self, oracle: Oracle):
+        self.oracle = oracle
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def start(self) -> str:
+        oracle = self.oracle
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # 响应头与正文分两次写出，关闭 Nagle 以免与客户端的延迟确认叠加出 40ms 停顿
+            disable_nagle_algorithm = True
+
+            def _respond(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                if oracle.latency:
+                    time.sleep(oracle.latency)
+                status, headers, payload = oracle.respond(self.path, dict(self.headers.items()), body)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = _respond
+            do_POST = _respond
+
+            def log_message(self, format, *args):  # noqa: A002 - 保持基类签名
+                return
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        server.daemon_threads = True
+        server.request_queue_size = 1024
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self._server = server
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+class AsyncioOracleServer:
+    """在后台事件循环中运行的最简 HTTP/1.1 服务，延迟用 ``asyncio.sleep`` 模拟，
+    大量并发连接不会占用线程。"""
+
+    def __init__(self, oracle: Oracle):
+        self.oracle = oracle
+        self._loop = asyncio.new_event_loop()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def start(self) -> str:
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        self._server = asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(self._handle, "127.0.0.1", 0, backlog=1024), self._loop
+        ).result()
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    def stop(self) -> None:
+        async def _close() -> None:
+            self._server.close()
+            await self._server.wait_closed()
+
+        if self._server is not None:
+            asyncio.run_coroutine_threadsafe(_close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                _, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip()] = value.strip()
+                length = int(next((v for k, v in headers.items() if k.lower() == "content-length"), 0) or 0)
+                body = await reader.readexactly(length) if length else b""
+                if self.oracle.latency:
+                    await asyncio.sleep(self.oracle.latency)
+                status, response_headers, payload = self.oracle.respond(path, headers, body)
+                head = [f"HTTP/1.1 {status} X"]
+                head += [f"{name}: {value}" for name, value in response_headers.items()]
+                head.append(f"Content-Length: {len(payload)}")
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
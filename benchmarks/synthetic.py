@@ -0,0 +1,113 @@
+"""生成带已知最小集合（ground truth）的合成 HAR。"""
+
+from __future__ import annotations
+
+import json
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+
+@dataclass
+class EndpointSpec:
+    """单个合成端点：必需的请求头与请求体字段，以及成功时的响应。"""
+
+    required_headers: Set[str]
+    required_body_keys: Set[str]
+    payload: bytes = b""
+
+
+@dataclass
+class SyntheticHar:
+    har: Dict
+    # 按请求路径索引，供 oracle 服务判定
+    endpoints: Dict[str, EndpointSpec] = field(default_factory=dict)
+    # 按 entry 索引的 ground truth
+    truth: Dict[int, EndpointSpec] = field(default_factory=dict)
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.har, handle, ensure_ascii=False)
+
+
+def generate_har(
+    base_url: str,
+    entries: int = 100,
+    headers: int = 20,
+    body_keys: int = 10,
+    response_bytes: int = 2048,
+    required_headers: int = 2,
+    required_body_keys: int = 2,
+    seed: int = 0,
+    templates: Optional[int] = None,
+    heavy: int = 0,
+    heavy_headers: int = 60,
+) -> SyntheticHar:
+    """生成 ``entries`` 个请求：偶数下标（或模板号）为 GET，奇数为带 JSON 请求体的 POST。
+
+    每个请求携带 ``headers`` 个请求头，其中随机 ``required_headers`` 个为必需；
+    POST 请求体有 ``body_keys`` 个字段，其中随机 ``required_body_keys`` 个为必需。
+    指定 ``templates`` 时，请求按下标轮流分属这些端点模板（``/bench/t{模板}/{下标}``），
+    同一模板共享必需集合。最后 ``heavy`` 个请求改为携带 ``heavy_headers`` 个请求头，
+    模拟排在末尾、拖长总耗时的大条目。
+    """
+    rng = random.Random(seed)
+    result = SyntheticHar(har={})
+    har_entries: List[Dict] = []
+    header_names = [f"X-Bench-{j}" for j in range(headers)]
+    heavy_names = [f"X-Bench-{j}" for j in range(max(headers, heavy_headers))]
+    key_names = [f"field_{j}" for j in range(body_keys)]
+    shared: Dict[int, Tuple[Set[str], Set[str]]] = {}
+    for index in range(entries):
+        names = heavy_names if index >= entries - heavy else header_names
+        template = index % templates if templates else None
+        path = f"/bench/{index}" if template is None else f"/bench/t{template}/{index}"
+        post = (index if template is None else template) % 2 == 1 and body_keys > 0
+        if template is not None and template in shared:
+            required_h, required_k = shared[template]
+        else:
+            required_h = set(rng.sample(names, min(required_headers, len(names))))
+            required_k = set(rng.sample(key_names, min(required_body_keys, len(key_names)))) if post else set()
+            if template is not None:
+                shared[template] = (required_h, required_k)
+        marker = f'{{"ok":true,"entry":{index},"data":"'.encode("utf-8")
+        payload = marker + b"x" * max(0, response_bytes - len(marker) - 2) + b'"}'
+        spec = EndpointSpec(required_headers={h.lower() for h in required_h}, required_body_keys=required_k, payload=payload)
+        result.endpoints[path] = spec
+        result.truth[index] = spec
+        request: Dict = {
+            "method": "POST" if post else "GET",
+            "url": base_url + path,
+            "httpVersion": "HTTP/1.1",
+            "headers": [{"name": name, "value": f"value-{rng.randrange(1 << 30)}"} for name in names],
+            "queryString": [],
+            "cookies": [],
+            "headersSize": -1,
+            "bodySize": 0,
+        }
+        if post:
+            body = json.dumps({key: f"v{rng.randrange(1000)}" for key in key_names})
+            request["postData"] = {"mimeType": "application/json", "text": body}
+            request["bodySize"] = len(body)
+        har_entries.append(
+            {
+                "startedDateTime": "2024-01-01T00:00:00.000Z",
+                "time": 0,
+                "request": request,
+                "response": {
+                    "status": 200,
+                    "statusText": "OK",
+                    "httpVersion": "HTTP/1.1",
+                    "headers": [{"name": "Content-Type", "value": "application/json"}],
+                    "cookies": [],
+                    "content": {"size": len(payload), "mimeType": "application/json", "text": payload.decode("utf-8")},
+                    "redirectURL": "",
+                    "headersSize": -1,
+                    "bodySize": len(payload),
+                },
+                "cache": {},
+                "timings": {"send": 0, "wait": 0, "receive": 0},
+            }
+        )
+    result.har = {"log": {"version": "1.2", "creator": {"name": "har-minimizer-bench", "version": "1"}, "entries": har_entries}}
+    return result
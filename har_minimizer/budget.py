@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .config import BudgetConfig
+
+logger = logging.getLogger(__name__)
+
+# 阶段规划：（阶段名, 预计所需探测数, 可删除的字节数）
+PhasePlan = Tuple[str, float, float]
+
+
+def expected_probes(candidates: int, max_tests: int) -> float:
+    """候选数为 n 时 ddmin 类算法的粗略探测数估计（n·log2(n)，受单条目预算限制）。"""
+    if candidates <= 0:
+        return 0.0
+    return min(float(max_tests), candidates * math.log2(candidates + 1))
+
+
+def phase_allowance(remaining: int, phases: Sequence[PhasePlan]) -> int:
+    """为 ``phases`` 中的第一个阶段分配探测数，``phases`` 为尚未执行的阶段。
+
+    预算充足时只为后续阶段预留其所需，其余全部交给当前阶段；不足时按各阶段
+    可删除的字节数（边际收益）按比例分配，且不超过当前阶段所需。当前阶段未
+    用完的部分会在后续阶段重新分配时自然流转过去。
+    """
+    if remaining <= 0 or not phases:
+        return max(0, remaining)
+    _, need, weight = phases[0]
+    if sum(plan[1] for plan in phases) <= remaining:
+        return int(remaining - sum(plan[1] for plan in phases[1:]))
+    total_weight = sum(plan[2] for plan in phases)
+    share = remaining * weight / total_weight if total_weight > 0 else remaining / len(phases)
+    return max(1, min(remaining, int(math.ceil(min(share, need)))))
+
+
+class EntryBudget:
+    """单个条目从全局预算领取的额度，按阶段记录分配与实际消耗。"""
+
+    def __init__(self, owner: "ProbeBudget", granted: int):
+        self.owner = owner
+        self.granted = granted
+        self.allowances: Dict[str, int] = {}
+        self.spent: Dict[str, int] = {}
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.granted - sum(self.spent.values()))
+
+    def allow(self, phases: Sequence[PhasePlan]) -> int:
+        allowance = 0 if self.owner.expired() else phase_allowance(self.remaining, phases)
+        self.allowances[phases[0][0]] = allowance
+        return allowance
+
+    def spend(self, phase: str, tests: int) -> None:
+        self.spent[phase] = self.spent.get(phase, 0) + tests
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "granted": self.granted,
+            "allowance": dict(self.allowances),
+            "spent": dict(self.spent),
+            # 截止时间在本条目结束前到达：结果是最后一次通过的状态，未必最小
+            "truncated": self.owner.expired(),
+        }
+
+
+class ProbeBudget:
+    """整次运行共享的探测预算：总探测数和/或截止时间。
+
+    条目开始最小化时按其预计所需领取额度：已知剩余条目数时，按所需占全部剩余
+    条目所需（以已见条目的平均值估计）的比例分配；流式模式下条目总数未知，
+    只受 ``max_rounds_per_request`` 与池中余量限制。条目结束后未用完的额度
+    归还共享池。截止时间过后不再发放额度，进行中的搜索立即中止并保留最后一次
+    通过的状态。
+    基线与最终校验请求不计入预算。
+    """
+
+    def __init__(self, config: BudgetConfig, per_entry: int):
+        self.per_entry = per_entry
+        self.deadline = time.monotonic() + config.deadline_seconds if config.deadline_seconds else None
+        self._lock = threading.Lock()
+        self._pool = config.total_probes
+        self._entries_left: Optional[int] = None
+        self._need_total = 0.0
+        self._need_count = 0
+        self.spent: Dict[str, int] = {}
+        self._expired_logged = False
+
+    def expect(self, entries: int) -> None:
+        """登记（或以负数撤销）尚待处理的条目数，用于按比例分配。"""
+        with self._lock:
+            if self._entries_left is None and entries < 0:
+                return
+            self._entries_left = max(0, (self._entries_left or 0) + entries)
+
+    def expired(self) -> bool:
+        if self.deadline is None or time.monotonic() < self.deadline:
+            return False
+        if not self._expired_logged:
+            self._expired_logged = True
+            logger.warning("已到达运行截止时间，剩余条目不再最小化")
+        return True
+
+    def open(self, need: float) -> EntryBudget:
+        with self._lock:
+            self._need_total += need
+            self._need_count += 1
+            others = 0
+            if self._entries_left is not None:
+                others = max(0, self._entries_left - 1)
+                self._entries_left = others
+            if self.deadline is not None and time.monotonic() >= self.deadline:
+                granted = 0
+            elif self._pool is None:
+                granted = self.per_entry
+            else:
+                average = self._need_total / self._need_count
+                demand = need + average * others
+                share = self._pool * need / demand if demand > 0 else 0
+                granted = max(0, min(self.per_entry, self._pool, int(math.ceil(share))))
+                self._pool -= granted
+        return EntryBudget(self, granted)
+
+    def close(self, entry: EntryBudget) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool += entry.remaining
+            for phase, tests in entry.spent.items():
+                self.spent[phase] = self.spent.get(phase, 0) + tests
+
+    def remaining(self) -> Optional[int]:
+        with self._lock:
+            return self._pool
+
+    def phases(self) -> List[Tuple[str, int]]:
+        with self._lock:
+            return sorted(self.spent.items())
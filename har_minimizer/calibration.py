@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import json
+import math
+from typing import Any, Dict, FrozenSet, Optional, Sequence
+
+from .comparator import FEATURES, ResponseComparator
+from .config import CalibrationConfig
+from .json_shape import JsonFingerprint, ShapeMask, volatile_paths
+from .json_tree import format_path
+from .models import ResponseSnapshot
+
+
+class Calibration:
+    """基线校准结果：按条目推导的长度容差、被屏蔽的检查与 JSON 易变路径。
+
+    ``reason`` 不为 None 时该条目被判定为不确定，不应继续最小化。
+    """
+
+    __slots__ = ("samples", "length_tolerance", "deviation", "masked", "volatile", "reason")
+
+    def __init__(
+        self,
+        samples: int,
+        length_tolerance: float,
+        deviation: float,
+        masked: FrozenSet[str],
+        volatile: Optional[ShapeMask],
+        reason: Optional[str],
+    ):
+        self.samples = samples
+        self.length_tolerance = length_tolerance
+        # 相同请求之间观测到的最大相对长度偏差
+        self.deviation = deviation
+        self.masked = masked
+        self.volatile = volatile
+        self.reason = reason
+
+    @property
+    def nondeterministic(self) -> bool:
+        return self.reason is not None
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "samples": self.samples,
+            "length_deviation": round(self.deviation, 4) if math.isfinite(self.deviation) else None,
+            "length_tolerance": round(self.length_tolerance, 4),
+            "masked_checks": sorted(self.masked),
+            "volatile_paths": sorted(format_path(path) for path in self.volatile or ()),
+            "nondeterministic": self.nondeterministic,
+            "reason": self.reason,
+        }
+
+
+def _deviation(base_length: int, length: int) -> float:
+    if base_length == 0:
+        return 0.0 if length == 0 else float("inf")
+    return abs(base_length - length) / base_length
+
+
+def calibrate(
+    comparator: ResponseComparator,
+    baseline: ResponseSnapshot,
+    samples: Sequence[ResponseSnapshot],
+    config: CalibrationConfig,
+) -> Calibration:
+    """用与基线完全相同的请求的响应 ``samples``（保留正文）校准比较器，结果挂在基线上。
+
+    - 长度容差取配置值与观测最大偏差乘以 ``length_margin`` 中的较大者，超过
+      ``max_length_tolerance`` 时屏蔽长度检查；
+    - 关键字与正则检查在样本之间结论不一致时屏蔽；
+    - JSON 结构检查把样本之间不一致的路径记为易变路径，比较时放宽这些路径；
+    - 状态码不稳定、校准请求失败、全部检查都被屏蔽或校准后仍不能接受全部样本
+      时，判定该条目不确定。
+    """
+    cfg = comparator.config
+    checks = comparator.checks
+    reason: Optional[str] = None
+    failed = [sample for sample in samples if not sample.ok()]
+    samples = [sample for sample in samples if sample.ok()]
+    if failed:
+        reason = f"{len(failed)} 个校准请求失败：{failed[0].error or failed[0].status_code}"
+    statuses = sorted({baseline.status_code} | {sample.status_code for sample in samples})
+    if reason is None and cfg.status_code and len(statuses) > 1:
+        reason = f"相同请求的状态码不稳定：{statuses}"
+
+    masked = set()
+    deviation = max((_deviation(baseline.length, sample.length) for sample in samples), default=0.0)
+    tolerance = max(cfg.length_tolerance, deviation * config.length_margin)
+    if tolerance > config.max_length_tolerance:
+        tolerance = cfg.length_tolerance
+        if cfg.length_check:
+            masked.add("length")
+
+    base_features = comparator.extract_features(baseline.body)
+    for sample in samples:
+        features = comparator.extract_features(sample.body)
+        for index in range(3):
+            if features[index] != base_features[index] and FEATURES[index] in checks:
+                masked.add(FEATURES[index])
+
+    volatile: Optional[ShapeMask] = None
+    expected = comparator.baseline_fingerprint(baseline) if cfg.json_structure else None
+    if expected is not None:
+        volatile = {}
+        for sample in samples:
+            try:
+                tree = json.loads(sample.body or b"")
+            except ValueError:
+                masked.add("json_structure")
+                break
+            volatile_paths(expected.tree, tree, volatile)
+        if volatile.get(()) == "any":
+            masked.add("json_structure")
+        elif volatile:
+            # 存在易变路径时不再使用记号前缀提前判定，改为解析后按掩码逐层比较
+            baseline.fingerprint = JsonFingerprint((), False, expected.tree, volatile)
+
+    if reason is None and checks and all(name in masked for name in checks):
+        reason = "全部比较检查在相同请求之间均不稳定"
+    calibration = Calibration(len(samples) + len(failed), tolerance, deviation, frozenset(masked), volatile, reason)
+    baseline.calibration = calibration
+    if calibration.reason is None:
+        rejected = sum(not comparator.equivalent(baseline, sample) for sample in samples)
+        if rejected:
+            calibration.reason = f"校准后仍有 {rejected} 个相同请求的响应不被接受"
+    return calibration
+
@@ -15,6 +15,9 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--input-har", dest="input_har", help="覆盖配置中的 HAR 输入路径")
     parser.add_argument("--output-har", dest="output_har", help="覆盖配置中的 HAR 输出路径")
     parser.add_argument("--report", dest="report_path", help="覆盖配置中的报告输出路径")
+    parser.add_argument("--journal", dest="journal_path", help="覆盖配置中的运行日志路径（JSONL）")
+    parser.add_argument("--knowledge", dest="knowledge_path", help="覆盖配置中的知识库路径（JSON）")
+    parser.add_argument("--resume", action="store_true", help="从运行日志恢复：跳过已完成条目并重放已记录的探测")
     parser.add_argument("--log-level", default="INFO", help="日志级别")
     return parser
 
@@ -30,6 +33,12 @@ def main(argv: Optional[list[str]] = None) -> int:
         overrides["output_har"] = args.output_har
     if args.report_path:
         overrides["report_path"] = args.report_path
+    if args.journal_path:
+        overrides["journal_path"] = args.journal_path
+    if args.knowledge_path:
+        overrides["knowledge"] = {"path": args.knowledge_path}
+    if args.resume:
+        overrides["resume"] = True
     config = load_config(args.config, overrides=overrides)
     orchestrator = MinimizationOrchestrator(config)
     orchestrator.run()
@@ -1,55 +1,284 @@
 from __future__ import annotations
 
-import math
 import re
-from typing import List
+from typing import Callable, FrozenSet, List, Optional, Tuple
 
 from .config import ComparatorConfig
+from .json_shape import JsonFingerprint, compare_shape, fingerprint
 from .models import ResponseSnapshot
 
+# 正文特征的名称，下标与 ``extract_features`` 返回的元组一致
+FEATURES = ("need_all", "need_any", "regex", "json_structure")
+
 
 class ResponseComparator:
+    """按代价从低到高（状态码、长度、关键字、JSON 结构、正则）惰性比较响应，结论确定后立即返回。
+
+    AND 逻辑下第一个不满足的检查、OR 逻辑下第一个满足的检查即决定结论；
+    关键字与正则在各自的检查内同样短路。
+
+    基线经过校准（``baseline.calibration``，见 ``calibration.py``）时改用其
+    长度容差，并跳过在相同请求之间结论不稳定的检查。
+    """
+
     def __init__(self, config: ComparatorConfig):
         self.config = config
-        self._regex = [re.compile(expr, re.MULTILINE) for expr in config.regex]
+        self._use_or = config.logic.upper() == "OR"
+        # 所有正文检查都直接作用于响应字节，模式只在这里编码/编译一次
+        self._need_all_tokens = list(dict.fromkeys(token.encode("utf-8") for token in config.need_all))
+        self._need_any_tokens = list(dict.fromkeys(token.encode("utf-8") for token in config.need_any))
+        self._regex = [re.compile(expr.encode("utf-8"), re.MULTILINE) for expr in config.regex]
+        self._cheap_checks: List[Tuple[str, Callable[[ResponseSnapshot, ResponseSnapshot], bool]]] = []
+        if config.status_code:
+            self._cheap_checks.append(("status_code", self._status_equal))
+        if config.length_check:
+            self._cheap_checks.append(("length", self._length_within))
+        # （特征下标, 正文扫描函数(基线, 正文)），正则通常最慢，排在最后
+        self._body_scans: List[Tuple[int, Callable[[Optional[ResponseSnapshot], bytes], bool]]] = []
+        if config.need_all:
+            self._body_scans.append((0, self._scan_need_all))
+        if config.need_any:
+            self._body_scans.append((1, self._scan_need_any))
+        if config.json_structure:
+            self._body_scans.append((3, self._scan_structure))
+        if config.regex:
+            self._body_scans.append((2, self._scan_regex))
+
+    @property
+    def checks(self) -> List[str]:
+        """已启用的检查名称，按求值顺序排列。"""
+        return [name for name, _ in self._cheap_checks] + [FEATURES[index] for index, _ in self._body_scans]
 
     def equivalent(self, baseline: ResponseSnapshot, candidate: ResponseSnapshot) -> bool:
         if not baseline.ok() or not candidate.ok():
             return False
-        checks = [
-            (self.config.status_code, self._status_equal(baseline, candidate)),
-            (self.config.length_check, self._length_within(baseline, candidate)),
-            (bool(self.config.need_all), self._need_all(candidate)),
-            (bool(self.config.need_any), self._need_any(candidate)),
-            (bool(self._regex), self._regex_match(candidate)),
-        ]
-        active = [result for enabled, result in checks if enabled]
-        if not active:
+        if not self._cheap_checks and not self._body_scans:
             return True
-        if self.config.logic.upper() == "OR":
-            return any(active)
-        return all(active)
+        masked = _masked(baseline)
+        for name, check in self._cheap_checks:
+            if name not in masked and check(baseline, candidate) is self._use_or:
+                return self._use_or
+        for index, scan in self._body_scans:
+            if FEATURES[index] not in masked and self._body_feature(baseline, candidate, index, scan) is self._use_or:
+                return self._use_or
+        return not self._use_or
 
     def _status_equal(self, base: ResponseSnapshot, cand: ResponseSnapshot) -> bool:
         return base.status_code == cand.status_code
 
     def _length_within(self, base: ResponseSnapshot, cand: ResponseSnapshot) -> bool:
-        if base.length == 0:
-            return cand.length == 0
-        delta = abs(base.length - cand.length) / base.length
-        return delta <= self.config.length_tolerance
+        return self._length_ok(base.length, cand.length, self.length_tolerance(base))
 
-    def _need_all(self, cand: ResponseSnapshot) -> bool:
-        if cand.body is None:
-            return False
-        return all(token in cand.body for token in self.config.need_all)
+    def length_tolerance(self, baseline: ResponseSnapshot) -> float:
+        """相对该基线的长度容差：校准过的基线使用其按条目推导的容差。"""
+        calibration = baseline.calibration
+        return calibration.length_tolerance if calibration is not None else self.config.length_tolerance
 
-    def _need_any(self, cand: ResponseSnapshot) -> bool:
-        if cand.body is None:
-            return False
-        return any(token in cand.body for token in self.config.need_any)
+    @staticmethod
+    def _length_ok(base_length: int, cand_length: int, tolerance: float) -> bool:
+        if base_length == 0:
+            return cand_length == 0
+        delta = abs(base_length - cand_length) / base_length
+        return delta <= tolerance
 
-    def _regex_match(self, cand: ResponseSnapshot) -> bool:
-        if cand.body is None:
-            return False
-        return all(pattern.search(cand.body) for pattern in self._regex)
+    def scanner(
+        self,
+        baseline: ResponseSnapshot,
+        status_code: int,
+        content_length: Optional[int],
+        max_bytes: Optional[int] = None,
+    ) -> "ProbeScanner":
+        return ProbeScanner(self, baseline, status_code, content_length, max_bytes)
+
+    def extract_features(
+        self, body: Optional[bytes], reference: Optional[ResponseSnapshot] = None, candidate: Optional[ResponseSnapshot] = None
+    ) -> Tuple[bool, bool, bool, bool]:
+        """在接收响应时计算正文相关的检查结果：(need_all, need_any, regex, json_structure)。
+
+        给出 ``reference`` 与 ``candidate`` 时按 ``equivalent`` 的顺序惰性求值：
+        结论一经确定，其余特征不再扫描并记为 False，不影响相对该基线的结论。
+        JSON 结构是相对基线的检查，未给出 ``reference`` 时记为 False。
+        """
+        features = [False, False, False, False]
+        if body is None:
+            return tuple(features)
+        if reference is not None and candidate is not None:
+            masked = _masked(reference)
+            if any(
+                name not in masked and check(reference, candidate) is self._use_or for name, check in self._cheap_checks
+            ):
+                return tuple(features)
+            for index, scan in self._body_scans:
+                if FEATURES[index] in masked:
+                    continue
+                features[index] = scan(reference, body)
+                if features[index] is self._use_or:
+                    break
+            return tuple(features)
+        for index, scan in self._body_scans:
+            if index != 3:
+                features[index] = scan(None, body)
+        return tuple(features)
+
+    def _body_feature(
+        self,
+        base: ResponseSnapshot,
+        cand: ResponseSnapshot,
+        index: int,
+        scan: Callable[[Optional[ResponseSnapshot], bytes], bool],
+    ) -> bool:
+        if cand.body is not None:
+            return scan(base, cand.body)
+        if cand.features is not None and index < len(cand.features):
+            return cand.features[index]
+        return False
+
+    def baseline_fingerprint(self, baseline: ResponseSnapshot) -> Optional[JsonFingerprint]:
+        """基线的 JSON 结构指纹，只在首次使用时计算并缓存在基线上。"""
+        if baseline.fingerprint is None:
+            baseline.fingerprint = fingerprint(baseline.body) or False
+        return baseline.fingerprint or None
+
+    def _scan_structure(self, reference: Optional[ResponseSnapshot], body: bytes) -> bool:
+        expected = self.baseline_fingerprint(reference) if reference is not None else None
+        if expected is None:
+            # 基线不是 JSON 时该检查不适用：取 AND/OR 的单位元，不影响其余检查的结论
+            return not self._use_or
+        return bool(compare_shape(expected, body))
+
+    def _scan_need_all(self, reference: Optional[ResponseSnapshot], body: bytes) -> bool:
+        return all(token in body for token in self._need_all_tokens)
+
+    def _scan_need_any(self, reference: Optional[ResponseSnapshot], body: bytes) -> bool:
+        return any(token in body for token in self._need_any_tokens)
+
+    def _scan_regex(self, reference: Optional[ResponseSnapshot], body: bytes) -> bool:
+        return all(pattern.search(body) for pattern in self._regex)
+
+
+def _masked(baseline: ResponseSnapshot) -> FrozenSet[str]:
+    calibration = baseline.calibration
+    return calibration.masked if calibration is not None else frozenset()
+
+
+class ProbeScanner:
+    """流式读取探测响应时增量执行比较检查，结论确定后即可停止读取。
+
+    每项检查处于 True/False/None（尚未确定）三种状态之一；AND 逻辑下任一检查
+    为 False 或全部为 True、OR 逻辑下任一为 True 或全部为 False 时 ``done``
+    为真。提前停止时未确定的正文特征记为 False，不影响已确定的结论。
+    """
+
+    def __init__(
+        self,
+        comparator: ResponseComparator,
+        baseline: ResponseSnapshot,
+        status_code: int,
+        content_length: Optional[int],
+        max_bytes: Optional[int],
+    ):
+        cfg = comparator.config
+        self._comparator = comparator
+        self._use_or = cfg.logic.upper() == "OR"
+        self._content_length = content_length
+        self._baseline_length = baseline.length
+        self._tolerance = comparator.length_tolerance(baseline)
+        self._upper = baseline.length * (1 + self._tolerance)
+        self._masked = _masked(baseline)
+        if max_bytes is not None and content_length is None and cfg.length_check and "length" not in self._masked:
+            # 没有 Content-Length 时长度只能靠读取判定：截断点不低于长度上限，
+            # 截断发生时长度必然已判为不通过，而不是拿截断后的字节数去比较
+            max_bytes = max(max_bytes, int(self._upper) + 1)
+        self._max_bytes = max_bytes
+        self._pending_all = list(comparator._need_all_tokens)
+        self._pending_regex = list(comparator._regex)
+        self._any_found = False
+        self._keep = max((len(t) for t in comparator._need_all_tokens + comparator._need_any_tokens), default=1) - 1
+        self._buffer = bytearray()
+        self._regex_checked = 0
+        self._shape = comparator.baseline_fingerprint(baseline) if cfg.json_structure else None
+        self._shape_checked = 0
+        # 基线不是 JSON 时结构检查不适用，直接取 AND/OR 的单位元
+        self._structure: Optional[bool] = None if self._shape is not None else not self._use_or
+        self._read = 0
+        self._eof = False
+        self.truncated = False
+        self._status = baseline.status_code == status_code
+        self._length: Optional[bool] = None
+        if content_length is not None:
+            self._length = comparator._length_ok(baseline.length, content_length, self._tolerance)
+
+    @property
+    def length(self) -> int:
+        return self._content_length if self._content_length is not None else self._read
+
+    @property
+    def features(self) -> Tuple[bool, bool, bool, bool]:
+        return not self._pending_all, self._any_found, not self._pending_regex, self._structure is True
+
+    @property
+    def done(self) -> bool:
+        return self._eof or self.truncated or self._verdict() is not None
+
+    def feed(self, chunk: bytes) -> None:
+        start = max(0, len(self._buffer) - self._keep)
+        self._buffer += chunk
+        self._read += len(chunk)
+        window = self._buffer[start:]
+        if self._pending_all:
+            self._pending_all = [token for token in self._pending_all if token not in window]
+        if not self._any_found and self._comparator._need_any_tokens:
+            self._any_found = any(token in window for token in self._comparator._need_any_tokens)
+        # 正则可能跨越任意长度，只在缓冲区翻倍时整体重扫，摊还后仍为线性
+        if self._pending_regex and len(self._buffer) >= 2 * self._regex_checked:
+            self._scan_regex()
+        # 结构比较同样在缓冲区翻倍时对已收到的前缀重做，出现第一处差异即可确定
+        if self._structure is None and len(self._buffer) >= 2 * self._shape_checked:
+            self._shape_checked = len(self._buffer)
+            if compare_shape(self._shape, bytes(self._buffer), partial=True) is False:
+                self._structure = False
+        if self._length is None and self._read > self._upper:
+            self._length = False
+        if not self._pending_regex and self._structure is not None:
+            # 无需正则时只保留足以跨块匹配固定字符串的尾部
+            del self._buffer[: max(0, len(self._buffer) - self._keep)]
+        if self._max_bytes is not None and self._read >= self._max_bytes and not self.done:
+            self.truncated = True
+
+    def finish(self) -> None:
+        self._eof = True
+        if self._pending_regex:
+            self._scan_regex()
+        if self._structure is None:
+            self._structure = bool(compare_shape(self._shape, bytes(self._buffer)))
+        if self._length is None:
+            self._length = self._comparator._length_ok(self._baseline_length, self._read, self._tolerance)
+
+    def _scan_regex(self) -> None:
+        self._regex_checked = len(self._buffer)
+        self._pending_regex = [p for p in self._pending_regex if not p.search(self._buffer)]
+
+    def _verdict(self) -> Optional[bool]:
+        cfg = self._comparator.config
+        checks = [
+            ("status_code", cfg.status_code, self._status),
+            ("length", cfg.length_check, self._length),
+            ("need_all", bool(cfg.need_all), True if not self._pending_all else (False if self._eof else None)),
+            ("need_any", bool(cfg.need_any), True if self._any_found else (False if self._eof else None)),
+            ("regex", bool(cfg.regex), True if not self._pending_regex else (False if self._eof else None)),
+            ("json_structure", cfg.json_structure, self._structure),
+        ]
+        states = [state for name, enabled, state in checks if enabled and name not in self._masked]
+        if not states:
+            return True
+        if self._use_or:
+            if any(state is True for state in states):
+                return True
+            if all(state is False for state in states):
+                return False
+        else:
+            if any(state is False for state in states):
+                return False
+            if all(state is True for state in states):
+                return True
+        return None
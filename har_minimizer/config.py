@@ -8,10 +8,37 @@ from typing import Any, Dict, List, Optional, Tuple
 import yaml
 
 
+@dataclass
+class AdaptiveRateConfig:
+    enabled: bool = False
+    min_rps: float = 0.5
+    max_rps: float = 50.0
+    increase: float = 1.0  # 延迟平稳时每秒增加的速率
+    decrease_factor: float = 0.5
+    latency_tolerance: float = 2.0
+    max_retries: int = 3
+    max_backoff: float = 60.0
+
+
 @dataclass
 class RateLimitConfig:
     requests_per_second: Optional[float] = None
     max_concurrent: int = 1
+    per_host: bool = False
+    host_max_concurrent: Optional[int] = None
+    adaptive: AdaptiveRateConfig = field(default_factory=AdaptiveRateConfig)
+
+
+@dataclass
+class CacheConfig:
+    enabled: bool = True
+    max_entries: int = 4096
+
+
+@dataclass
+class ReplayConfig:
+    rules_path: Optional[str] = None
+    har_path: Optional[str] = None  # 默认使用 input_har
 
 
 @dataclass
@@ -20,6 +47,13 @@ class ClientConfig:
     proxies: Dict[str, str] = field(default_factory=dict)
     verify_tls: bool = True
     rate_limit: RateLimitConfig = field(default_factory=RateLimitConfig)
+    backend: str = "requests"  # 可选 requests|asyncio|replay
+    pool_size: int = 100
+    cache: CacheConfig = field(default_factory=CacheConfig)
+    keep_response_bodies: bool = False
+    stream_probes: bool = False
+    max_body_bytes: Optional[int] = None
+    replay: ReplayConfig = field(default_factory=ReplayConfig)
 
 
 @dataclass
@@ -38,13 +72,34 @@ class BodyMinConfig:
     only_keys: List[str] = field(default_factory=list)
     treat_empty_as_absent: bool = True
     try_blank_values: bool = False
+    hierarchical: bool = False
+    max_depth: Optional[int] = None
+
+
+@dataclass
+class QueryMinConfig:
+    enabled: bool = True
+    protected: List[str] = field(default_factory=list)
+    candidate_regex: List[str] = field(default_factory=list)
+
+
+@dataclass
+class GroupingConfig:
+    enabled: bool = False
+    # 额外视为动态 ID 的路径段正则
+    id_patterns: List[str] = field(default_factory=list)
 
 
 @dataclass
 class MinimizationConfig:
     headers: HeaderMinConfig = field(default_factory=HeaderMinConfig)
     body: BodyMinConfig = field(default_factory=BodyMinConfig)
+    query: QueryMinConfig = field(default_factory=QueryMinConfig)
     order: List[str] = field(default_factory=lambda: ["headers", "body"])
+    algorithm: str = "ddmin"  # 可选 ddmin|probdd|binary
+    parallel: bool = False
+    speculate_subsets: bool = False
+    grouping: GroupingConfig = field(default_factory=GroupingConfig)
 
 
 @dataclass
@@ -55,6 +110,8 @@ class ComparatorConfig:
     need_all: List[str] = field(default_factory=list)
     need_any: List[str] = field(default_factory=list)
     regex: List[str] = field(default_factory=list)
+    # 按 JSON 结构（键路径、取值类型、数组元素个数）比较，忽略具体取值
+    json_structure: bool = False
     logic: str = "AND"  # AND 或 OR
 
 
@@ -73,18 +130,69 @@ class ScopeConfig:
     include_regex: List[str] = field(default_factory=list)
 
 
+@dataclass
+class LoaderConfig:
+    streaming: bool = False
+    keep_response_body: bool = False
+
+
+@dataclass
+class BudgetConfig:
+    # 整次运行允许的最小化测试总数（null 表示不限）
+    total_probes: Optional[int] = None
+    # 整次运行的截止时间（秒，null 表示不限）
+    deadline_seconds: Optional[float] = None
+
+
+@dataclass
+class SchedulingConfig:
+    enabled: bool = False
+    # 前瞻窗口：从中挑选预计耗时最长的条目派发
+    lookahead: int = 256
+    # 队列排空后把空闲名额分给在途条目的 ddmin 探测
+    work_stealing: bool = True
+
+
+@dataclass
+class CalibrationConfig:
+    enabled: bool = False
+    # 基线之外再发送的相同请求数
+    samples: int = 3
+    # 推导长度容差时在观测到的最大偏差上乘以的余量
+    length_margin: float = 1.5
+    # 推导出的长度容差超过该值时不再检查长度
+    max_length_tolerance: float = 0.5
+
+
+@dataclass
+class KnowledgeConfig:
+    path: Optional[str] = None
+    # 分区键取 URL 路径的前几段（与主机名组合）
+    prefix_segments: int = 1
+
+
 @dataclass
 class Config:
     input_har: str
     report_path: str = "min_report.json"
     output_har: Optional[str] = None
+    report_format: str = "json"  # json 或 jsonl
+    report_json_path: Optional[str] = None
     filters: FilterConfig = field(default_factory=FilterConfig)
     scope: ScopeConfig = field(default_factory=ScopeConfig)
     comparator: ComparatorConfig = field(default_factory=ComparatorConfig)
     minimization: MinimizationConfig = field(default_factory=MinimizationConfig)
     client: ClientConfig = field(default_factory=ClientConfig)
+    loader: LoaderConfig = field(default_factory=LoaderConfig)
+    knowledge: KnowledgeConfig = field(default_factory=KnowledgeConfig)
+    scheduling: SchedulingConfig = field(default_factory=SchedulingConfig)
+    budget: BudgetConfig = field(default_factory=BudgetConfig)
+    calibration: CalibrationConfig = field(default_factory=CalibrationConfig)
     max_rounds_per_request: int = 200
+    baseline_source: str = "live"  # 可选 live|recorded|recorded-then-verify-on-mismatch
     update_har_metadata: bool = True
+    journal_path: Optional[str] = None
+    resume: bool = False
 
 
 def _load_raw_config(path: str) -> Dict[str, Any]:
@@ -114,17 +222,51 @@ def load_config(path: str, overrides: Optional[Dict[str, Any]] = None) -> Config
     raw = _merge(raw, overrides)
     if "input_har" not in raw:
         raise ValueError("配置文件必须包含 input_har 字段")
+    report_path = os.path.abspath(raw.get("report_path", "min_report.json"))
+    resume = bool(raw.get("resume", False))
+    journal_path = raw.get("journal_path")
+    if resume and not journal_path:
+        journal_path = report_path + ".journal.jsonl"
+    knowledge = raw.get("knowledge") or {}
+    scheduling = raw.get("scheduling") or {}
+    budget = raw.get("budget") or {}
+    calibration = raw.get("calibration") or {}
     return Config(
         input_har=os.path.abspath(raw["input_har"]),
-        report_path=os.path.abspath(raw.get("report_path", "min_report.json")),
+        report_path=report_path,
         output_har=os.path.abspath(raw["output_har"]) if raw.get("output_har") else None,
+        report_format=_parse_report_format(raw.get("report_format", "json")),
+        report_json_path=os.path.abspath(raw["report_json_path"]) if raw.get("report_json_path") else None,
         filters=FilterConfig(**raw.get("filters", {})),
         scope=ScopeConfig(**raw.get("scope", {})),
         comparator=ComparatorConfig(**raw.get("comparator", {})),
         minimization=_build_min_config(raw.get("minimization", {})),
         client=_build_client_config(raw.get("client", {})),
+        loader=LoaderConfig(**raw.get("loader", {})),
+        knowledge=KnowledgeConfig(
+            path=os.path.abspath(knowledge["path"]) if knowledge.get("path") else None,
+            prefix_segments=max(0, int(knowledge.get("prefix_segments", 1))),
+        ),
+        scheduling=SchedulingConfig(
+            enabled=bool(scheduling.get("enabled", False)),
+            lookahead=max(1, int(scheduling.get("lookahead", 256))),
+            work_stealing=bool(scheduling.get("work_stealing", True)),
+        ),
+        budget=BudgetConfig(
+            total_probes=max(0, int(budget["total_probes"])) if budget.get("total_probes") is not None else None,
+            deadline_seconds=float(budget["deadline_seconds"]) if budget.get("deadline_seconds") is not None else None,
+        ),
+        calibration=CalibrationConfig(
+            enabled=bool(calibration.get("enabled", False)),
+            samples=max(1, int(calibration.get("samples", 3))),
+            length_margin=max(1.0, float(calibration.get("length_margin", 1.5))),
+            max_length_tolerance=float(calibration.get("max_length_tolerance", 0.5)),
+        ),
         max_rounds_per_request=int(raw.get("max_rounds_per_request", 200)),
+        baseline_source=_parse_baseline_source(raw.get("baseline_source", "live")),
         update_har_metadata=bool(raw.get("update_har_metadata", True)),
+        journal_path=os.path.abspath(journal_path) if journal_path else None,
+        resume=resume,
     )
 
 
@@ -132,12 +274,20 @@ def _build_min_config(data: Dict[str, Any]) -> MinimizationConfig:
     return MinimizationConfig(
         headers=HeaderMinConfig(**data.get("headers", {})),
         body=BodyMinConfig(**data.get("body", {})),
+        query=QueryMinConfig(**data.get("query", {})),
         order=data.get("order", ["headers", "body"]),
+        algorithm=_parse_algorithm(data.get("algorithm", "ddmin")),
+        parallel=bool(data.get("parallel", False)),
+        speculate_subsets=bool(data.get("speculate_subsets", False)),
+        grouping=GroupingConfig(**data.get("grouping", {})),
     )
 
 
 def _build_client_config(data: Dict[str, Any]) -> ClientConfig:
     rate = data.get("rate_limit", {})
+    adaptive = rate.get("adaptive", {})
+    replay = data.get("replay", {})
+    cache = data.get("cache", {})
     def _to_optional_float(value):
         if value in (None, "", "None", "null", "Null"):
             return None
@@ -149,8 +299,65 @@ def _build_client_config(data: Dict[str, Any]) -> ClientConfig:
         timeout=float(data.get("timeout", 20.0)),
         proxies=data.get("proxies", {}),
         verify_tls=bool(data.get("verify_tls", True)),
+        backend=_parse_backend(data.get("backend", "requests")),
+        pool_size=max(1, int(data.get("pool_size", 100))),
+        keep_response_bodies=bool(data.get("keep_response_bodies", False)),
+        stream_probes=bool(data.get("stream_probes", False)),
+        max_body_bytes=int(data["max_body_bytes"]) if data.get("max_body_bytes") is not None else None,
+        replay=ReplayConfig(
+            rules_path=os.path.abspath(replay["rules_path"]) if replay.get("rules_path") else None,
+            har_path=os.path.abspath(replay["har_path"]) if replay.get("har_path") else None,
+        ),
+        cache=CacheConfig(
+            enabled=bool(cache.get("enabled", True)),
+            max_entries=int(cache.get("max_entries", 4096)),
+        ),
         rate_limit=RateLimitConfig(
             requests_per_second=_to_optional_float(rate.get("requests_per_second")),
             max_concurrent=int(rate.get("max_concurrent", 1)),
+            per_host=bool(rate.get("per_host", False)),
+            host_max_concurrent=(
+                max(1, int(rate["host_max_concurrent"])) if rate.get("host_max_concurrent") is not None else None
+            ),
+            adaptive=AdaptiveRateConfig(
+                enabled=bool(adaptive.get("enabled", False)),
+                min_rps=float(adaptive.get("min_rps", 0.5)),
+                max_rps=float(adaptive.get("max_rps", 50.0)),
+                increase=float(adaptive.get("increase", 1.0)),
+                decrease_factor=float(adaptive.get("decrease_factor", 0.5)),
+                latency_tolerance=float(adaptive.get("latency_tolerance", 2.0)),
+                max_retries=max(0, int(adaptive.get("max_retries", 3))),
+                max_backoff=float(adaptive.get("max_backoff", 60.0)),
+            ),
         ),
     )
+
+
+def _parse_backend(value: Any) -> str:
+    backend = str(value or "requests").lower()
+    if backend not in {"requests", "asyncio", "replay"}:
+        raise ValueError(f"client.backend 仅支持 requests/asyncio/replay，当前值：{value!r}")
+    return backend
+
+
+def _parse_algorithm(value: Any) -> str:
+    algorithm = str(value or "ddmin").lower()
+    if algorithm not in {"ddmin", "probdd", "binary"}:
+        raise ValueError(f"minimization.algorithm 仅支持 ddmin/probdd/binary，当前值：{value!r}")
+    return algorithm
+
+
+def _parse_baseline_source(value: Any) -> str:
+    source = str(value or "live").lower()
+    if source not in {"live", "recorded", "recorded-then-verify-on-mismatch"}:
+        raise ValueError(
+            f"baseline_source 仅支持 live/recorded/recorded-then-verify-on-mismatch，当前值：{value!r}"
+        )
+    return source
+
+
+def _parse_report_format(value: Any) -> str:
+    fmt = str(value or "json").lower()
+    if fmt not in {"json", "jsonl"}:
+        raise ValueError(f"report_format 仅支持 json/jsonl，当前值：{value!r}")
+    return fmt
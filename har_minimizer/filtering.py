@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import logging
 import re
-from typing import Iterable, List, Tuple
+from typing import Iterable, Iterator, List, Tuple
 
 from .config import FilterConfig, ScopeConfig
 from .har_loader import HarEntry
@@ -32,6 +32,26 @@ class RequestFilter:
                 logger.info("已过滤完全一致的请求：%s -> %s", before, len(results))
         return results
 
+    def iter_apply(self, entries: Iterable[HarEntry]) -> Iterator[HarEntry]:
+        """``apply`` 的惰性版本，逐条消费输入，适合流式加载的 HAR。"""
+        seen: set[Tuple] = set()
+        kept = duplicates = 0
+        for entry in entries:
+            if not self._matches_filter(entry):
+                continue
+            if not self._matches_scope(entry):
+                continue
+            if self.config.deduplicate_identical:
+                key = _entry_dedup_key(entry)
+                if key in seen:
+                    duplicates += 1
+                    continue
+                seen.add(key)
+            kept += 1
+            yield entry
+        if duplicates:
+            logger.info("已过滤完全一致的请求：%s -> %s", kept + duplicates, kept)
+
     def _matches_filter(self, entry: HarEntry) -> bool:
         request = entry.request
         cfg = self.config
@@ -64,12 +84,7 @@ class RequestFilter:
         unique: List[HarEntry] = []
         seen: set[Tuple] = set()
         for entry in entries:
-            key = build_dedup_key(
-                method=entry.request.method,
-                url=entry.request.url,
-                query=entry.request.query,
-                body_text=entry.request.body_text,
-            )
+            key = _entry_dedup_key(entry)
             if key in seen:
                 continue
             seen.add(key)
@@ -77,6 +92,15 @@ class RequestFilter:
         return unique
 
 
+def _entry_dedup_key(entry: HarEntry) -> Tuple:
+    return build_dedup_key(
+        method=entry.request.method,
+        url=entry.request.url,
+        query=entry.request.query,
+        body_text=entry.request.body_text,
+    )
+
+
 def build_dedup_key(method: str, url: str, query: dict, body_text: str | None) -> Tuple:
     base_url = url.split("?", 1)[0]
     normalized_query = _normalize_query(query)
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import json
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from .config import GroupingConfig
+from .json_tree import JsonPath, removed_paths, render
+from .models import RequestData
+from .query_string import QueryString
+
+# 常见的动态路径段：纯数字、UUID、长十六进制串与长随机令牌
+_ID_SEGMENT = re.compile(
+    r"^(\d+|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|[0-9a-f]{16,}|[A-Za-z0-9_\-]{24,})$",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class TemplatePlan:
+    """代表请求学到的删除方案，按名称（而非取值）套用到同组的其他请求。"""
+
+    representative: int
+    removed_headers: Set[str] = field(default_factory=set)
+    removed_body: Set[JsonPath] = field(default_factory=set)
+    removed_query: Set[str] = field(default_factory=set)
+
+    def apply_url(self, url: str) -> str:
+        if not self.removed_query:
+            return url
+        return QueryString(url).without(self.removed_query)
+
+    def apply_headers(self, headers: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        return [h for h in headers if h.get("name", "").lower() not in self.removed_headers]
+
+    def apply_body(self, kind: str, body_text: Optional[str], blank_removed: bool) -> Optional[str]:
+        if not self.removed_body or not body_text:
+            return body_text
+        if kind == "json":
+            try:
+                tree = json.loads(body_text)
+            except json.JSONDecodeError:
+                return body_text
+            return json.dumps(render(tree, self.removed_body, blank_removed), separators=(",", ":"))
+        if kind == "form":
+            removed = {path[0] for path in self.removed_body if len(path) == 1}
+            pairs = dict(parse_qsl(body_text, keep_blank_values=True))
+            if blank_removed:
+                return urlencode({k: "" if k in removed else v for k, v in pairs.items()})
+            return urlencode({k: v for k, v in pairs.items() if k not in removed})
+        return body_text
+
+
+def learn_plan(
+    representative: RequestData,
+    kind: str,
+    final_headers: Sequence[Dict[str, str]],
+    final_body: Optional[str],
+    blank_removed: bool,
+    final_url: Optional[str] = None,
+) -> TemplatePlan:
+    kept = {h.get("name", "").lower() for h in final_headers}
+    plan = TemplatePlan(
+        representative=representative.index,
+        removed_headers={h.get("name", "").lower() for h in representative.headers} - kept,
+    )
+    if final_url is not None:
+        kept_params = {param.name for param in QueryString(final_url).params}
+        plan.removed_query = {param.name for param in QueryString(representative.url).params} - kept_params
+    original_body = representative.body_text
+    if not original_body or not final_body or original_body == final_body:
+        return plan
+    if kind == "json":
+        try:
+            plan.removed_body = removed_paths(json.loads(original_body), json.loads(final_body), blank_removed)
+        except json.JSONDecodeError:
+            pass
+    elif kind == "form":
+        before = dict(parse_qsl(original_body, keep_blank_values=True))
+        after = dict(parse_qsl(final_body, keep_blank_values=True))
+        plan.removed_body = {
+            (key,)
+            for key, value in before.items()
+            if key not in after or (blank_removed and after[key] == "" and value != "")
+        }
+    return plan
+
+
+def _body_shape(kind: str, body_text: Optional[str]) -> Tuple[Any, ...]:
+    if not body_text:
+        return (kind,)
+    if kind == "json":
+        try:
+            parsed = json.loads(body_text)
+        except json.JSONDecodeError:
+            return ("raw",)
+        if isinstance(parsed, dict):
+            return (kind, tuple(sorted(parsed)))
+        return (kind, type(parsed).__name__)
+    if kind == "form":
+        return (kind, tuple(sorted({k for k, _ in parse_qsl(body_text, keep_blank_values=True)})))
+    return (kind,)
+
+
+class TemplateGroups:
+    """按端点模板聚类：方法、主机、归一化路径、请求头名称集合与请求体/查询参数的键。
+
+    每组第一个到达的请求成为代表，完整最小化后发布 ``TemplatePlan``。其余成员
+    不在工作线程中等待：调度方先用 ``defer`` 登记续跑回调，代表发布方案后
+    才重新派发这些成员。
+    """
+
+    def __init__(self, config: GroupingConfig):
+        self.config = config
+        self._extra = [re.compile(pattern) for pattern in config.id_patterns]
+        self._lock = threading.Lock()
+        self._groups: Dict[Tuple[Any, ...], "_Group"] = {}
+
+    def template_key(self, request: RequestData, kind: str) -> Tuple[Any, ...]:
+        parts = urlsplit(request.url)
+        segments = [
+            "{id}" if _ID_SEGMENT.match(segment) or any(p.search(segment) for p in self._extra) else segment
+            for segment in parts.path.split("/")
+        ]
+        return (
+            request.method.upper(),
+            parts.netloc.lower(),
+            "/".join(segments),
+            tuple(sorted({k for k, _ in parse_qsl(parts.query, keep_blank_values=True)})),
+            tuple(sorted({h.get("name", "").lower() for h in request.headers})),
+            _body_shape(kind, request.body_text),
+        )
+
+    def join(self, request: RequestData, kind: str) -> Tuple["_Group", bool]:
+        """加入所属分组，返回（分组, 是否为代表）。"""
+        group = self._group(request, kind)
+        return group, group.claim(request.index)
+
+    def defer(self, request: RequestData, kind: str, resume: Callable[[], None]) -> bool:
+        """代表尚未发布方案时登记 ``resume`` 并返回 True，调用方此时不应处理该请求。"""
+        return self._group(request, kind).defer(request.index, resume)
+
+    def release(self, request: RequestData, kind: str) -> None:
+        """请求处理结束；若它是尚未发布方案的代表，把代表身份交给等待的成员。"""
+        key = self.template_key(request, kind)
+        with self._lock:
+            group = self._groups.get(key)
+        if group is not None:
+            group.release(request.index)
+
+    def _group(self, request: RequestData, kind: str) -> "_Group":
+        key = self.template_key(request, kind)
+        with self._lock:
+            group = self._groups.get(key)
+            if group is None:
+                group = self._groups[key] = _Group()
+            return group
+
+
+class _Group:
+    def __init__(self) -> None:
+        self.representative: Optional[int] = None
+        self.plan: Optional[TemplatePlan] = None
+        self.done = False
+        self._lock = threading.Lock()
+        self._waiting: List[Tuple[int, Callable[[], None]]] = []
+
+    def claim(self, index: int) -> bool:
+        with self._lock:
+            if self.representative is None and not self.done:
+                self.representative = index
+            return self.representative == index and not self.done
+
+    def defer(self, index: int, resume: Callable[[], None]) -> bool:
+        with self._lock:
+            if self.done:
+                return False
+            if self.representative is None or self.representative == index:
+                self.representative = index
+                return False
+            self._waiting.append((index, resume))
+            return True
+
+    def publish(self, plan: Optional[TemplatePlan]) -> None:
+        with self._lock:
+            if self.done:
+                return
+            self.plan = plan
+            self.done = True
+            waiting, self._waiting = self._waiting, []
+        for _, resume in waiting:
+            resume()
+
+    def release(self, index: int) -> None:
+        # 代表未走到最小化（基线失败、响应不确定等）时不发布方案，由第一个等待的成员接任
+        with self._lock:
+            if self.done or self.representative != index:
+                return
+            if not self._waiting:
+                self.representative = None
+                return
+            self.representative, resume = self._waiting.pop(0)
+        resume()
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
+import base64
 import json
+import re
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
 from urllib.parse import urlparse, parse_qs
 
-from .models import RequestData
+from .models import RequestData, ResponseSnapshot
 
 
 @dataclass
@@ -15,9 +17,226 @@ class HarEntry:
     request: RequestData
 
 
+class _JsonStream:
+    """在文本句柄上按需读取的 JSON 流，逐个解码值而不载入整个文档。"""
+
+    def __init__(self, handle: TextIO, chunk_size: int = 1 << 20):
+        self._handle = handle
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, size: Optional[int] = None) -> bool:
+        if self._eof:
+            return False
+        chunk = self._handle.read(size or self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        if self._pos:
+            self._buffer = self._buffer[self._pos :]
+            self._pos = 0
+        if not self._buffer and chunk.startswith("\ufeff"):
+            chunk = chunk[1:]
+        self._buffer += chunk
+        return True
+
+    def _skip_ws(self) -> None:
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buffer) or not self._fill():
+                return
+
+    def peek(self) -> str:
+        self._skip_ws()
+        if self._pos >= len(self._buffer):
+            raise ValueError("HAR 文件意外结束")
+        return self._buffer[self._pos]
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"HAR 格式错误：期望 {char!r}，实际为 {self._buffer[self._pos]!r}")
+        self._pos += 1
+
+    def value(self) -> Any:
+        self._skip_ws()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # 值跨越缓冲区边界：按已缓冲长度倍增读取，避免反复从头解码
+                if not self._fill(max(self._chunk_size, len(self._buffer) - self._pos)):
+                    raise
+                continue
+            # 数字可能被缓冲区截断（如 "1." 或 "1e"），需确认其后已是分隔符
+            if (
+                isinstance(value, (int, float))
+                and not self._eof
+                and (end >= len(self._buffer) or self._buffer[end] in "0123456789.eE+-")
+            ):
+                self._fill()
+                continue
+            self._pos = end
+            return value
+
+    def members(self) -> Iterator[str]:
+        """遍历对象的键；调用方必须在迭代下一个键之前消费对应的值。"""
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self._pos += 1
+                continue
+            self.expect("}")
+            return
+
+    def items(self) -> Iterator[None]:
+        """遍历数组元素；调用方必须在每次迭代时消费一个值。"""
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield None
+            if self.peek() == ",":
+                self._pos += 1
+                continue
+            self.expect("]")
+            return
+
+
+def iter_har_events(handle: TextIO) -> Iterator[Tuple[str, Any, Any]]:
+    """按文档顺序流式产出 HAR 内容。
+
+    - ``("top", key, value)``：``log`` 以外的顶层字段
+    - ``("log", key, value)``：``log`` 中除 ``entries`` 外的字段
+    - ``("entry", index, entry)``：逐条产出的 entry
+    - ``("begin", name, None)`` / ``("end", name, None)``：``log`` 对象与
+      ``entries`` 数组的起止位置，供导出时按原结构写回
+    """
+    stream = _JsonStream(handle)
+    for top_key in stream.members():
+        if top_key != "log" or stream.peek() != "{":
+            yield "top", top_key, stream.value()
+            continue
+        yield "begin", "log", None
+        for log_key in stream.members():
+            if log_key != "entries" or stream.peek() != "[":
+                yield "log", log_key, stream.value()
+                continue
+            yield "begin", "entries", None
+            for index, _ in enumerate(stream.items()):
+                yield "entry", index, stream.value()
+            yield "end", "entries", None
+        yield "end", "log", None
+
+
+def _strip_response_body(entry: Dict[str, Any]) -> Dict[str, Any]:
+    content = (entry.get("response") or {}).get("content")
+    if isinstance(content, dict):
+        content.pop("text", None)
+    return entry
+
+
+def decode_content(content: Dict[str, Any]) -> Optional[bytes]:
+    """还原 ``response.content`` 记录的响应正文字节；未记录正文时返回 None。
+
+    ``encoding`` 为 base64 时直接解码；否则 ``text`` 是已解码的文本，按
+    ``mimeType`` 声明的字符集（默认 UTF-8）重新编码。
+    """
+    text = content.get("text")
+    if text is None:
+        return None
+    if content.get("encoding") == "base64":
+        try:
+            return base64.b64decode(text)
+        except ValueError:
+            return None
+    match = re.search(r"charset=([\w.:-]+)", content.get("mimeType") or "", re.IGNORECASE)
+    try:
+        return text.encode(match.group(1) if match else "utf-8")
+    except (LookupError, UnicodeEncodeError):
+        return text.encode("utf-8")
+
+
+def _recorded_length(response: Dict[str, Any], content: Dict[str, Any]) -> Optional[int]:
+    """未记录正文时的解压后正文长度。
+
+    HAR 中 ``content.size`` 是解压后的长度，``bodySize`` 是实际传输（可能经过
+    压缩）的长度，``compression`` 是压缩节省的字节数；实时探测比较的是解压后
+    的长度，因此压缩响应不能直接使用 ``bodySize``。
+    """
+    size = content.get("size")
+    if isinstance(size, int) and size >= 0:
+        return size
+    body_size = response.get("bodySize")
+    if not isinstance(body_size, int) or body_size < 0:
+        return None
+    compression = content.get("compression")
+    if isinstance(compression, int) and compression >= 0:
+        return body_size + compression
+    encoded = any(h.get("name", "").lower() == "content-encoding" for h in response.get("headers") or [])
+    return None if encoded else body_size
+
+
+def recorded_response(entry: Dict[str, Any]) -> Optional[ResponseSnapshot]:
+    """由 HAR 条目录制的响应构造基线快照；没有可用的录制响应时返回 None。
+
+    状态码为 0（请求被取消或阻止）或缺失时视为不可用；正文被丢弃时
+    ``body`` 为 None，长度取自 ``content.size``，长度也无从得知时 ``length``
+    为 -1。
+    """
+    response = entry.get("response") or {}
+    status = response.get("status")
+    if not isinstance(status, int) or status <= 0:
+        return None
+    content = response.get("content") or {}
+    body = decode_content(content)
+    if body is not None:
+        length: Optional[int] = len(body)
+    else:
+        length = _recorded_length(response, content)
+    elapsed = entry.get("time")
+    return ResponseSnapshot(
+        status_code=status,
+        body=body,
+        error=None,
+        elapsed=float(elapsed) / 1000 if isinstance(elapsed, (int, float)) and elapsed > 0 else 0.0,
+        headers={h["name"]: h.get("value", "") for h in response.get("headers") or [] if "name" in h},
+        length=length if length is not None else -1,
+    )
+
+
+def build_request(index: int, entry: Dict[str, Any]) -> RequestData:
+    req = entry.get("request", {})
+    headers = req.get("headers", [])
+    parsed_url = urlparse(req.get("url", ""))
+    query = {k: v[0] if len(v) == 1 else v for k, v in parse_qs(parsed_url.query).items()}
+    return RequestData(
+        index=index,
+        method=req.get("method", "GET"),
+        url=req.get("url", ""),
+        path=parsed_url.path,
+        query=query,
+        headers=headers,
+        body_text=(req.get("postData", {}) or {}).get("text"),
+        mime_type=(req.get("postData", {}) or {}).get("mimeType"),
+        raw_entry=entry,
+    )
+
+
 class HarLoader:
-    def __init__(self, path: str):
+    def __init__(self, path: str, keep_response_body: bool = False):
         self.path = Path(path)
+        self.keep_response_body = keep_response_body
         self.raw_data: Optional[Dict] = None
 
     def load(self) -> List[HarEntry]:
@@ -27,24 +246,27 @@ class HarLoader:
         entries = data.get("log", {}).get("entries", [])
         wrapped: List[HarEntry] = []
         for idx, entry in enumerate(entries):
-            req = entry.get("request", {})
-            headers = req.get("headers", [])
-            parsed_url = urlparse(req.get("url", ""))
-            query = {k: v[0] if len(v) == 1 else v for k, v in parse_qs(parsed_url.query).items()}
-            request = RequestData(
-                index=idx,
-                method=req.get("method", "GET"),
-                url=req.get("url", ""),
-                path=parsed_url.path,
-                query=query,
-                headers=headers,
-                body_text=(req.get("postData", {}) or {}).get("text"),
-                mime_type=(req.get("postData", {}) or {}).get("mimeType"),
-                raw_entry=entry,
-            )
-            wrapped.append(HarEntry(index=idx, request=request))
+            wrapped.append(HarEntry(index=idx, request=build_request(idx, entry)))
         return wrapped
 
+    def iter_entries(self) -> Iterator[HarEntry]:
+        """流式读取 HAR，逐条产出 entry，不保留整个文档。
+
+        每次只解码一个 entry；除非 ``keep_response_body`` 为真，
+        ``response.content.text`` 会在解码后立即丢弃。
+        """
+        for kind, idx, entry in self.iter_events():
+            if kind != "entry":
+                continue
+            if not self.keep_response_body:
+                entry = _strip_response_body(entry)
+            yield HarEntry(index=idx, request=build_request(idx, entry))
+
+    def iter_events(self) -> Iterator[Tuple[str, Any, Any]]:
+        """流式读取原始 HAR 结构，事件格式见 ``iter_har_events``。"""
+        with self.path.open("r", encoding="utf-8") as handle:
+            yield from iter_har_events(handle)
+
     def get_raw(self) -> Dict:
         if self.raw_data is None:
             raise RuntimeError("HAR 内容尚未加载")
@@ -1,13 +1,44 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import logging
+import os
+import ssl
 import threading
 import time
-from typing import Dict, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
 
 import requests
 
-from .config import ClientConfig
-from .models import RequestData, ResponseSnapshot
+from .comparator import ProbeScanner, ResponseComparator
+from .config import AdaptiveRateConfig, ClientConfig, RateLimitConfig
+from .journal import ProbeJournal
+from .models import ProbeStats, RequestData, ResponseSnapshot
+from .probe_cache import ProbeCache, probe_key
+
+# 单个探测：(headers, body)
+Probe = Tuple[Dict[str, str], Optional[str]]
+# 根据响应状态码与 Content-Length 创建增量检查器
+ScanFactory = Callable[[int, Optional[int]], ProbeScanner]
+
+_CHUNK_SIZE = 64 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+class ProbeThrottledError(RuntimeError):
+    """探测在重试次数用尽后仍被限流（429/503/Retry-After/超时）。
+
+    限流造成的失败不代表请求不等价，因此不会作为 ddmin 的测试结果返回。
+    """
+
+    def __init__(self, snapshot: ResponseSnapshot):
+        super().__init__(snapshot.error)
+        self.snapshot = snapshot
 
 
 class RateLimiter:
@@ -34,43 +65,292 @@ class RateLimiter:
             else:
                 self._allowance -= 1.0
 
+    def set_rate(self, requests_per_second: float) -> None:
+        with self._lock:
+            self.rps = requests_per_second
+            self._allowance = min(self._allowance, requests_per_second)
+
+
+def _retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    value = next((v for k, v in headers.items() if k.lower() == "retry-after"), None)
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostLimiter:
+    """单个主机的令牌桶、并发上限与 AIMD 速率控制。
+
+    启用 ``adaptive`` 时，延迟平稳的成功响应使速率线性增加；429、503、
+    带 Retry-After 的错误响应或超时使速率乘性下降，并暂停该主机的探测直到
+    Retry-After（或一个发送间隔）过去。与 TCP 拥塞控制类似，每个冷却窗口
+    （至少 1 秒）内的多次限流只降速一次，避免零星错误把速率压到下限。
+    """
+
+    def __init__(self, requests_per_second: Optional[float], max_concurrent: Optional[int], adaptive: AdaptiveRateConfig):
+        if adaptive.enabled and not requests_per_second:
+            requests_per_second = adaptive.max_rps
+        self.bucket = RateLimiter(requests_per_second)
+        self.adaptive = adaptive
+        self._slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+        self._lock = threading.Lock()
+        self._latency: Optional[float] = None
+        self._resume_at = 0.0
+        self._cooldown_until = 0.0
+
+    @property
+    def rate(self) -> Optional[float]:
+        return self.bucket.rps
+
+    def acquire(self) -> None:
+        if self._slots is not None:
+            self._slots.acquire()
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self.bucket.wait()
+
+    def release(self) -> None:
+        if self._slots is not None:
+            self._slots.release()
+
+    def observe(self, snapshot: ResponseSnapshot) -> bool:
+        """记录一次响应并调整速率；返回该响应是否属于限流。"""
+        cfg = self.adaptive
+        if not cfg.enabled:
+            return False
+        status = snapshot.status_code
+        retry_after = _retry_after(snapshot.headers) if status is not None and status >= 400 else None
+        throttled = snapshot.timed_out or status in (429, 503) or retry_after is not None
+        with self._lock:
+            now = time.monotonic()
+            rate = self.bucket.rps
+            if throttled:
+                decrease = now >= self._cooldown_until
+                if decrease:
+                    rate = max(cfg.min_rps, rate * cfg.decrease_factor)
+                    self.bucket.set_rate(rate)
+                delay = min(cfg.max_backoff, retry_after if retry_after is not None else 1.0 / rate)
+                self._resume_at = max(self._resume_at, now + delay)
+                if decrease:
+                    # 冷却窗口从降速时刻起算，持续的限流仍会每个窗口降速一次
+                    self._cooldown_until = now + max(delay, 1.0)
+                return True
+            if not snapshot.ok():
+                return False
+            stable = self._latency is None or snapshot.elapsed <= self._latency * cfg.latency_tolerance
+            self._latency = snapshot.elapsed if self._latency is None else 0.8 * self._latency + 0.2 * snapshot.elapsed
+            if stable and rate < cfg.max_rps:
+                # 每个成功响应增加 increase / rate，满速时约为每秒增加 increase
+                self.bucket.set_rate(min(cfg.max_rps, rate + cfg.increase / rate))
+            return False
+
+
+class HostLimiters:
+    """按主机（``per_host``）或全局共享的 ``HostLimiter`` 集合。"""
+
+    def __init__(self, config: RateLimitConfig):
+        self.config = config
+        self._lock = threading.Lock()
+        self._limiters: Dict[str, HostLimiter] = {}
+
+    def get(self, url: str) -> HostLimiter:
+        host = urlsplit(url).netloc.lower() if self.config.per_host else ""
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = HostLimiter(
+                    self.config.requests_per_second,
+                    self.config.host_max_concurrent,
+                    self.config.adaptive,
+                )
+                self._limiters[host] = limiter
+            return limiter
+
+    def rates(self) -> Dict[str, Optional[float]]:
+        with self._lock:
+            return {host: limiter.rate for host, limiter in self._limiters.items()}
+
+
+def _content_length(method: str, headers: Mapping[str, str]) -> Optional[int]:
+    """仅当响应未经压缩编码时，Content-Length 才等于解码后的正文字节数。"""
+    if method.upper() == "HEAD":
+        return None
+    lowered = {k.lower(): v for k, v in headers.items()}
+    if lowered.get("content-encoding", "identity").lower() not in ("", "identity"):
+        return None
+    try:
+        return int(lowered["content-length"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _scanned_snapshot(status: int, headers: Mapping[str, str], scanner: ProbeScanner, start: float) -> ResponseSnapshot:
+    return ResponseSnapshot(
+        status_code=status,
+        body=None,
+        error=None,
+        elapsed=time.monotonic() - start,
+        headers=dict(headers),
+        length=scanner.length,
+        features=scanner.features,
+    )
+
+
+def _error_snapshot(start: float, exc: BaseException) -> ResponseSnapshot:
+    return ResponseSnapshot(
+        status_code=None,
+        body=None,
+        elapsed=time.monotonic() - start,
+        error=str(exc) or exc.__class__.__name__,
+        headers={},
+        timed_out=isinstance(exc, (requests.Timeout, asyncio.TimeoutError)),
+    )
+
+
+class Transport:
+    """``HttpClient`` 之下的传输接口。
+
+    子类至少实现 ``send``；``submit`` 默认同步执行 ``send`` 并返回已完成的
+    Future，适合不涉及网络的实现（如离线重放）。``scan`` 非空时应把正文交给
+    增量检查器，而不是保留在快照中。
+    """
+
+    def send(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        body: Optional[str],
+        scan: Optional[ScanFactory] = None,
+    ) -> ResponseSnapshot:
+        raise NotImplementedError
+
+    def submit(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        body: Optional[str],
+        scan: Optional[ScanFactory] = None,
+    ) -> Future:
+        future: Future = Future()
+        future.set_result(self.send(method, url, headers, body, scan))
+        return future
+
+    def close(self) -> None:
+        pass
+
+    @staticmethod
+    def _respond(
+        method: str,
+        status: int,
+        headers: Mapping[str, str],
+        content: bytes,
+        scan: Optional[ScanFactory],
+        start: float,
+    ) -> ResponseSnapshot:
+        """由完整的内存正文构造快照，供非网络传输使用。"""
+        if scan is None:
+            return ResponseSnapshot(
+                status_code=status,
+                body=content,
+                elapsed=time.monotonic() - start,
+                error=None,
+                headers=dict(headers),
+            )
+        scanner = scan(status, _content_length(method, headers))
+        if not scanner.done:
+            scanner.feed(content)
+            if not scanner.done:
+                scanner.finish()
+        return _scanned_snapshot(status, headers, scanner, start)
+
+
+class _RequestsBackend(Transport):
+    """基于 requests 的阻塞式传输，每个线程复用一个 Session。"""
 
-class HttpClient:
     def __init__(self, config: ClientConfig):
         self.config = config
-        self.rate_limiter = RateLimiter(config.rate_limit.requests_per_second)
         self._local = threading.local()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
 
-    def send(self, request: RequestData, headers: Dict[str, str], body: Optional[str]) -> ResponseSnapshot:
-        self.rate_limiter.wait()
+    def send(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        body: Optional[str],
+        scan: Optional[ScanFactory] = None,
+    ) -> ResponseSnapshot:
         start = time.monotonic()
         try:
             session = self._get_session()
             response = session.request(
-                method=request.method,
-                url=request.url,
+                method=method,
+                url=url,
                 headers=headers,
-                data=body if body is not None else request.body_text,
+                data=body,
                 timeout=self.config.timeout,
                 verify=self.config.verify_tls,
+                stream=scan is not None,
             )
+            if scan is not None:
+                scanner = scan(response.status_code, _content_length(method, response.headers))
+                try:
+                    if not scanner.done:
+                        for chunk in response.iter_content(_CHUNK_SIZE):
+                            scanner.feed(chunk)
+                            if scanner.done:
+                                break
+                        else:
+                            scanner.finish()
+                finally:
+                    # 提前停止时丢弃剩余正文，连接不会被复用
+                    response.close()
+                return _scanned_snapshot(response.status_code, response.headers, scanner, start)
             elapsed = time.monotonic() - start
             return ResponseSnapshot(
                 status_code=response.status_code,
-                body=response.text,
+                body=response.content,
                 elapsed=elapsed,
                 error=None,
                 headers=dict(response.headers),
             )
         except requests.RequestException as exc:
-            elapsed = time.monotonic() - start
-            return ResponseSnapshot(
-                status_code=None,
-                body=None,
-                elapsed=elapsed,
-                error=str(exc),
-                headers={},
-            )
+            return _error_snapshot(start, exc)
+
+    def submit(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        body: Optional[str],
+        scan: Optional[ScanFactory] = None,
+    ) -> Future:
+        return self._get_pool().submit(self.send, method, url, headers, body, scan)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.config.pool_size,
+                    thread_name_prefix="har-minimizer-probe",
+                )
+            return self._pool
 
     def _get_session(self) -> requests.Session:
         session = getattr(self._local, "session", None)
@@ -80,3 +360,382 @@ class HttpClient:
                 session.proxies.update(self.config.proxies)
             self._local.session = session
         return session
+
+
+class _AsyncioBackend(Transport):
+    """在后台事件循环线程中运行 aiohttp，所有探测共享同一个 keep-alive 连接池。
+
+    调用方仍是同步线程：``send`` 阻塞等待结果，在途探测数等于调用线程数
+    （流水线中为 ``rate_limit.max_concurrent``），与 requests 后端相同；只有
+    ``submit``（``send_many``：并行 ddmin、借用空闲名额）能让单个线程同时
+    发出多个探测，此时在途数只受 ``pool_size`` 限制。
+
+    与 requests 一样读取环境中的代理（``HTTP(S)_PROXY``/``NO_PROXY``）与
+    ``REQUESTS_CA_BUNDLE``/``CURL_CA_BUNDLE``；``client.proxies`` 优先。
+    """
+
+    def __init__(self, config: ClientConfig):
+        try:
+            import aiohttp
+        except ImportError as exc:  # pragma: no cover - 取决于运行环境
+            raise RuntimeError("client.backend=asyncio 需要安装 aiohttp：pip install 'har-minimizer[async]'") from exc
+        self._aiohttp = aiohttp
+        self.config = config
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="har-minimizer-asyncio", daemon=True)
+        self._thread.start()
+        self._session = asyncio.run_coroutine_threadsafe(self._create_session(), self._loop).result()
+
+    async def _create_session(self):
+        aiohttp = self._aiohttp
+        connector = aiohttp.TCPConnector(limit=self.config.pool_size, ssl=self._ssl_context())
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.config.timeout),
+            trust_env=True,
+        )
+
+    def _ssl_context(self):
+        """与 requests 的 ``verify`` 一致：关闭校验，或使用环境变量指定的 CA 证书。"""
+        if not self.config.verify_tls:
+            return False
+        bundle = os.environ.get("REQUESTS_CA_BUNDLE") or os.environ.get("CURL_CA_BUNDLE")
+        if not bundle:
+            return None
+        if os.path.isdir(bundle):
+            return ssl.create_default_context(capath=bundle)
+        return ssl.create_default_context(cafile=bundle)
+
+    def send(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        body: Optional[str],
+        scan: Optional[ScanFactory] = None,
+    ) -> ResponseSnapshot:
+        return self.submit(method, url, headers, body, scan).result()
+
+    def submit(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        body: Optional[str],
+        scan: Optional[ScanFactory] = None,
+    ) -> Future:
+        return asyncio.run_coroutine_threadsafe(self._request(method, url, headers, body, scan), self._loop)
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        body: Optional[str],
+        scan: Optional[ScanFactory],
+    ) -> ResponseSnapshot:
+        start = time.monotonic()
+        try:
+            async with self._session.request(
+                method,
+                url,
+                headers=headers,
+                data=body.encode("utf-8") if body is not None else None,
+                proxy=self._proxy_for(url),
+            ) as response:
+                if scan is not None:
+                    scanner = scan(response.status, _content_length(method, response.headers))
+                    if not scanner.done:
+                        async for chunk in response.content.iter_chunked(_CHUNK_SIZE):
+                            scanner.feed(chunk)
+                            if scanner.done:
+                                break
+                        else:
+                            scanner.finish()
+                    if not scanner.done or not response.content.at_eof():
+                        response.close()
+                    return _scanned_snapshot(response.status, response.headers, scanner, start)
+                content = await response.read()
+                return ResponseSnapshot(
+                    status_code=response.status,
+                    body=content,
+                    elapsed=time.monotonic() - start,
+                    error=None,
+                    headers=dict(response.headers),
+                )
+        except (self._aiohttp.ClientError, asyncio.TimeoutError, ValueError) as exc:
+            return _error_snapshot(start, exc)
+
+    def _proxy_for(self, url: str) -> Optional[str]:
+        proxies = self.config.proxies
+        if not proxies:
+            return None
+        scheme = url.split(":", 1)[0].lower()
+        return proxies.get(scheme) or proxies.get("all")
+
+    def close(self) -> None:
+        if not self._loop.is_running():
+            return
+        asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+class HttpClient:
+    def __init__(
+        self,
+        config: ClientConfig,
+        journal: Optional[ProbeJournal] = None,
+        comparator: Optional[ResponseComparator] = None,
+        transport: Optional[Transport] = None,
+    ):
+        self.config = config
+        self.comparator = comparator
+        self.limiters = HostLimiters(config.rate_limit)
+        self.cache = ProbeCache(config.cache.max_entries) if config.cache.enabled else None
+        self.journal = journal
+        self.totals = ProbeStats()
+        self._stats: Dict[int, ProbeStats] = {}
+        self._stats_lock = threading.Lock()
+        if transport is not None:
+            self._backend = transport
+        elif config.backend == "asyncio":
+            self._backend = _AsyncioBackend(config)
+        else:
+            self._backend = _RequestsBackend(config)
+
+    def send(
+        self,
+        request: RequestData,
+        headers: Dict[str, str],
+        body: Optional[str],
+        keep_body: bool = False,
+        reference: Optional[ResponseSnapshot] = None,
+        url: Optional[str] = None,
+    ) -> ResponseSnapshot:
+        """发送一个探测。``keep_body`` 为真时保留完整正文（用于基线与最终响应）。
+
+        启用 ``stream_probes`` 且给出 ``reference`` 时，响应按块读取并与
+        ``reference`` 增量比较，结论确定后即停止读取。``url`` 为去掉部分查询
+        参数后的目标地址，缺省时使用 ``request.url``。
+
+        ``keep_body`` 与 ``reference`` 同时给出表示只需相对该基线的结论（最终
+        校验、置空复核）：相对同一基线验证过的紧凑探测可直接复用。
+        """
+        url = url or request.url
+        payload = self._payload(request, body)
+        token = self._reference_token(reference)
+        key = probe_key(request.method, url, headers, payload, None if keep_body else token)
+        verified = probe_key(request.method, url, headers, payload, token) if keep_body and token else None
+        cached = self._lookup(request, key, need_body=keep_body, verified=verified)
+        if cached is not None:
+            return cached
+        scan = None if keep_body else self._scan_factory(reference)
+        snapshot = self._finalize(self._transmit(request, url, headers, payload, scan), keep_body, reference)
+        self._store(key, snapshot)
+        if verified is not None:
+            # 保留正文的响应带有全部特征，之后相对同一基线的紧凑探测也可复用
+            self._store(verified, snapshot)
+        return snapshot
+
+    def send_many(
+        self,
+        request: RequestData,
+        probes: Sequence[Probe],
+        first_match: Optional[Callable[[ResponseSnapshot], bool]] = None,
+        reference: Optional[ResponseSnapshot] = None,
+        urls: Optional[Sequence[str]] = None,
+    ) -> List[Optional[ResponseSnapshot]]:
+        """并发发送同一请求的多个变体，结果顺序与 ``probes`` 一致。
+
+        限速器按原有语义逐个放行；放行后的探测立即交给后端，
+        不等待前一个探测完成。指定 ``first_match`` 时，按顺序找到第一个
+        满足条件的结果后取消其余探测，被取消的位置返回 None。
+        ``reference`` 的含义与 ``send`` 相同；``urls`` 给出时与 ``probes`` 一一对应。
+        """
+        scan = self._scan_factory(reference)
+        results: List[Optional[ResponseSnapshot]] = [None] * len(probes)
+        futures: Dict[int, Tuple[str, str, Dict[str, str], Optional[str], Future]] = {}
+        limiter = self.limiters.get(request.url)
+        token = self._reference_token(reference)
+        for index, (headers, body) in enumerate(probes):
+            url = urls[index] if urls is not None else request.url
+            payload = self._payload(request, body)
+            key = probe_key(request.method, url, headers, payload, token)
+            cached = self._lookup(request, key)
+            if cached is not None:
+                results[index] = cached
+                continue
+            limiter.acquire()
+            future = self._backend.submit(request.method, url, headers, payload, scan)
+            # 完成或被取消时归还并发名额
+            future.add_done_callback(lambda _, limiter=limiter: limiter.release())
+            futures[index] = (key, url, headers, payload, future)
+        try:
+            for index in range(len(results)):
+                if index in futures:
+                    key, url, headers, payload, future = futures.pop(index)
+                    snapshot = self._transmit(request, url, headers, payload, scan, first=future.result())
+                    results[index] = self._finalize(snapshot, keep_body=False, reference=reference)
+                    self._store(key, results[index])
+                if first_match is not None and first_match(results[index]):
+                    break
+        finally:
+            for *_, future in futures.values():
+                future.cancel()
+        return results
+
+    def sample(
+        self, request: RequestData, headers: Dict[str, str], body: Optional[str], count: int
+    ) -> List[ResponseSnapshot]:
+        """并发发送 ``count`` 个完全相同的请求并保留正文，用于基线校准。
+
+        绕过探测缓存与运行日志：缓存只会返回同一个基线响应，而校准需要的正是
+        相同请求之间的差异。并发数仍受主机限速器约束。
+        """
+        payload = self._payload(request, body)
+        limiter = self.limiters.get(request.url)
+        futures: List[Future] = []
+        for _ in range(count):
+            limiter.acquire()
+            future = self._backend.submit(request.method, request.url, headers, payload, None)
+            future.add_done_callback(lambda _, limiter=limiter: limiter.release())
+            futures.append(future)
+        try:
+            return [
+                self._finalize(
+                    self._transmit(request, request.url, headers, payload, None, first=future.result()), keep_body=True
+                )
+                for future in futures
+            ]
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def pop_stats(self, index: int) -> ProbeStats:
+        with self._stats_lock:
+            return self._stats.pop(index, ProbeStats())
+
+    def close(self) -> None:
+        self._backend.close()
+
+    def _lookup(
+        self, request: RequestData, key: str, need_body: bool = False, verified: Optional[str] = None
+    ) -> Optional[ResponseSnapshot]:
+        """查找缓存与运行日志；``need_body`` 为真时丢弃了正文的紧凑快照不算命中，重新发送。
+
+        ``verified`` 为相对基线验证过的同一探测的键，其紧凑快照同样算作命中。
+        """
+        keys = [(key, need_body)] + ([(verified, False)] if verified is not None else [])
+        cached = self._first_usable(self.cache.get, keys) if self.cache is not None else None
+        replayed = None
+        if cached is None and self.journal is not None:
+            replayed = self._first_usable(self.journal.replay, keys)
+        with self._stats_lock:
+            stats = self._stats.setdefault(request.index, ProbeStats())
+            if cached is not None:
+                stats.cache_hits += 1
+                self.totals.cache_hits += 1
+            elif replayed is not None:
+                stats.journal_hits += 1
+                self.totals.journal_hits += 1
+            else:
+                stats.cache_misses += 1
+                self.totals.cache_misses += 1
+        return cached or replayed
+
+    @staticmethod
+    def _first_usable(
+        get: Callable[[str], Optional[ResponseSnapshot]], keys: Sequence[Tuple[str, bool]]
+    ) -> Optional[ResponseSnapshot]:
+        """按顺序返回第一个可用的命中；``(键, 需要正文)`` 中需要正文时跳过紧凑快照。"""
+        for key, need_body in keys:
+            snapshot = get(key)
+            if snapshot is not None and not (need_body and snapshot.body is None):
+                return snapshot
+        return None
+
+    def _finalize(
+        self, snapshot: ResponseSnapshot, keep_body: bool, reference: Optional[ResponseSnapshot] = None
+    ) -> ResponseSnapshot:
+        """接收时计算摘要与比较特征，随后按需丢弃正文。
+
+        正文会被丢弃的探测在给出 ``reference`` 时只扫描决定结论所需的特征；
+        保留正文的响应仍计算全部特征，可与任意基线比较。
+        """
+        keep = keep_body or self.config.keep_response_bodies
+        if snapshot.body is not None:
+            snapshot.digest = hashlib.blake2b(snapshot.body, digest_size=16).hexdigest()
+            if self.comparator is not None:
+                if keep or reference is None:
+                    snapshot.features = self.comparator.extract_features(snapshot.body)
+                else:
+                    snapshot.features = self.comparator.extract_features(snapshot.body, reference, snapshot)
+        if keep:
+            return snapshot
+        return snapshot.compact()
+
+    def _transmit(
+        self,
+        request: RequestData,
+        url: str,
+        headers: Dict[str, str],
+        payload: Optional[str],
+        scan: Optional[ScanFactory],
+        first: Optional[ResponseSnapshot] = None,
+    ) -> ResponseSnapshot:
+        """经主机限速器发出探测；被限流时退避重试，用尽次数后抛出 ``ProbeThrottledError``。
+
+        ``first`` 为已经通过 ``submit`` 取得的首次响应。
+        """
+        limiter = self.limiters.get(url)
+        snapshot = first
+        attempts = 0
+        while True:
+            if snapshot is None:
+                limiter.acquire()
+                try:
+                    snapshot = self._backend.send(request.method, url, headers, payload, scan)
+                finally:
+                    limiter.release()
+            if not limiter.observe(snapshot):
+                return snapshot
+            attempts += 1
+            reason = "超时" if snapshot.timed_out else f"HTTP {snapshot.status_code}"
+            if attempts > self.config.rate_limit.adaptive.max_retries:
+                snapshot.error = f"探测被限流（{reason}），重试 {attempts - 1} 次后仍未恢复"
+                raise ProbeThrottledError(snapshot)
+            logger.info("请求 %s 被限流（%s），速率降至 %.2f/s，第 %s 次重试", request.index, reason, limiter.rate, attempts)
+            snapshot = None
+
+    def _reference_token(self, reference: Optional[ResponseSnapshot]) -> Optional[str]:
+        """基线的标识：状态码、长度、正文摘要以及校准带来的容差与屏蔽项。
+
+        紧凑探测只保存相对该基线确定结论所需的特征，换用其他基线（例如录制
+        响应过期后改用实时基线）时必须重新探测，而不能复用这些特征。
+        """
+        if reference is None:
+            return None
+        if reference.digest is None and reference.body is not None:
+            reference.digest = hashlib.blake2b(reference.body, digest_size=16).hexdigest()
+        calibration = reference.calibration
+        masked = ",".join(sorted(calibration.masked)) if calibration is not None else ""
+        tolerance = self.comparator.length_tolerance(reference) if self.comparator is not None else None
+        return f"{reference.status_code}:{reference.length}:{reference.digest}:{masked}:{tolerance}"
+
+    def _scan_factory(self, reference: Optional[ResponseSnapshot]) -> Optional[ScanFactory]:
+        if not self.config.stream_probes or reference is None or self.comparator is None:
+            return None
+        comparator, max_bytes = self.comparator, self.config.max_body_bytes
+        return lambda status, length: comparator.scanner(reference, status, length, max_bytes)
+
+    def _store(self, key: str, snapshot: ResponseSnapshot) -> None:
+        if self.cache is not None:
+            self.cache.put(key, snapshot)
+        if self.journal is not None:
+            self.journal.record_probe(key, snapshot)
+
+    @staticmethod
+    def _payload(request: RequestData, body: Optional[str]) -> Optional[str]:
+        return body if body is not None else request.body_text
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import base64
+import json
+import logging
+import threading
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .models import MinimizationResult, ProcessedRequest, ReportEntry, RequestData, ResponseSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+def snapshot_to_dict(snapshot: ResponseSnapshot) -> Dict[str, Any]:
+    return {
+        "status_code": snapshot.status_code,
+        "body": base64.b64encode(snapshot.body).decode("ascii") if snapshot.body is not None else None,
+        "error": snapshot.error,
+        "elapsed": snapshot.elapsed,
+        "headers": dict(snapshot.headers),
+        "length": snapshot.length,
+        "digest": snapshot.digest,
+        "features": list(snapshot.features) if snapshot.features is not None else None,
+    }
+
+
+def snapshot_from_dict(data: Dict[str, Any]) -> ResponseSnapshot:
+    return ResponseSnapshot(
+        status_code=data.get("status_code"),
+        body=base64.b64decode(data["body"]) if data.get("body") is not None else None,
+        error=data.get("error"),
+        elapsed=float(data.get("elapsed", 0.0)),
+        headers=data.get("headers") or {},
+        length=data.get("length"),
+        digest=data.get("digest"),
+        features=tuple(data["features"]) if data.get("features") is not None else None,
+    )
+
+
+class ProbeJournal:
+    """追加写入的 JSONL 运行日志，记录每个探测结果与每个已完成的条目。
+
+    每行一条记录：
+    - ``{"type": "probe", "key": ..., "response": {...}}``
+    - ``{"type": "entry", "index": ..., "report": {...}, "result": {...}}``
+
+    恢复运行时，成功的探测结果按缓存键重放，已完成的条目直接跳过。
+    """
+
+    def __init__(self, path: str, resume: bool = False):
+        self.path = Path(path)
+        self.probes: Dict[str, ResponseSnapshot] = {}
+        self.entries: Dict[int, Dict[str, Any]] = {}
+        if resume:
+            self._load()
+        elif self.path.exists():
+            self.path.unlink()
+        if self.path.parent and not self.path.parent.exists():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._handle = self.path.open("a", encoding="utf-8")
+        if self._handle.tell() and not self._ends_with_newline():
+            # 补齐被中断的半行，避免与后续记录粘连
+            self._handle.write("\n")
+
+    def _ends_with_newline(self) -> bool:
+        with self.path.open("rb") as handle:
+            handle.seek(-1, 2)
+            return handle.read(1) == b"\n"
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            logger.warning("未找到运行日志 %s，将从头开始", self.path)
+            return
+        with self.path.open("r", encoding="utf-8") as handle:
+            for line_no, line in enumerate(handle, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 中断时最后一行可能只写了一半
+                    logger.warning("忽略运行日志 %s 第 %s 行的不完整记录", self.path, line_no)
+                    continue
+                if record.get("type") == "probe":
+                    snapshot = snapshot_from_dict(record.get("response") or {})
+                    if snapshot.ok():
+                        self.probes[record["key"]] = snapshot
+                elif record.get("type") == "entry":
+                    self.entries[int(record["index"])] = record
+        logger.info("已从运行日志恢复 %s 个探测结果、%s 个已完成条目", len(self.probes), len(self.entries))
+
+    def replay(self, key: str) -> Optional[ResponseSnapshot]:
+        return self.probes.get(key)
+
+    def record_probe(self, key: str, snapshot: ResponseSnapshot) -> None:
+        self._append({"type": "probe", "key": key, "response": snapshot_to_dict(snapshot)})
+
+    def record_entry(self, processed: ProcessedRequest, report: ReportEntry) -> None:
+        result = processed.result
+        self._append(
+            {
+                "type": "entry",
+                "index": report.index,
+                "report": asdict(report),
+                "result": {
+                    "headers": result.headers,
+                    "body_text": result.body_text,
+                    "matched": result.matched,
+                    "header_candidates": result.header_candidates,
+                    "body_candidates": result.body_candidates,
+                    "minimized_headers": result.minimized_headers,
+                    "minimized_body_fields": result.minimized_body_fields,
+                    "algorithm": result.algorithm,
+                    "tests": result.tests,
+                    "budget": result.budget,
+                    "calibration": result.calibration,
+                    "url": result.url,
+                    "query_candidates": result.query_candidates,
+                },
+            }
+        )
+
+    def restore_entry(self, request: RequestData) -> Optional[Tuple[ProcessedRequest, ReportEntry]]:
+        record = self.entries.get(request.index)
+        if record is None:
+            return None
+        report = ReportEntry(**record["report"])
+        baseline = ResponseSnapshot(
+            status_code=report.baseline_status,
+            body=None,
+            error=None,
+            elapsed=0.0,
+        )
+        result = MinimizationResult(response=None, **record["result"])
+        return ProcessedRequest(request=request, baseline=baseline, result=result), report
+
+    def close(self) -> None:
+        with self._lock:
+            self._handle.close()
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._handle.write(line + "\n")
+            self._handle.flush()
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import json
+import re
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .json_tree import JsonPath
+
+# 结构记号：容器起止与标量类型为 str，对象键为其原始字节（含引号与转义）
+ShapeToken = Union[str, bytes]
+# 易变路径掩码：路径 -> "type"（只比较取值类型，不再深入）或 "any"（任意取值）
+ShapeMask = Dict[JsonPath, str]
+
+# 记号前缀长度：在此范围内逐个记号比较，超出后改为整体解析
+PREFIX_TOKENS = 512
+
+_WS = re.compile(rb"[ \t\r\n]*")
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_NUMBER = re.compile(rb"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?")
+_NUMBER_TAIL = re.compile(rb"(?:\.[0-9]*)?(?:[eE][+-]?[0-9]*)?")
+_LITERALS = {ord("t"): (b"true", "b"), ord("f"): (b"false", "b"), ord("n"): (b"null", "z")}
+_BOM = b"\xef\xbb\xbf"
+_NUMBERS = (int, float)
+
+
+class _Incomplete(ValueError):
+    """输入在记号中途结束（流式读取时尚未收到后续字节）。"""
+
+
+def iter_shape(body: bytes) -> Iterator[ShapeToken]:
+    """按文档顺序产出 JSON 的结构记号：``{``/``}``/``[``/``]``、对象键与标量类型（s/n/b/z）。
+
+    只做词法级扫描，不构造 Python 对象，也不解码字符串与数字。
+    数组基数体现在元素记号的个数上；取值本身（时间戳、ID 等）被忽略。
+    输入中途结束时抛出 ``_Incomplete``，格式错误时抛出 ``ValueError``。
+    """
+    end = len(body)
+    pos = _WS.match(body, 3 if body.startswith(_BOM) else 0).end()
+    stack: List[int] = []
+    while True:
+        # 读取一个值
+        if pos >= end:
+            raise _Incomplete("JSON 意外结束")
+        char = body[pos]
+        if char == 0x7B:  # {
+            yield "{"
+            pos = _WS.match(body, pos + 1).end()
+            if pos < end and body[pos] == 0x7D:
+                yield "}"
+                pos += 1
+            else:
+                stack.append(0x7D)
+                pos = yield from _key(body, pos)
+                continue
+        elif char == 0x5B:  # [
+            yield "["
+            pos = _WS.match(body, pos + 1).end()
+            if pos < end and body[pos] == 0x5D:
+                yield "]"
+                pos += 1
+            else:
+                stack.append(0x5D)
+                continue
+        elif char == 0x22:  # "
+            match = _STRING.match(body, pos)
+            if match is None:
+                raise _Incomplete("字符串未结束")
+            yield "s"
+            pos = match.end()
+        elif char == 0x2D or 0x30 <= char <= 0x39:
+            match = _NUMBER.match(body, pos)
+            if match is None:
+                raise _Incomplete("数字不完整")
+            pos = match.end()
+            # "1." 或 "1e+" 之类只可能是被截断的数字
+            if pos < end and body[pos] in b".eE" and _NUMBER_TAIL.fullmatch(body, pos):
+                raise _Incomplete("数字不完整")
+            yield "n"
+        elif char in _LITERALS:
+            literal, token = _LITERALS[char]
+            if not body.startswith(literal, pos):
+                if literal.startswith(body[pos:]):
+                    raise _Incomplete("字面量不完整")
+                raise ValueError(f"无法识别的 JSON 值（位置 {pos}）")
+            yield token
+            pos += len(literal)
+        else:
+            raise ValueError(f"无法识别的 JSON 值（位置 {pos}）")
+        # 值之后：分隔符或容器结束
+        while True:
+            pos = _WS.match(body, pos).end()
+            if not stack:
+                if pos < end:
+                    raise ValueError(f"JSON 之后存在多余内容（位置 {pos}）")
+                return
+            if pos >= end:
+                raise _Incomplete("JSON 意外结束")
+            char = body[pos]
+            if char == stack[-1]:
+                yield "}" if char == 0x7D else "]"
+                stack.pop()
+                pos += 1
+                continue
+            if char != 0x2C:  # ,
+                raise ValueError(f"JSON 格式错误（位置 {pos}）")
+            pos = _WS.match(body, pos + 1).end()
+            if stack[-1] == 0x7D:
+                pos = yield from _key(body, pos)
+            break
+
+
+def _key(body: bytes, pos: int) -> Iterator[ShapeToken]:
+    match = _STRING.match(body, pos)
+    if match is None:
+        if pos >= len(body) or body[pos] == 0x22:
+            raise _Incomplete("对象键未结束")
+        raise ValueError(f"JSON 对象键格式错误（位置 {pos}）")
+    yield match.group()
+    pos = _WS.match(body, match.end()).end()
+    if pos >= len(body):
+        raise _Incomplete("JSON 意外结束")
+    if body[pos] != 0x3A:  # :
+        raise ValueError(f"JSON 格式错误：期望 ':'（位置 {pos}）")
+    return _WS.match(body, pos + 1).end()
+
+
+class JsonFingerprint:
+    """基线响应的结构指纹：前 ``PREFIX_TOKENS`` 个结构记号与解析后的基线树。
+
+    比较时先用记号前缀逐个比对，绝大多数结构差异（错误响应、缺少的顶层字段）
+    在读到前几个记号时即可确定；前缀一致时再用 C 实现的 ``json.loads`` 解析
+    整个候选正文并与基线树逐层比较，大响应的单次比较仍接近 O(正文长度)。
+    """
+
+    __slots__ = ("prefix", "complete", "tree", "mask")
+
+    def __init__(self, prefix: Tuple[ShapeToken, ...], complete: bool, tree: Any, mask: Optional[ShapeMask] = None):
+        self.prefix = prefix
+        # 前缀是否已覆盖整个文档
+        self.complete = complete
+        self.tree = tree
+        # 基线校准得到的易变路径（见 ``volatile_paths``）
+        self.mask = mask
+
+
+def _strip_bom(body: bytes) -> bytes:
+    return body[3:] if body.startswith(_BOM) else body
+
+
+def fingerprint(body: Optional[bytes]) -> Optional[JsonFingerprint]:
+    """计算基线响应的结构指纹；正文不是完整 JSON 时返回 None。"""
+    if not body:
+        return None
+    try:
+        tree = json.loads(_strip_bom(body))
+        tokens = list(islice(iter_shape(body), PREFIX_TOKENS + 1))
+    except ValueError:
+        return None
+    return JsonFingerprint(tuple(tokens[:PREFIX_TOKENS]), len(tokens) <= PREFIX_TOKENS, tree)
+
+
+def compare_shape(expected: JsonFingerprint, body: bytes, partial: bool = False) -> Optional[bool]:
+    """与基线指纹比较，遇到第一处结构差异立即返回 False。
+
+    ``partial`` 为真时 ``body`` 只是已收到的前缀：只比对记号前缀，尚未出现
+    差异时返回 None（即使前缀本身已是完整的 JSON，后续字节仍可能改变结论）。
+    """
+    prefix = expected.prefix
+    index = 0
+    try:
+        for token in iter_shape(body):
+            if index >= len(prefix):
+                if expected.complete:
+                    return False
+                break
+            if prefix[index] != token:
+                return False
+            index += 1
+        else:
+            if partial:
+                return None
+            return expected.complete and index == len(prefix)
+    except _Incomplete:
+        return None if partial else False
+    except ValueError:
+        return False
+    if partial:
+        return None
+    try:
+        tree = json.loads(_strip_bom(body))
+    except ValueError:
+        return False
+    try:
+        return same_shape(expected.tree, tree, expected.mask)
+    except RecursionError:
+        return False
+
+
+def _same_type(base: Any, cand: Any) -> bool:
+    base_type = type(base)
+    cand_type = type(cand)
+    return base_type is cand_type or (base_type in _NUMBERS and cand_type in _NUMBERS)
+
+
+def same_shape(base: Any, cand: Any, mask: Optional[ShapeMask] = None) -> bool:
+    """逐层比较两棵 JSON 树的结构：对象键（按文档顺序）、取值类型与数组元素个数。
+
+    给出 ``mask`` 时按其放宽对应路径的比较。
+    """
+    if mask:
+        return _same_masked(base, cand, mask, ())
+    if not _same_type(base, cand):
+        return False
+    if type(base) is dict:
+        if len(base) != len(cand) or list(base) != list(cand):
+            return False
+        return all(same_shape(value, cand[key]) for key, value in base.items())
+    if type(base) is list:
+        return len(base) == len(cand) and all(same_shape(a, b) for a, b in zip(base, cand))
+    return True
+
+
+def _same_masked(base: Any, cand: Any, mask: ShapeMask, path: JsonPath) -> bool:
+    level = mask.get(path)
+    if level == "any":
+        return True
+    if not _same_type(base, cand):
+        return False
+    if level == "type":
+        return True
+    if type(base) is dict:
+        if list(base) != list(cand):
+            return False
+        return all(_same_masked(value, cand[key], mask, path + (key,)) for key, value in base.items())
+    if type(base) is list:
+        if len(base) != len(cand):
+            return False
+        return all(_same_masked(a, b, mask, path + (i,)) for i, (a, b) in enumerate(zip(base, cand)))
+    return True
+
+
+def volatile_paths(base: Any, sample: Any, mask: ShapeMask, path: JsonPath = ()) -> None:
+    """把同一请求的两次响应之间结构不一致的路径并入 ``mask``。
+
+    取值类型不同的路径标记为 "any"；对象键或数组元素个数不同的路径标记为
+    "type"，其下不再逐层比较。已标记的路径只会被放宽，不会被收紧。
+    """
+    level = mask.get(path)
+    if level == "any":
+        return
+    if not _same_type(base, sample):
+        mask[path] = "any"
+        return
+    if level == "type":
+        return
+    if type(base) is dict:
+        if list(base) != list(sample):
+            mask[path] = "type"
+            return
+        for key, value in base.items():
+            volatile_paths(value, sample[key], mask, path + (key,))
+    elif type(base) is list:
+        if len(base) != len(sample):
+            mask[path] = "type"
+            return
+        for index, (a, b) in enumerate(zip(base, sample)):
+            volatile_paths(a, b, mask, path + (index,))
+
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Iterator, List, Sequence, Set, Tuple, Union
+
+# JSON 树中节点的路径：对象键为 str，数组下标为 int
+JsonPath = Tuple[Union[str, int], ...]
+
+FIXED = "fixed"  # 原样保留，不再展开
+ANCESTOR = "ancestor"  # 必须保留，但继续展开其子节点
+CANDIDATE = "candidate"  # 可删除，保留时继续展开
+
+_TOKEN = re.compile(r"\[\s*'((?:[^'\\]|\\.)*)'\s*\]|\[\s*\"((?:[^\"\\]|\\.)*)\"\s*\]|\[\s*(\d+|\*)\s*\]|\.?([^.\[\]]+)")
+
+
+def parse_path(expr: str) -> Tuple[str, ...]:
+    """解析 ``$.a.b[0].c``、``a.items[*].id``、``$['x.y']`` 形式的路径。
+
+    开头的 ``$`` 可省略；``*`` 匹配任意键或下标；点分形式中的数字既匹配数组
+    下标也匹配同名的对象键。
+    """
+    text = expr.strip()
+    if text.startswith("$"):
+        text = text[1:]
+    parts: List[str] = []
+    pos = 0
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if match is None or match.end() == pos:
+            raise ValueError(f"无法解析 JSON 路径：{expr!r}")
+        quoted_single, quoted_double, index, name = match.groups()
+        if quoted_single is not None:
+            parts.append(quoted_single.replace("\\'", "'"))
+        elif quoted_double is not None:
+            parts.append(quoted_double.replace('\\"', '"'))
+        else:
+            parts.append(index if index is not None else name)
+        pos = match.end()
+    return tuple(parts)
+
+
+def _matches(pattern: Sequence[str], path: JsonPath) -> bool:
+    return all(part == "*" or part == str(component) for part, component in zip(pattern, path))
+
+
+class JsonPathRules:
+    """按 ``protected_keys``/``only_keys``（JSON 路径）判定每个节点的处理方式。
+
+    - 受保护路径及其子树原样保留；受保护路径的祖先不可删除，但会继续展开。
+    - 设置了 ``only_keys`` 时，只有这些路径及其子树中的节点可删除；它们的
+      祖先同样不可删除，其余节点原样保留。
+    """
+
+    def __init__(self, protected: Sequence[str], only: Sequence[str]):
+        self.protected = [parse_path(expr) for expr in protected]
+        self.only = [parse_path(expr) for expr in only]
+
+    def classify(self, path: JsonPath) -> str:
+        if any(len(path) >= len(p) and _matches(p, path) for p in self.protected):
+            return FIXED
+        if any(len(path) < len(p) and _matches(p, path) for p in self.protected):
+            return ANCESTOR
+        if not self.only or any(len(path) >= len(p) and _matches(p, path) for p in self.only):
+            return CANDIDATE
+        if any(len(path) < len(p) and _matches(p, path) for p in self.only):
+            return ANCESTOR
+        return FIXED
+
+
+def iter_children(path: JsonPath, value: Any) -> Iterator[Tuple[JsonPath, Any]]:
+    if isinstance(value, dict):
+        for key, child in value.items():
+            yield path + (key,), child
+    elif isinstance(value, list):
+        for index, child in enumerate(value):
+            yield path + (index,), child
+
+
+def render(value: Any, removed: Set[JsonPath], blank_removed: bool, path: JsonPath = ()) -> Any:
+    """按原始树与被删除节点的原始路径重建 JSON 值。
+
+    ``blank_removed`` 为真时，被删除的对象成员以空字符串保留（对应
+    ``treat_empty_as_absent=false``）；数组元素总是直接移除。
+    """
+    if not removed:
+        return value
+    if isinstance(value, dict):
+        result = {}
+        for key, child in value.items():
+            child_path = path + (key,)
+            if child_path in removed:
+                if blank_removed:
+                    result[key] = ""
+                continue
+            result[key] = render(child, removed, blank_removed, child_path)
+        return result
+    if isinstance(value, list):
+        return [
+            render(child, removed, blank_removed, path + (index,))
+            for index, child in enumerate(value)
+            if path + (index,) not in removed
+        ]
+    return value
+
+
+def removed_paths(original: Any, final: Any, blank_removed: bool, path: JsonPath = ()) -> Set[JsonPath]:
+    """比较原始树与最小化后的树，找出被删除（或置空）的节点路径，即 ``render`` 的逆运算。
+
+    数组只有在长度不变时才逐元素比较；元素被删除过的数组无法可靠对齐，
+    视为未删除任何节点。
+    """
+    removed: Set[JsonPath] = set()
+    if isinstance(original, dict) and isinstance(final, dict):
+        for key, child in original.items():
+            child_path = path + (key,)
+            if key not in final or (blank_removed and final[key] == "" and child != ""):
+                removed.add(child_path)
+            else:
+                removed |= removed_paths(child, final[key], blank_removed, child_path)
+    elif isinstance(original, list) and isinstance(final, list) and len(original) == len(final):
+        for index, (child, final_child) in enumerate(zip(original, final)):
+            removed |= removed_paths(child, final_child, blank_removed, path + (index,))
+    return removed
+
+
+def format_path(path: JsonPath) -> str:
+    return "$" + "".join(f"[{part}]" if isinstance(part, int) else f".{part}" for part in path)
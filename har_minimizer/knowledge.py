@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+REQUIRED = "required"
+IRRELEVANT = "irrelevant"
+
+
+class KnowledgeBase:
+    """跨运行保存的请求头/请求体字段/查询参数必要性结论，按主机 + 路径前缀分区。
+
+    文件格式::
+
+        {"version": 1, "scopes": {"api.example.com/v1": {
+            "headers": {"authorization": {"verdict": "required", "seen": 3}},
+            "body": {"trace_id": {"verdict": "irrelevant", "seen": 5}}}}}
+
+    同一项出现相反的结论时直接删除该项，由后续运行重新判定。
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str, prefix_segments: int = 1):
+        self.path = Path(path)
+        self.prefix_segments = prefix_segments
+        self._lock = threading.Lock()
+        self._scopes: Dict[str, Dict[str, Dict[str, Dict[str, object]]]] = {}
+        self._dirty = False
+        if self.path.exists():
+            try:
+                with self.path.open("r", encoding="utf-8") as handle:
+                    data = json.load(handle)
+            except (OSError, json.JSONDecodeError) as exc:
+                logger.warning("知识库 %s 无法读取，将重新积累：%s", self.path, exc)
+            else:
+                if data.get("version") == self.VERSION:
+                    self._scopes = data.get("scopes") or {}
+                    logger.info("已载入知识库 %s（%s 个分区）", self.path, len(self._scopes))
+
+    def scope_for(self, url: str) -> str:
+        parts = urlsplit(url)
+        segments = [segment for segment in parts.path.split("/") if segment][: self.prefix_segments]
+        return parts.netloc.lower() + "/" + "/".join(segments)
+
+    def verdicts(self, scope: str, section: str) -> Dict[str, str]:
+        with self._lock:
+            items = self._scopes.get(scope, {}).get(section, {})
+            return {name: str(item["verdict"]) for name, item in items.items()}
+
+    def record(self, scope: str, section: str, removed: Iterable[str], kept: Iterable[str]) -> None:
+        """记录一次最小化的结论：``removed`` 为可删除项，``kept`` 为确认必需项。"""
+        with self._lock:
+            items = self._scopes.setdefault(scope, {}).setdefault(section, {})
+            for verdict, names in ((IRRELEVANT, removed), (REQUIRED, kept)):
+                for name in names:
+                    item = items.get(name)
+                    if item is None:
+                        items[name] = {"verdict": verdict, "seen": 1}
+                    elif item["verdict"] == verdict:
+                        item["seen"] = int(item["seen"]) + 1
+                    else:
+                        logger.info("知识库 %s 中 %s.%s 的结论冲突，已移除", scope, section, name)
+                        del items[name]
+            self._dirty = True
+
+    def invalidate(self, scope: str, section: str, names: Iterable[str]) -> None:
+        with self._lock:
+            items = self._scopes.get(scope, {}).get(section, {})
+            for name in names:
+                items.pop(name, None)
+            self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps({"version": self.VERSION, "scopes": self._scopes}, ensure_ascii=False, indent=2)
+            self._dirty = False
+        if self.path.parent and not self.path.parent.exists():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(data, encoding="utf-8")
+        os.replace(tmp_path, self.path)
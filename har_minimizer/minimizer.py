@@ -5,18 +5,31 @@ import logging
 import math
 import re
 from copy import deepcopy
-from typing import Dict, List, Optional, Sequence, Tuple
-from urllib.parse import urlencode, parse_qsl
+from dataclasses import replace
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+from urllib.parse import parse_qsl
 
-from .config import Config
-from .http_client import HttpClient
+from .budget import EntryBudget, PhasePlan, ProbeBudget, expected_probes
+from .calibration import Calibration, calibrate
+from .config import Config, HeaderMinConfig
+from .grouping import TemplateGroups, TemplatePlan, learn_plan
+from .har_loader import recorded_response
+from .http_client import HttpClient, ProbeThrottledError
+from .knowledge import IRRELEVANT, REQUIRED, KnowledgeBase
+from .json_tree import ANCESTOR, CANDIDATE, JsonPath, JsonPathRules, format_path, iter_children, render
 from .models import MinimizationResult, RequestData, ResponseSnapshot
+from .payloads import BodyFragments, HeaderFragments
+from .query_string import QueryString, query_dict, split_query_candidates
 from .comparator import ResponseComparator
 
 
 logger = logging.getLogger(__name__)
 
 
+class _DeadlineReached(Exception):
+    """运行截止时间已到：中止当前搜索，而不是把未发出的测试当作不通过。"""
+
+
 def _headers_list_to_dict(headers: Sequence[Dict[str, str]]) -> Dict[str, str]:
     result: Dict[str, str] = {}
     for header in headers:
@@ -55,16 +68,6 @@ def _parse_body(request: RequestData, mode: str) -> Tuple[str, Optional[Dict[str
     return "raw", None
 
 
-def _build_body_text(kind: str, data: Optional[Dict[str, str]]) -> Optional[str]:
-    if data is None:
-        return None
-    if kind == "json":
-        return json.dumps(data, separators=(",", ":"))
-    if kind == "form":
-        return urlencode(data)
-    return None
-
-
 def count_body_fields(kind: str, body_text: Optional[str]) -> int:
     if not body_text:
         return 0
@@ -81,6 +84,43 @@ def count_body_fields(kind: str, body_text: Optional[str]) -> int:
     return 0
 
 
+def split_header_candidates(
+    headers: Sequence[Dict[str, str]], cfg: HeaderMinConfig
+) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+    """按 ``protected``/``ignore``/``candidate_regex`` 把请求头分为（固定, 候选）。"""
+    protected = {h.lower() for h in cfg.protected}
+    ignored = {h.lower() for h in cfg.ignore}
+    regexes = [re.compile(pattern, re.IGNORECASE) for pattern in cfg.candidate_regex]
+    fixed: List[Dict[str, str]] = []
+    candidates: List[Dict[str, str]] = []
+    for header in headers:
+        name = header.get("name", "").lower()
+        if name in protected or name in ignored or (regexes and not any(r.search(name) for r in regexes)):
+            fixed.append(header)
+        else:
+            candidates.append(header)
+    return fixed, candidates
+
+
+def count_candidates(request: RequestData, config: Config) -> Tuple[int, int, int]:
+    """在发出任何探测前估算（请求头候选数, 请求体候选数, 查询参数候选数），供调度器使用。"""
+    cfg = config.minimization
+    headers = 0
+    if "headers" in cfg.order and cfg.headers.enabled:
+        headers = len(split_header_candidates(request.headers, cfg.headers)[1])
+    body = 0
+    if "body" in cfg.order and cfg.body.enabled:
+        _, parsed = _parse_body(request, cfg.body.body_type)
+        if parsed:
+            protected = set(cfg.body.protected_keys)
+            only = set(cfg.body.only_keys)
+            body = sum(1 for key in parsed if key not in protected and (not only or key in only))
+    query = 0
+    if "query" in cfg.order and cfg.query.enabled:
+        query = len(split_query_candidates(QueryString(request.url).params, cfg.query)[1])
+    return headers, body, query
+
+
 def _ddmin(items: Sequence, test_func, max_tests: Optional[int]) -> Tuple[List, int]:
     collection = list(items)
     if not collection:
@@ -112,95 +152,493 @@ def _ddmin(items: Sequence, test_func, max_tests: Optional[int]) -> Tuple[List,
     return collection, tests
 
 
+def _ddmin_parallel(
+    items: Sequence,
+    batch_test_func,
+    max_tests: Optional[int],
+    include_subsets: bool = False,
+    width: Optional[Callable[[], int]] = None,
+) -> Tuple[List, int]:
+    """并行版 ddmin：一轮内的所有补集（可选再加上子集）同时测试。
+
+    ``batch_test_func`` 接收按划分顺序排列的候选列表，返回第一个通过的下标
+    （或 None）。补集总排在子集之前，因此对确定性判定而言，仅测补集时结果
+    与串行 ``_ddmin`` 完全一致。已发出的每个探测都计入 ``max_tests``。
+    指定 ``width`` 时，每轮按其当前返回值分批发出，前一批有通过者即不再发后续批次。
+    """
+    collection = list(items)
+    if not collection:
+        return [], 0
+    if max_tests is not None and max_tests <= 0:
+        return collection, 0
+    n = 2
+    tests = 0
+    while len(collection) >= 1:
+        subset_size = math.ceil(len(collection) / n)
+        starts = range(0, len(collection), subset_size)
+        complements = [collection[:start] + collection[start + subset_size :] for start in starts]
+        subsets = []
+        # 只有两个分块时子集与补集重复，无需额外测试
+        if include_subsets and len(starts) > 2:
+            subsets = [collection[start : start + subset_size] for start in starts]
+        configs = complements + subsets
+        if max_tests is not None:
+            if tests >= max_tests:
+                return collection, tests
+            configs = configs[: max_tests - tests]
+        winner = None
+        offset = 0
+        while offset < len(configs):
+            size = len(configs) if width is None else max(1, width())
+            tests += len(configs[offset : offset + size])
+            found = batch_test_func(configs[offset : offset + size])
+            if found is not None:
+                winner = offset + found
+                break
+            offset += size
+        if winner is None:
+            if len(configs) < len(complements) + len(subsets):
+                return collection, tests
+            if n >= len(collection):
+                break
+            n = min(len(collection), n * 2)
+        elif winner < len(complements):
+            collection = configs[winner]
+            n = max(n - 1, 2)
+        else:
+            collection = configs[winner]
+            n = 2
+    return collection, tests
+
+
+def _binary_split(items: Sequence, test_func, max_tests: Optional[int]) -> Tuple[List, int]:
+    """自适应分组测试：逐个二分查找必需元素，适合必需集合很小的输入。
+
+    维持不变式 ``test(required + rest)`` 为真（初始即完整输入）。每轮先测试
+    ``required`` 本身，失败时二分查找使 ``required + rest[:k]`` 通过的最短前缀，
+    ``rest[k-1]`` 即为必需元素，``rest[k:]`` 全部丢弃。必需元素为 r 个时约需
+    r·log2(n) + r + 1 次测试。
+    """
+    if not items:
+        return [], 0
+    if max_tests is not None and max_tests <= 0:
+        return list(items), 0
+    # 以下标运算，测试时按原始顺序还原元素
+    rest = list(range(len(items)))
+    required: List[int] = []
+    tests = 0
+
+    def pick(positions: List[int]) -> List:
+        return [items[i] for i in sorted(positions)]
+
+    while rest:
+        if max_tests is not None and tests >= max_tests:
+            break
+        tests += 1
+        if test_func(pick(required)):
+            rest = []
+            break
+        low, high = 1, len(rest)  # required + rest[:high] 已知通过
+        while low < high and (max_tests is None or tests < max_tests):
+            mid = (low + high) // 2
+            tests += 1
+            if test_func(pick(required + rest[:mid])):
+                high = mid
+            else:
+                low = mid + 1
+        if low < high:
+            rest = rest[:high]
+            break
+        required.append(rest[high - 1])
+        rest = rest[: high - 1]
+    return pick(required + rest), tests
+
+
+def _probdd(
+    items: Sequence,
+    test_func,
+    max_tests: Optional[int],
+    prior: float = 0.1,
+) -> Tuple[List, int]:
+    """概率化 delta debugging（ProbDD）：为每个元素维护“必需”概率。
+
+    每次选择使期望删除数 ``|T| · Π(1 - p_i)`` 最大的低概率元素集合 T 并测试其
+    补集；通过则删除 T，失败则按贝叶斯规则提高 T 中各元素的概率（单个元素
+    失败即确定为必需）。当前集合始终是最近一次通过的配置。
+    """
+    if not items:
+        return [], 0
+    if max_tests is not None and max_tests <= 0:
+        return list(items), 0
+    collection = list(range(len(items)))
+    probability = [prior] * len(items)
+    tests = 0
+    while max_tests is None or tests < max_tests:
+        # 稳定排序：概率相同时保持原始顺序
+        undecided = sorted((i for i in collection if probability[i] < 1.0), key=lambda i: probability[i])
+        if not undecided:
+            break
+        best_gain, best_size, survive = 0.0, 1, 1.0
+        for size, position in enumerate(undecided, start=1):
+            survive *= 1.0 - probability[position]
+            if size * survive > best_gain:
+                best_gain, best_size = size * survive, size
+        removal = set(undecided[:best_size])
+        remainder = [i for i in collection if i not in removal]
+        tests += 1
+        if test_func([items[i] for i in remainder]):
+            collection = remainder
+            continue
+        all_unneeded = 1.0
+        for position in removal:
+            all_unneeded *= 1.0 - probability[position]
+        for position in removal:
+            probability[position] = 1.0 if len(removal) == 1 else min(1.0, probability[position] / (1.0 - all_unneeded))
+    return [items[i] for i in collection], tests
+
+
+def _phase_order(order: Sequence[str]) -> List[str]:
+    """``minimization.order`` 去重后的阶段顺序，重复出现的阶段只执行第一次。
+
+    请求头阶段始终在请求体阶段之前（与加入查询参数阶段之前的行为一致），
+    ``query`` 阶段按其在 ``order`` 中的位置插入。
+    """
+    phases = [phase for phase in dict.fromkeys(order) if phase in ("headers", "body", "query")]
+    fixed = iter([phase for phase in ("headers", "body") if phase in phases])
+    return [phase if phase == "query" else next(fixed) for phase in phases]
+
+
+ALGORITHMS: Dict[str, Callable[[Sequence, Callable[[List], bool], Optional[int]], Tuple[List, int]]] = {
+    "ddmin": _ddmin,
+    "probdd": _probdd,
+    "binary": _binary_split,
+}
+
+
 class RequestMinimizer:
-    def __init__(self, config: Config, client: HttpClient, comparator: ResponseComparator):
+    def __init__(
+        self,
+        config: Config,
+        client: HttpClient,
+        comparator: ResponseComparator,
+        knowledge: Optional[KnowledgeBase] = None,
+        probe_width: Optional[Callable[[], int]] = None,
+        budget: Optional[ProbeBudget] = None,
+    ):
         self.config = config
+        self.budget = budget
+        self.knowledge = knowledge
+        # 调度器提供的单条目并发探测数（见 ``scheduling.WorkerSlots.width``）
+        self.probe_width = probe_width
         self.client = client
         self.comparator = comparator
+        self.groups = TemplateGroups(config.minimization.grouping) if config.minimization.grouping.enabled else None
+
+    def defer_grouped(self, request: RequestData, resume: Callable[[], None]) -> bool:
+        """按模板分组时，代表尚未发布方案的成员返回 True，可以处理时会调用 ``resume``。"""
+        if self.groups is None:
+            return False
+        return self.groups.defer(request, resolve_body_kind(request, self.config.minimization.body.body_type), resume)
+
+    def release_grouped(self, request: RequestData) -> None:
+        """请求处理完毕；未能发布方案的代表把身份交给等待的成员。"""
+        if self.groups is not None:
+            self.groups.release(request, resolve_body_kind(request, self.config.minimization.body.body_type))
 
     def minimize(self, request: RequestData) -> Tuple[Optional[ResponseSnapshot], MinimizationResult]:
         logger.info("正在处理请求 #%s %s", request.index, request.url)
         original_headers = deepcopy(request.headers)
         base_headers_dict = _headers_list_to_dict(original_headers)
-        baseline = self.client.send(request, base_headers_dict, request.body_text)
+        source = self.config.baseline_source
+        baseline = self._recorded_baseline(request) if source != "live" else None
+        recorded = baseline is not None
+        if baseline is None:
+            baseline = self._live_baseline(request, base_headers_dict)
         if not baseline.ok():
             logger.warning("请求 %s 的基线执行失败：%s", request.index, baseline.error)
-            result = MinimizationResult(
-                headers=original_headers,
-                body_text=request.body_text,
-                response=baseline,
-                matched=False,
-                header_candidates=len(original_headers),
-                body_candidates=0,
-                minimized_headers=len(original_headers),
-                minimized_body_fields=0,
-            )
+            return baseline, self._unminimized(request, original_headers, baseline)
+        try:
+            result = self._minimize_against(request, original_headers, base_headers_dict, baseline)
+            if recorded and result.response is baseline:
+                # 最终校验与回退都未能复现录制响应（或校准判定不确定）：录制响应可能已经过期
+                if source == "recorded-then-verify-on-mismatch":
+                    live = self._live_baseline(request, base_headers_dict)
+                    if live.ok() and not self.comparator.equivalent(baseline, live):
+                        logger.info("请求 %s 的实时响应与录制响应不一致，改用实时基线重新最小化", request.index)
+                        baseline = live
+                        result = self._minimize_against(request, original_headers, base_headers_dict, baseline)
+                elif result.matched:
+                    logger.warning("请求 %s 的原始请求未能复现录制响应", request.index)
+                    result.matched = False
             return baseline, result
+        except ProbeThrottledError as exc:
+            # 限流不代表不等价：放弃本条目的最小化并保留原始请求，而不是把它当作失败的测试
+            logger.warning("请求 %s 的探测持续被限流，保留原始请求：%s", request.index, exc)
+            return baseline, self._unminimized(request, original_headers, exc.snapshot)
 
-        remaining_tests = self.config.max_rounds_per_request
-        body_kind = resolve_body_kind(request, self.config.minimization.body.body_type)
-        headers_state = original_headers
-        header_candidates = 0
-        best_header_combo = (headers_state, baseline)
+    def _live_baseline(self, request: RequestData, headers: Dict[str, str]) -> ResponseSnapshot:
+        try:
+            return self.client.send(request, headers, request.body_text, keep_body=True)
+        except ProbeThrottledError as exc:
+            return exc.snapshot
 
-        if "headers" in self.config.minimization.order and self.config.minimization.headers.enabled:
-            headers_state, header_candidates, best_header_combo, tests = self._minimize_headers(
-                request,
-                headers_state,
-                baseline,
-                max(0, remaining_tests),
+    def _recorded_baseline(self, request: RequestData) -> Optional[ResponseSnapshot]:
+        """由 HAR 录制的响应构造基线；缺少比较所需的信息时返回 None，改为实时发送。"""
+        recorded = recorded_response(request.raw_entry)
+        if recorded is None:
+            reason = "没有可用的录制响应"
+        elif recorded.length < 0 and (self.config.comparator.length_check or self.config.calibration.enabled):
+            reason = "录制响应缺少正文长度"
+        elif recorded.body is None and (self._body_checks() or self.config.calibration.enabled):
+            # 正文检查与校准都需要基线正文：缺少正文时特征全部为 False，会被误判为不等价或不稳定
+            reason = "录制响应缺少正文"
+        else:
+            return recorded
+        logger.debug("请求 %s %s，改为实时发送基线", request.index, reason)
+        return None
+
+    def _body_checks(self) -> bool:
+        cfg = self.config.comparator
+        return bool(cfg.need_all or cfg.need_any or cfg.regex or cfg.json_structure)
+
+    def _minimize_against(
+        self,
+        request: RequestData,
+        original_headers: List[Dict[str, str]],
+        headers: Dict[str, str],
+        baseline: ResponseSnapshot,
+    ) -> MinimizationResult:
+        if self.config.calibration.enabled:
+            calibration = self._calibrate(request, headers, baseline)
+            if calibration.nondeterministic:
+                logger.warning("请求 %s 的响应不确定，跳过最小化：%s", request.index, calibration.reason)
+                result = self._unminimized(request, original_headers, baseline)
+            elif self.groups is not None:
+                result = self._minimize_grouped(request, original_headers, baseline)
+            else:
+                result = self._minimize(request, original_headers, baseline)
+            result.calibration = calibration.summary()
+            return result
+        if self.groups is not None:
+            return self._minimize_grouped(request, original_headers, baseline)
+        return self._minimize(request, original_headers, baseline)
+
+    def _calibrate(self, request: RequestData, headers: Dict[str, str], baseline: ResponseSnapshot) -> Calibration:
+        """再发送若干个与基线相同的请求，按观测到的噪声为本条目调整比较器。"""
+        cfg = self.config.calibration
+        samples = self.client.sample(request, headers, request.body_text, cfg.samples)
+        calibration = calibrate(self.comparator, baseline, samples, cfg)
+        if not calibration.nondeterministic and (calibration.masked or calibration.volatile or calibration.deviation):
+            logger.info(
+                "请求 %s 校准完成：长度偏差 %.3f，容差 %.3f，屏蔽检查 %s，易变 JSON 路径 %s 条",
+                request.index,
+                calibration.deviation,
+                calibration.length_tolerance,
+                "/".join(sorted(calibration.masked)) or "无",
+                len(calibration.volatile or ()),
             )
-            remaining_tests = max(0, remaining_tests - tests)
+        return calibration
+
+    def _minimize_grouped(
+        self, request: RequestData, original_headers: List[Dict[str, str]], baseline: ResponseSnapshot
+    ) -> MinimizationResult:
+        """同一端点模板只完整最小化一次：代表请求学到的方案用一个探测校验后套用到其余成员。"""
+        body_cfg = self.config.minimization.body
+        kind = resolve_body_kind(request, body_cfg.body_type)
+        group, representative = self.groups.join(request, kind)
+        if representative:
+            plan = None
+            try:
+                result = self._minimize(request, original_headers, baseline)
+                if result.matched:
+                    plan = learn_plan(
+                        request, kind, result.headers, result.body_text, not body_cfg.treat_empty_as_absent, result.url
+                    )
+                return result
+            finally:
+                # 代表失败时也要唤醒等待的成员，让它们各自完整最小化
+                group.publish(plan)
+        plan = group.plan
+        if plan is None:
+            # 代表失败，或调用方没有先用 ``defer_grouped`` 等待代表完成
+            return self._minimize(request, original_headers, baseline)
+        verified = self._verify_plan(request, original_headers, baseline, kind, plan)
+        if verified is not None:
+            return verified
+        logger.info("请求 %s 未通过模板校验（代表 #%s），改为完整最小化", request.index, plan.representative)
+        result = self._minimize(request, original_headers, baseline)
+        result.tests = {"template": 1, **result.tests}
+        return result
+
+    def _verify_plan(
+        self,
+        request: RequestData,
+        original_headers: List[Dict[str, str]],
+        baseline: ResponseSnapshot,
+        kind: str,
+        plan: TemplatePlan,
+    ) -> Optional[MinimizationResult]:
+        body_cfg = self.config.minimization.body
+        headers = plan.apply_headers(original_headers)
+        body_text = plan.apply_body(kind, request.body_text, not body_cfg.treat_empty_as_absent)
+        url = plan.apply_url(request.url)
+        response = self.client.send(request, _headers_list_to_dict(headers), body_text, keep_body=True, url=url)
+        if not self.comparator.equivalent(baseline, response):
+            return None
+        logger.info("请求 %s 套用代表 #%s 的最小化结果并校验通过", request.index, plan.representative)
+        return MinimizationResult(
+            headers=headers,
+            body_text=body_text,
+            response=response,
+            matched=True,
+            header_candidates=len(original_headers),
+            body_candidates=count_body_fields(kind, request.body_text),
+            minimized_headers=len(headers),
+            minimized_body_fields=count_body_fields(kind, body_text),
+            algorithm="template",
+            tests={"template": 1},
+            url=url if url != request.url else None,
+            query_candidates=len(QueryString(request.url).params) if plan.removed_query else 0,
+        )
+
+    @staticmethod
+    def _unminimized(
+        request: RequestData, original_headers: List[Dict[str, str]], response: ResponseSnapshot
+    ) -> MinimizationResult:
+        return MinimizationResult(
+            headers=original_headers,
+            body_text=request.body_text,
+            response=response,
+            matched=False,
+            header_candidates=len(original_headers),
+            body_candidates=0,
+            minimized_headers=len(original_headers),
+            minimized_body_fields=0,
+        )
+
+    def _phase_plan(self, request: RequestData) -> List[PhasePlan]:
+        """按候选数估计各阶段所需的探测数，并以可删除的字节数作为分配权重，顺序与执行顺序一致。"""
+        cfg = self.config.minimization
+        max_tests = self.config.max_rounds_per_request
+        header_count, body_count, query_count = count_candidates(request, self.config)
+        plan: List[PhasePlan] = []
+        body_size = float(len(request.body_text or ""))
+        for phase in _phase_order(cfg.order):
+            if phase == "headers" and cfg.headers.enabled:
+                _, candidates = split_header_candidates(request.headers, cfg.headers)
+                size = sum(len(h.get("name", "")) + len(h.get("value", "")) for h in candidates)
+                plan.append(("headers", expected_probes(header_count, max_tests), float(size)))
+            elif phase == "body" and cfg.body.enabled:
+                plan.append(("body", expected_probes(body_count, max_tests), body_size))
+            elif phase == "query" and cfg.query.enabled:
+                _, params = split_query_candidates(QueryString(request.url).params, cfg.query)
+                size = sum(len(param.raw) + 1 for param in params)
+                plan.append(("query", expected_probes(query_count, max_tests), float(size)))
+        if cfg.body.try_blank_values and body_count:
+            # 置空只能缩短保留字段的值，收益按请求体的一小部分估计
+            plan.append(("blank_values", expected_probes(body_count, max_tests) / 2, body_size / 4))
+        return plan
+
+    def _minimize(
+        self, request: RequestData, original_headers: List[Dict[str, str]], baseline: ResponseSnapshot
+    ) -> MinimizationResult:
+        if self.budget is None:
+            return self._run_phases(request, original_headers, baseline, None, [])
+        plan = self._phase_plan(request)
+        entry_budget = self.budget.open(sum(need for _, need, _ in plan))
+        try:
+            result = self._run_phases(request, original_headers, baseline, entry_budget, plan)
+            result.budget = entry_budget.summary()
+            return result
+        finally:
+            self.budget.close(entry_budget)
+
+    def _run_phases(
+        self,
+        request: RequestData,
+        original_headers: List[Dict[str, str]],
+        baseline: ResponseSnapshot,
+        entry_budget: Optional[EntryBudget],
+        plan: List[PhasePlan],
+    ) -> MinimizationResult:
+        remaining_tests = self.config.max_rounds_per_request
+        tests_used: Dict[str, int] = {}
+
+        def allowance(phase: str, default: Optional[int]) -> Optional[int]:
+            if entry_budget is None:
+                return default
+            names = [name for name, _, _ in plan]
+            return entry_budget.allow(plan[names.index(phase) :]) if phase in names else 0
+
+        def spend(phase: str, tests: int) -> None:
+            tests_used[phase] = tests
+            if entry_budget is not None:
+                entry_budget.spend(phase, tests)
 
-        body_state = request.body_text
-        body_candidates = 0
-        best_body_combo = (body_state, best_header_combo[1])
-        if "body" in self.config.minimization.order and self.config.minimization.body.enabled:
-            (
-                body_state,
-                body_candidates,
-                best_body_combo,
-                tests,
-            ) = self._minimize_body(request, headers_state, baseline, max(0, remaining_tests))
+        cfg = self.config.minimization
+        body_kind = resolve_body_kind(request, cfg.body.body_type)
+        # 各阶段依次执行（顺序见 ``_phase_order``），后面的阶段在前面阶段的结果上继续：
+        # current 携带当前的 URL/查询参数与请求体，请求头单独维护
+        current = request
+        headers_state = original_headers
+        header_candidates = body_candidates = query_candidates = 0
+        # 各阶段的最佳状态（请求, 请求头, 响应），未删除任何项的阶段记录基线响应；
+        # 最终校验失败时从后往前回退，与原先先回退请求体、再回退请求头的顺序一致
+        accepted: List[Tuple[RequestData, List[Dict[str, str]], ResponseSnapshot]] = []
+
+        for phase in _phase_order(cfg.order):
+            if phase == "headers" and cfg.headers.enabled:
+                headers_state, header_candidates, (best_headers, response), tests = self._minimize_headers(
+                    current, headers_state, baseline, allowance("headers", max(0, remaining_tests))
+                )
+                accepted.append((current, best_headers, response))
+            elif phase == "body" and cfg.body.enabled:
+                body_state, body_candidates, (best_body, response), tests = self._minimize_body(
+                    current, headers_state, baseline, allowance("body", max(0, remaining_tests))
+                )
+                accepted.append((replace(current, body_text=best_body), headers_state, response))
+                current = replace(current, body_text=body_state)
+            elif phase == "query" and cfg.query.enabled:
+                current, query_candidates, (best_request, response), tests = self._minimize_query(
+                    current, headers_state, baseline, allowance("query", max(0, remaining_tests))
+                )
+                accepted.append((best_request, headers_state, response))
+            else:
+                continue
+            spend(phase, tests)
             remaining_tests = max(0, remaining_tests - tests)
 
         final_headers = headers_state
-        final_body = body_state
-        final_response = self.client.send(request, _headers_list_to_dict(final_headers), final_body)
+        # 最终状态通常就是最后一个阶段通过的探测，相对同一基线的结论可直接从缓存复用
+        final_response = self.client.send(
+            current, _headers_list_to_dict(final_headers), current.body_text, keep_body=True, reference=baseline
+        )
         matched = self.comparator.equivalent(baseline, final_response)
         if not matched:
             logger.info("最终校验失败，正在尝试回退策略（请求 %s）", request.index)
-            fallback_headers, fallback_response = best_header_combo
-            fallback_body, fallback_body_response = best_body_combo
-            if fallback_body_response and self.comparator.equivalent(baseline, fallback_body_response):
-                final_body = fallback_body
-                final_headers = final_headers
-                final_response = fallback_body_response
-                matched = True
-            elif fallback_response and self.comparator.equivalent(baseline, fallback_response):
-                final_headers = fallback_headers
-                final_body = request.body_text
-                final_response = fallback_response
-                matched = True
-            else:
-                final_headers = original_headers
-                final_body = request.body_text
-                final_response = baseline
-                matched = True  # 回退至基线请求
+            fallback = next(
+                (combo for combo in reversed(accepted) if self.comparator.equivalent(baseline, combo[2])), None
+            )
+            # 没有可用的通过状态时回退至基线请求
+            current, final_headers, final_response = fallback or (request, original_headers, baseline)
+            matched = True
+        final_body = current.body_text
         # 额外尝试将剩余字段值置空
-        if matched and self.config.minimization.body.try_blank_values:
-            blank_attempt = self._try_blank_body_values(
-                request=request,
+        if matched and cfg.body.try_blank_values:
+            blank_attempt, tests = self._try_blank_body_values(
+                request=current,
                 headers=final_headers,
                 baseline=baseline,
                 body_kind=body_kind,
                 current_body=final_body,
+                max_tests=allowance("blank_values", None),
             )
+            spend("blank_values", tests)
             if blank_attempt is not None:
                 final_body, final_response = blank_attempt
                 matched = self.comparator.equivalent(baseline, final_response)
         final_body_fields = count_body_fields(body_kind, final_body)
-        result = MinimizationResult(
+        return MinimizationResult(
             headers=final_headers,
             body_text=final_body,
             response=final_response,
@@ -209,8 +647,168 @@ class RequestMinimizer:
             body_candidates=body_candidates,
             minimized_headers=len(final_headers),
             minimized_body_fields=final_body_fields,
+            algorithm=cfg.algorithm,
+            tests=tests_used,
+            url=current.url if current.url != request.url else None,
+            query_candidates=query_candidates,
         )
-        return baseline, result
+
+    def _search(
+        self,
+        request: RequestData,
+        baseline: ResponseSnapshot,
+        items: Sequence,
+        build_probe: Callable[[List], Tuple[Any, Dict[str, str], Optional[str]]],
+        max_tests: Optional[int],
+        url_of: Optional[Callable[[Any], str]] = None,
+    ) -> Tuple[List, int, Optional[Tuple[Any, ResponseSnapshot]]]:
+        """对 ``items`` 执行所选的最小化算法，返回最小集合、测试次数与最后一次通过的状态。
+
+        ``build_probe`` 把候选子集转换为 ``(状态, headers, body)``，
+        状态会与对应响应一起作为回退记录返回。给出 ``url_of`` 时探测发往
+        由状态得到的 URL（查询参数阶段），否则发往 ``request.url``。
+
+        运行截止时间到达时立即中止搜索，返回最后一次通过的子集（没有则为完整
+        输入）与实际发出的测试数；调用方可通过 ``self.budget.expired()`` 判断
+        结果是否被截断。
+        """
+        accepted: Optional[Tuple[Any, ResponseSnapshot]] = None
+        passing: Optional[List] = None
+        sent = 0
+
+        def test(active: List) -> bool:
+            nonlocal accepted, passing, sent
+            if self.budget is not None and self.budget.expired():
+                raise _DeadlineReached
+            state, headers, body = build_probe(active)
+            url = url_of(state) if url_of is not None else None
+            sent += 1
+            response = self.client.send(request, headers, body, reference=baseline, url=url)
+            if self.comparator.equivalent(baseline, response):
+                accepted = (state, response)
+                passing = list(active)
+                return True
+            return False
+
+        def batch_test(configs: List[List]) -> Optional[int]:
+            nonlocal accepted, passing, sent
+            if self.budget is not None and self.budget.expired():
+                raise _DeadlineReached
+            built = [build_probe(active) for active in configs]
+            sent += len(built)
+            responses = self.client.send_many(
+                request,
+                [(headers, body) for _, headers, body in built],
+                first_match=lambda response: self.comparator.equivalent(baseline, response),
+                reference=baseline,
+                urls=[url_of(state) for state, _, _ in built] if url_of is not None else None,
+            )
+            for index, response in enumerate(responses):
+                if response is not None and self.comparator.equivalent(baseline, response):
+                    accepted = (built[index][0], response)
+                    passing = list(configs[index])
+                    return index
+            return None
+
+        cfg = self.config.minimization
+        try:
+            if cfg.parallel and cfg.algorithm == "ddmin":
+                minimized, tests = _ddmin_parallel(items, batch_test, max_tests, cfg.speculate_subsets)
+            elif self.probe_width is not None and cfg.algorithm == "ddmin":
+                # 宽度为 1 时与串行 ddmin 完全相同；队列排空后借用空闲名额分批并发
+                minimized, tests = _ddmin_parallel(items, batch_test, max_tests, width=self.probe_width)
+            else:
+                minimized, tests = ALGORITHMS[cfg.algorithm](items, test, max_tests)
+        except _DeadlineReached:
+            minimized = passing if passing is not None else list(items)
+            tests = sent
+            logger.info("请求 %s 的搜索因到达截止时间而中止，保留最后一次通过的 %s 项", request.index, len(minimized))
+        return minimized, tests, accepted
+
+    def _search_with_knowledge(
+        self,
+        request: RequestData,
+        baseline: ResponseSnapshot,
+        section: str,
+        items: Sequence,
+        name_of: Callable[[Any], str],
+        build_probe: Callable[[List], Tuple[Any, Dict[str, str], Optional[str]]],
+        max_tests: int,
+        url_of: Optional[Callable[[Any], str]] = None,
+    ) -> Tuple[List, int, Optional[Tuple[Any, ResponseSnapshot]]]:
+        """在 ``_search`` 之前应用知识库：已知必需项不参与搜索，已知无关项先用一个探测整体删除。
+
+        开局探测失败说明“无关”结论已不成立，相关条目会被移出知识库。已知必需项
+        在搜索结束后逐个单独删除复核，删除后仍等价说明该结论已不成立（分区按主机 +
+        路径前缀划分，同一分区下的其他端点未必需要它），该项随之删除并移出知识库。
+        结束后把本次删除的项记为无关；搜索在预算内完成时把保留的项记为必需。
+        """
+        if self.knowledge is None:
+            return self._search(request, baseline, items, build_probe, max_tests, url_of)
+        scope = self.knowledge.scope_for(request.url)
+        verdicts = self.knowledge.verdicts(scope, section)
+        position = {id(item): index for index, item in enumerate(items)}
+        required = [item for item in items if verdicts.get(name_of(item)) == REQUIRED]
+        irrelevant = [item for item in items if verdicts.get(name_of(item)) == IRRELEVANT]
+        candidates = [item for item in items if verdicts.get(name_of(item)) != REQUIRED]
+        tests = 0
+        accepted: Optional[Tuple[Any, ResponseSnapshot]] = None
+
+        def with_required(active: List) -> List:
+            return sorted(required + list(active), key=lambda item: position[id(item)])
+
+        if irrelevant and max_tests > 0:
+            dropped = {id(item) for item in irrelevant}
+            remaining = [item for item in candidates if id(item) not in dropped]
+            state, headers, body = build_probe(with_required(remaining))
+            url = url_of(state) if url_of is not None else None
+            response = self.client.send(request, headers, body, reference=baseline, url=url)
+            tests += 1
+            if self.comparator.equivalent(baseline, response):
+                accepted = (state, response)
+                candidates = remaining
+            else:
+                logger.info("请求 %s 无法按知识库删除 %s 个已知无关项，相关结论已失效", request.index, len(irrelevant))
+                self.knowledge.invalidate(scope, section, [name_of(item) for item in irrelevant])
+        minimized, search_tests, search_accepted = self._search(
+            request,
+            baseline,
+            candidates,
+            lambda active: build_probe(with_required(active)),
+            max_tests - tests,
+            url_of,
+        )
+        tests += search_tests
+        accepted = search_accepted or accepted
+        contradicted: List = []
+        verified = 0
+        for item in list(required):
+            if tests >= max_tests or (self.budget is not None and self.budget.expired()):
+                break
+            required = [other for other in required if other is not item]
+            state, headers, body = build_probe(with_required(minimized))
+            url = url_of(state) if url_of is not None else None
+            response = self.client.send(request, headers, body, reference=baseline, url=url)
+            tests += 1
+            verified += 1
+            if self.comparator.equivalent(baseline, response):
+                accepted = (state, response)
+                contradicted.append(item)
+            else:
+                required.append(item)
+        if contradicted:
+            logger.info("请求 %s 删除了 %s 个知识库中的已知必需项，相关结论已失效", request.index, len(contradicted))
+        kept = {id(item) for item in minimized}
+        # 截止时间到达时搜索被截断，保留下来的项未必必需
+        expired = self.budget is not None and self.budget.expired()
+        complete = tests < max_tests and not expired and verified == len(required) + len(contradicted)
+        self.knowledge.record(
+            scope,
+            section,
+            removed=[name_of(item) for item in candidates + contradicted if id(item) not in kept],
+            kept=[name_of(item) for item in minimized + required] if complete else [],
+        )
+        return with_required(minimized), tests, accepted
 
     def _minimize_headers(
         self,
@@ -219,41 +817,60 @@ class RequestMinimizer:
         baseline: ResponseSnapshot,
         max_tests: int,
     ) -> Tuple[List[Dict[str, str]], int, Tuple[List[Dict[str, str]], ResponseSnapshot], int]:
-        cfg = self.config.minimization.headers
-        protected = {h.lower() for h in cfg.protected}
-        ignored = {h.lower() for h in cfg.ignore}
-        regexes = [re.compile(pattern, re.IGNORECASE) for pattern in cfg.candidate_regex]
-        candidates: List[Dict[str, str]] = []
-        fixed: List[Dict[str, str]] = []
-        for header in current_headers:
-            name = header.get("name", "").lower()
-            if name in protected or name in ignored:
-                fixed.append(header)
-                continue
-            if regexes and not any(r.search(name) for r in regexes):
-                fixed.append(header)
-                continue
-            candidates.append(header)
+        fixed, candidates = split_header_candidates(current_headers, self.config.minimization.headers)
         if not candidates:
             return current_headers, 0, (current_headers, baseline), 0
 
-        best_state = (current_headers, baseline)
+        fragments = HeaderFragments(fixed, candidates)
 
-        def test(active_headers: List[Dict[str, str]]) -> bool:
-            nonlocal best_state
-            headers = fixed + active_headers
-            response = self.client.send(request, _headers_list_to_dict(headers), request.body_text)
-            if self.comparator.equivalent(baseline, response):
-                best_state = (headers, response)
-                return True
-            return False
+        def build_probe(active_headers: List[Dict[str, str]]):
+            return fixed + active_headers, fragments.build(active_headers), request.body_text
 
-        minimized, tests = _ddmin(candidates, test, max_tests)
+        minimized, tests, accepted = self._search_with_knowledge(
+            request, baseline, "headers", candidates, lambda h: h.get("name", "").lower(), build_probe, max_tests
+        )
+        best_state = accepted or (current_headers, baseline)
         minimized_headers = fixed + minimized
         if best_state[0] != minimized_headers:
             minimized_headers = best_state[0]
         return minimized_headers, len(candidates), best_state, tests
 
+    def _minimize_query(
+        self,
+        request: RequestData,
+        headers: List[Dict[str, str]],
+        baseline: ResponseSnapshot,
+        max_tests: int,
+    ) -> Tuple[RequestData, int, Tuple[RequestData, ResponseSnapshot], int]:
+        """最小化查询参数：URL 只拆分一次，每个探测按所选参数的原始片段重新拼接。
+
+        返回的请求携带精简后的 ``url`` 与 ``query``，供后续阶段与最终校验使用。
+        """
+        url = QueryString(request.url)
+        fixed, candidates = split_query_candidates(url.params, self.config.minimization.query)
+        if not candidates:
+            return request, 0, (request, baseline), 0
+        headers_dict = _headers_list_to_dict(headers)
+
+        def build_probe(active: List):
+            return url.build(fixed + active), headers_dict, request.body_text
+
+        minimized, tests, accepted = self._search_with_knowledge(
+            request,
+            baseline,
+            "query",
+            candidates,
+            lambda param: param.name,
+            build_probe,
+            max_tests,
+            url_of=lambda probe_url: probe_url,
+        )
+        if accepted is None:
+            return request, len(candidates), (request, baseline), tests
+        best_url, response = accepted
+        best = replace(request, url=best_url, query=query_dict(best_url))
+        return best, len(candidates), (best, response), tests
+
     def _minimize_body(
         self,
         request: RequestData,
@@ -262,6 +879,13 @@ class RequestMinimizer:
         max_tests: int,
     ) -> Tuple[Optional[str], int, Tuple[Optional[str], ResponseSnapshot], int]:
         cfg = self.config.minimization.body
+        if cfg.hierarchical and resolve_body_kind(request, cfg.body_type) == "json":
+            try:
+                tree = json.loads(request.body_text) if request.body_text else None
+            except json.JSONDecodeError:
+                tree = None
+            if isinstance(tree, (dict, list)):
+                return self._minimize_json_tree(request, headers, baseline, max_tests, tree)
         kind, parsed = _parse_body(request, cfg.body_type)
         if parsed is None or not parsed:
             return request.body_text, 0, (request.body_text, baseline), 0
@@ -271,39 +895,90 @@ class RequestMinimizer:
         if not candidates:
             return request.body_text, 0, (request.body_text, baseline), 0
 
-        fixed = {k: v for k, v in parsed.items() if k not in candidates}
         candidate_items = list(candidates.items())
-        best_state = (request.body_text, baseline)
-
         candidate_keys = [k for k, _ in candidate_items]
+        fragments = BodyFragments(kind, parsed)
+        fixed = [fragments.fragment(k) for k in parsed if k not in candidates]
 
-        def build_body(active_items: List[Tuple[str, str]]) -> Dict[str, str]:
-            merged = dict(fixed)
-            active_lookup = {k: v for k, v in active_items}
-            for key, value in active_lookup.items():
-                merged[key] = value
+        def build_body(active_items: List[Tuple[str, str]]) -> str:
+            # 顺序与逐键合并字典一致：固定键、保留的候选键、（不视空值为缺失时）置空的其余候选键
+            active = dict.fromkeys(k for k, _ in active_items)
+            parts = fixed + [fragments.fragment(k) for k in active]
             if not cfg.treat_empty_as_absent:
-                for key in candidate_keys:
-                    if key not in active_lookup:
-                        merged[key] = ""
-            return merged
-
-        def test(active_items: List[Tuple[str, str]]) -> bool:
-            nonlocal best_state
-            body_map = build_body(active_items)
-            body_text = _build_body_text(kind, body_map)
-            response = self.client.send(request, _headers_list_to_dict(headers), body_text)
-            if self.comparator.equivalent(baseline, response):
-                best_state = (body_text, response)
-                return True
-            return False
+                parts += [fragments.blank(k) for k in candidate_keys if k not in active]
+            return fragments.join(parts)
+
+        headers_dict = _headers_list_to_dict(headers)
 
-        minimized, tests = _ddmin(candidate_items, test, max_tests)
+        def build_probe(active_items: List[Tuple[str, str]]):
+            body_text = build_body(active_items)
+            return body_text, headers_dict, body_text
+
+        minimized, tests, accepted = self._search_with_knowledge(
+            request, baseline, "body", candidate_items, lambda item: item[0], build_probe, max_tests
+        )
+        best_state = accepted or (request.body_text, baseline)
         final_body, _ = best_state
         if final_body is None:
-            final_body = _build_body_text(kind, build_body(minimized))
+            final_body = build_body(minimized)
         return final_body, len(candidate_items), best_state, tests
 
+    def _minimize_json_tree(
+        self,
+        request: RequestData,
+        headers: List[Dict[str, str]],
+        baseline: ResponseSnapshot,
+        max_tests: int,
+        tree: Any,
+    ) -> Tuple[Optional[str], int, Tuple[Optional[str], ResponseSnapshot], int]:
+        """分层 delta debugging：逐层最小化 JSON 树，先整体删除子树，只展开保留下来的节点。"""
+        cfg = self.config.minimization.body
+        rules = JsonPathRules(cfg.protected_keys, cfg.only_keys)
+        blank = not cfg.treat_empty_as_absent
+        headers_dict = _headers_list_to_dict(headers)
+        removed: Set[JsonPath] = set()
+        best_state: Tuple[Optional[str], ResponseSnapshot] = (request.body_text, baseline)
+        frontier: List[Tuple[JsonPath, Any]] = [((), tree)]
+        total_candidates = 0
+        total_tests = 0
+        depth = 0
+        while frontier and (cfg.max_depth is None or depth < cfg.max_depth):
+            depth += 1
+            candidates: List[Tuple[JsonPath, Any]] = []
+            expand: List[Tuple[JsonPath, Any]] = []
+            for path, value in frontier:
+                for child_path, child in iter_children(path, value):
+                    kind = rules.classify(child_path)
+                    if kind == CANDIDATE:
+                        candidates.append((child_path, child))
+                    elif kind == ANCESTOR:
+                        expand.append((child_path, child))
+            if candidates:
+                if total_tests >= max_tests:
+                    break
+                level_paths = [path for path, _ in candidates]
+
+                def build_probe(active: List[Tuple[JsonPath, Any]], level_paths=level_paths):
+                    kept = {path for path, _ in active}
+                    dropped = removed | {path for path in level_paths if path not in kept}
+                    body_text = json.dumps(render(tree, dropped, blank), separators=(",", ":"))
+                    return body_text, headers_dict, body_text
+
+                minimized, tests, accepted = self._search(
+                    request, baseline, candidates, build_probe, max_tests - total_tests
+                )
+                total_tests += tests
+                total_candidates += len(candidates)
+                kept_paths = {path for path, _ in minimized}
+                removed |= {path for path in level_paths if path not in kept_paths}
+                if accepted is not None:
+                    best_state = accepted
+                expand.extend(item for item in candidates if item[0] in kept_paths)
+            frontier = [(path, value) for path, value in expand if isinstance(value, (dict, list))]
+        if removed:
+            logger.debug("请求 %s 删除的 JSON 节点：%s", request.index, ", ".join(sorted(map(format_path, removed))))
+        return best_state[0], total_candidates, best_state, total_tests
+
     def _try_blank_body_values(
         self,
         request: RequestData,
@@ -311,51 +986,49 @@ class RequestMinimizer:
         baseline: ResponseSnapshot,
         body_kind: str,
         current_body: Optional[str],
-    ) -> Optional[Tuple[Optional[str], ResponseSnapshot]]:
+        max_tests: Optional[int] = None,
+    ) -> Tuple[Optional[Tuple[Optional[str], ResponseSnapshot]], int]:
+        """返回（更精简且校验通过的状态或 None, 测试次数）。"""
         if body_kind not in {"json", "form"} or not current_body:
-            return None
+            return None, 0
         cfg = self.config.minimization.body
         try:
             if body_kind == "json":
                 parsed = json.loads(current_body) if current_body else {}
                 if not isinstance(parsed, dict):
-                    return None
+                    return None, 0
             else:
                 parsed = dict(parse_qsl(current_body, keep_blank_values=True))
         except json.JSONDecodeError:
-            return None
+            return None, 0
         protected = set(cfg.protected_keys)
         only = set(cfg.only_keys) if cfg.only_keys else None
         candidate_keys = [k for k in parsed.keys() if k not in protected and (not only or k in only)]
         if not candidate_keys:
-            return None
-        best_state: Tuple[Optional[str], Optional[ResponseSnapshot]] = (current_body, None)
+            return None, 0
+        fragments = BodyFragments(body_kind, parsed)
+        candidate_set = set(candidate_keys)
 
-        def build_body(active_keys: List[str]) -> Dict[str, str]:
-            # active_keys = 保留原值的键，其余置空
-            body_map = dict(parsed)
+        def build_body(active_keys: List[str]) -> str:
+            # active_keys = 保留原值的键，其余候选键置空，键的顺序不变
             keep = set(active_keys)
-            for key in candidate_keys:
-                if key not in keep:
-                    body_map[key] = ""
-            return body_map
-
-        def test(active_keys: List[str]) -> bool:
-            nonlocal best_state
-            body_map = build_body(active_keys)
-            body_text = _build_body_text(body_kind, body_map)
-            response = self.client.send(request, _headers_list_to_dict(headers), body_text)
-            if self.comparator.equivalent(baseline, response):
-                best_state = (body_text, response)
-                return True
-            return False
+            return fragments.join(
+                fragments.blank(key) if key in candidate_set and key not in keep else fragments.fragment(key)
+                for key in parsed
+            )
+
+        headers_dict = _headers_list_to_dict(headers)
 
-        minimized_keep, _ = _ddmin(candidate_keys, test, None)
-        body_map = build_body(minimized_keep)
-        body_text = _build_body_text(body_kind, body_map)
-        response = self.client.send(request, _headers_list_to_dict(headers), body_text)
+        def build_probe(active_keys: List[str]):
+            body_text = build_body(active_keys)
+            return body_text, headers_dict, body_text
+
+        minimized_keep, tests, accepted = self._search(request, baseline, candidate_keys, build_probe, max_tests)
+        best_state: Tuple[Optional[str], Optional[ResponseSnapshot]] = accepted or (current_body, None)
+        body_text = build_body(minimized_keep)
+        response = self.client.send(request, headers_dict, body_text, keep_body=True, reference=baseline)
         if self.comparator.equivalent(baseline, response):
             best_state = (body_text, response)
         if best_state[1] and best_state[0] != current_body:
-            return best_state  # 返回更精简且校验通过的版本
-        return None
+            return best_state, tests  # 返回更精简且校验通过的版本
+        return None, tests
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, MutableMapping, Optional
+from typing import Any, Dict, List, MutableMapping, Optional, Tuple
 
 
 @dataclass
@@ -22,23 +22,64 @@ class RequestData:
         return {h["name"].lower(): h.get("value", "") for h in self.headers}
 
 
-@dataclass
+@dataclass(slots=True)
 class ResponseSnapshot:
+    """一次探测的响应。
+
+    探测响应默认是紧凑形式：只保留状态码、长度、正文摘要以及比较器在接收时
+    预先提取的特征，``body`` 与 ``headers`` 为空；基线与最终响应（或配置
+    ``client.keep_response_bodies``）才保留完整正文。
+    """
+
     status_code: Optional[int]
-    body: Optional[str]
+    body: Optional[bytes]
     error: Optional[str]
     elapsed: float
     headers: MutableMapping[str, str] = field(default_factory=dict)
+    length: Optional[int] = None  # 字节数
+    digest: Optional[str] = None
+    features: Optional[Tuple[bool, ...]] = None
+    timed_out: bool = False
+    # 基线响应的 JSON 结构指纹（``json_shape.JsonFingerprint``），由比较器首次使用时计算；
+    # False 表示正文不是 JSON
+    fingerprint: Any = None
+    # 基线校准结果（``calibration.Calibration``），未校准时为 None
+    calibration: Any = None
 
-    @property
-    def length(self) -> int:
-        if self.body is None:
-            return 0
-        return len(self.body)
+    def __post_init__(self) -> None:
+        if self.length is None:
+            self.length = len(self.body) if self.body is not None else 0
 
     def ok(self) -> bool:
         return self.error is None and self.status_code is not None
 
+    def compact(self) -> "ResponseSnapshot":
+        return ResponseSnapshot(
+            status_code=self.status_code,
+            body=None,
+            error=self.error,
+            elapsed=self.elapsed,
+            length=self.length,
+            digest=self.digest,
+            features=self.features,
+        )
+
+
+@dataclass
+class ProbeStats:
+    """单个条目的探测计数。"""
+
+    cache_hits: int = 0
+    cache_misses: int = 0
+    journal_hits: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "journal_hits": self.journal_hits,
+        }
+
 
 @dataclass
 class MinimizationResult:
@@ -50,6 +91,13 @@ class MinimizationResult:
     body_candidates: int
     minimized_headers: int
     minimized_body_fields: int
+    algorithm: Optional[str] = None
+    tests: Dict[str, int] = field(default_factory=dict)
+    budget: Dict[str, Any] = field(default_factory=dict)
+    calibration: Dict[str, Any] = field(default_factory=dict)
+    # 删除了查询参数时为精简后的 URL，否则为 None
+    url: Optional[str] = None
+    query_candidates: int = 0
 
 
 @dataclass
@@ -69,10 +117,18 @@ class ReportEntry:
     minimized_headers: List[Dict[str, str]]
     minimized_body: Optional[str]
     error: Optional[str] = None
+    probes: Dict[str, Any] = field(default_factory=dict)
+    algorithm: Optional[str] = None
+    tests: Dict[str, int] = field(default_factory=dict)
+    budget: Dict[str, Any] = field(default_factory=dict)
+    calibration: Dict[str, Any] = field(default_factory=dict)
+    minimized_url: Optional[str] = None
+    minimized_query: Dict[str, Any] = field(default_factory=dict)
+    query_counts: Dict[str, int] = field(default_factory=dict)
 
 
 @dataclass
 class ProcessedRequest:
     request: RequestData
-    baseline: ResponseSnapshot
+    baseline: Optional[ResponseSnapshot]
     result: MinimizationResult
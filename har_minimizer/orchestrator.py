@@ -1,17 +1,31 @@
 from __future__ import annotations
 
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Tuple
+from collections import deque
+from dataclasses import replace
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Deque, Iterable, List, Optional, Set, Tuple
 
+from .budget import ProbeBudget
 from .comparator import ResponseComparator
 from .config import Config
 from .filtering import RequestFilter
-from .har_loader import HarLoader
+from .har_loader import HarEntry, HarLoader
 from .http_client import HttpClient
+from .journal import ProbeJournal
+from .knowledge import KnowledgeBase
 from .minimizer import RequestMinimizer, count_body_fields, resolve_body_kind
-from .models import MinimizationResult, ProcessedRequest, ReportEntry, RequestData, ResponseSnapshot
-from .reporting import HarExporter, ReportWriter
+from .models import MinimizationResult, ProbeStats, ProcessedRequest, ReportEntry, RequestData, ResponseSnapshot
+from .query_string import QueryString, query_dict
+from .replay import ReplayTransport
+from .scheduling import EntryQueue, LatencyTracker, WorkerSlots
+from .reporting import (
+    HarExporter,
+    JsonlReportWriter,
+    ReportWriter,
+    StreamingHarExporter,
+    convert_jsonl_report,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -19,33 +33,160 @@ logger = logging.getLogger(__name__)
 class MinimizationOrchestrator:
     def __init__(self, config: Config):
         self.config = config
-        self.loader = HarLoader(config.input_har)
-        self.client = HttpClient(config.client)
+        self.loader = HarLoader(config.input_har, keep_response_body=config.loader.keep_response_body)
+        self.journal = ProbeJournal(config.journal_path, resume=config.resume) if config.journal_path else None
         self.comparator = ResponseComparator(config.comparator)
+        transport = None
+        if config.client.backend == "replay":
+            transport = ReplayTransport(
+                config.client.replay.har_path or config.input_har,
+                rules_path=config.client.replay.rules_path,
+            )
+        self.client = HttpClient(config.client, journal=self.journal, comparator=self.comparator, transport=transport)
         self.request_filter = RequestFilter(config.filters, config.scope)
-        self.minimizer = RequestMinimizer(config, self.client, self.comparator)
+        self.knowledge = (
+            KnowledgeBase(config.knowledge.path, prefix_segments=config.knowledge.prefix_segments)
+            if config.knowledge.path
+            else None
+        )
+        self.latency: Optional[LatencyTracker] = None
+        self.slots: Optional[WorkerSlots] = None
+        if config.scheduling.enabled:
+            self.latency = LatencyTracker()
+            if config.scheduling.work_stealing:
+                self.slots = WorkerSlots(config.client.rate_limit.max_concurrent)
+        self.budget: Optional[ProbeBudget] = None
+        if config.budget.total_probes is not None or config.budget.deadline_seconds is not None:
+            self.budget = ProbeBudget(config.budget, per_entry=config.max_rounds_per_request)
+        self.minimizer = RequestMinimizer(
+            config,
+            self.client,
+            self.comparator,
+            knowledge=self.knowledge,
+            probe_width=self.slots.width if self.slots is not None else None,
+            budget=self.budget,
+        )
+        self._report_stream: Optional[JsonlReportWriter] = None
 
     def run(self) -> List[ReportEntry]:
-        entries = self.loader.load()
-        filtered = self.request_filter.apply(entries)
-        logger.info("共载入 %s 个请求，筛选后剩余 %s 个", len(entries), len(filtered))
+        if self.config.loader.streaming:
+            filtered: Iterable[HarEntry] = self.request_filter.iter_apply(self.loader.iter_entries())
+        else:
+            entries = self.loader.load()
+            filtered = self.request_filter.apply(entries)
+            logger.info("共载入 %s 个请求，筛选后剩余 %s 个", len(entries), len(filtered))
+            if self.budget is not None:
+                self.budget.expect(len(filtered))
         processed: List[ProcessedRequest] = []
         report_entries: List[ReportEntry] = []
         max_workers = max(1, self.config.client.rate_limit.max_concurrent)
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {
-                executor.submit(self._process_entry, entry): entry
-                for entry in filtered
-            }
-            for future in as_completed(futures):
-                processed_req, report = future.result()
+        restored_count = 0
+        if self.config.report_format == "jsonl":
+            self._report_stream = JsonlReportWriter(self.config.report_path)
+        # 只有导出 HAR 时才需要保留处理结果；JSONL 报告已逐条落盘，无需驻留内存
+        keep_processed = bool(self.config.output_har)
+
+        def keep(processed_req: ProcessedRequest, report: ReportEntry) -> None:
+            if keep_processed:
                 processed.append(processed_req)
+            if self._report_stream is None:
                 report_entries.append(report)
+
+        queue = EntryQueue(self.config, self.latency) if self.latency is not None else None
+        # LPT 调度时只在有空闲线程时才出队，出队时能用上最新的延迟观测
+        limit = max_workers if queue is not None else max_workers * 2
+        in_flight: Set[Future] = set()
+        # 模板分组的成员不在工作线程中等待代表：代表发布方案后由工作线程放入此队列，
+        # 主线程在下一次收集结果时重新派发
+        resumed: Deque[HarEntry] = deque()
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+                def collect(done: Iterable[Future]) -> None:
+                    for future in done:
+                        keep(*future.result())
+                    while resumed:
+                        submit(resumed.popleft(), defer=False)
+
+                def submit(entry: HarEntry, defer: bool = True) -> None:
+                    nonlocal in_flight
+                    if defer and self.minimizer.defer_grouped(entry.request, lambda: resumed.append(entry)):
+                        return
+                    # 限制排队条目数，流式加载时不会一次性读入全部 entry
+                    if len(in_flight) >= limit:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        collect(done)
+                    in_flight.add(executor.submit(self._process_entry, entry))
+
+                for entry in filtered:
+                    restored = self.journal.restore_entry(entry.request) if self.journal else None
+                    if restored is not None:
+                        if self._report_stream is not None:
+                            self._report_stream.append(restored[1])
+                        keep(*restored)
+                        restored_count += 1
+                        if self.budget is not None:
+                            self.budget.expect(-1)
+                        continue
+                    if queue is None:
+                        submit(entry)
+                        continue
+                    queue.push(entry)
+                    if len(queue) >= self.config.scheduling.lookahead:
+                        submit(queue.pop())
+                while queue:
+                    submit(queue.pop())
+                if self.slots is not None:
+                    self.slots.drain()
+                while in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+        finally:
+            self.client.close()
+            if self.knowledge is not None:
+                self.knowledge.save()
+            if self.journal:
+                self.journal.close()
+            if self._report_stream is not None:
+                self._report_stream.close()
+        if restored_count:
+            logger.info("运行日志中已有 %s 个条目完成，本次跳过", restored_count)
+        if self.config.loader.streaming and self._report_stream is None:
+            logger.info("流式处理完成，筛选后共 %s 个请求", len(report_entries))
+        totals = self.client.totals
+        logger.info(
+            "探测缓存命中 %s 次，运行日志重放 %s 次，实际发出 %s 次",
+            totals.cache_hits,
+            totals.journal_hits,
+            totals.cache_misses,
+        )
+        if self.budget is not None:
+            spent = ", ".join(f"{phase} {tests}" for phase, tests in self.budget.phases()) or "无"
+            remaining = self.budget.remaining()
+            logger.info("探测预算消耗：%s；共享池剩余 %s", spent, "不限" if remaining is None else remaining)
+        if self.config.client.rate_limit.adaptive.enabled:
+            for host, rate in sorted(self.client.limiters.rates().items()):
+                logger.info("主机 %s 的最终探测速率：%.2f/s", host or "*", rate)
         processed.sort(key=lambda item: item.request.index)
         report_entries.sort(key=lambda item: item.index)
-        ReportWriter(self.config.report_path).write(report_entries)
-        logger.info("最小化报告已写入 %s", self.config.report_path)
-        if self.config.output_har:
+        if self._report_stream is None:
+            ReportWriter(self.config.report_path).write(report_entries)
+            logger.info("最小化报告已写入 %s", self.config.report_path)
+        else:
+            logger.info("JSONL 最小化报告已写入 %s", self.config.report_path)
+            if self.config.report_json_path:
+                count = convert_jsonl_report(self.config.report_path, self.config.report_json_path)
+                logger.info("已将 %s 条报告转换为 JSON 数组：%s", count, self.config.report_json_path)
+        if self.config.output_har and self.config.loader.streaming:
+            StreamingHarExporter(self.loader).write(
+                self.config.output_har,
+                processed,
+                include_metadata=self.config.update_har_metadata,
+                deduplicate_identical=self.config.filters.deduplicate_identical,
+            )
+            logger.info("更新后的 HAR 已写入 %s", self.config.output_har)
+        elif self.config.output_har:
             exporter = HarExporter(self.loader.get_raw())
             exporter.apply(
                 processed,
@@ -57,9 +198,29 @@ class MinimizationOrchestrator:
         return report_entries
 
     def _process_entry(self, entry) -> Tuple[ProcessedRequest, ReportEntry]:
-        baseline, result = self.minimizer.minimize(entry.request)
+        if self.slots is not None:
+            self.slots.start()
+        try:
+            baseline, result = self.minimizer.minimize(entry.request)
+        finally:
+            self.minimizer.release_grouped(entry.request)
+            if self.slots is not None:
+                self.slots.finish()
+        if self.latency is not None and baseline.elapsed > 0:
+            self.latency.observe(entry.request.url, baseline.elapsed)
+        stats = self.client.pop_stats(entry.request.index)
         processed = ProcessedRequest(request=entry.request, baseline=baseline, result=result)
-        report = self._build_report_entry(entry.request, baseline, result)
+        report = self._build_report_entry(entry.request, baseline, result, stats)
+        if self.journal:
+            self.journal.record_entry(processed, report)
+        if self._report_stream is not None:
+            self._report_stream.append(report)
+            # 报告已落盘，立即释放基线与最终响应的正文
+            processed = ProcessedRequest(
+                request=entry.request,
+                baseline=None,
+                result=replace(result, response=None),
+            )
         return processed, report
 
     def _build_report_entry(
@@ -67,6 +228,7 @@ class MinimizationOrchestrator:
         request: RequestData,
         baseline: ResponseSnapshot,
         result: MinimizationResult,
+        stats: ProbeStats,
     ) -> ReportEntry:
         body_kind = resolve_body_kind(request, self.config.minimization.body.body_type)
         original_body_fields = count_body_fields(body_kind, request.body_text)
@@ -100,4 +262,16 @@ class MinimizationOrchestrator:
             minimized_headers=result.headers,
             minimized_body=result.body_text,
             error=error_message,
+            probes=stats.as_dict(),
+            algorithm=result.algorithm,
+            tests=result.tests,
+            budget=result.budget,
+            calibration=result.calibration,
+            minimized_url=result.url or request.url,
+            minimized_query=query_dict(result.url) if result.url is not None else request.query,
+            query_counts={
+                "original": len(QueryString(request.url).params),
+                "candidates": result.query_candidates,
+                "final": len(QueryString(result.url or request.url).params),
+            },
         )
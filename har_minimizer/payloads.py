@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence, Tuple
+from urllib.parse import urlencode
+
+
+class BodyFragments:
+    """按键预先序列化的 JSON 对象/表单请求体，探测时只需拼接所选片段。
+
+    每个键值对只序列化一次（置空版本在首次使用时序列化并缓存）。JSON 片段为
+    ``"key":value``，表单片段为 ``key=value``，分别以 ``,``/``&`` 连接，结果与
+    对整个字典调用 ``json.dumps(..., separators=(",", ":"))`` 或 ``urlencode``
+    逐字节一致。
+    """
+
+    def __init__(self, kind: str, data: Mapping[str, Any]):
+        if kind not in {"json", "form"}:
+            raise ValueError(f"不支持按片段构造的请求体类型：{kind}")
+        self.kind = kind
+        self._fragments = {key: self._encode(key, value) for key, value in data.items()}
+        self._blanks: Dict[str, str] = {}
+
+    def _encode(self, key: str, value: Any) -> str:
+        if self.kind == "json":
+            return json.dumps(key) + ":" + json.dumps(value, separators=(",", ":"))
+        return urlencode({key: value})
+
+    def fragment(self, key: str) -> str:
+        return self._fragments[key]
+
+    def blank(self, key: str) -> str:
+        """值置空后的片段。"""
+        fragment = self._blanks.get(key)
+        if fragment is None:
+            fragment = self._blanks[key] = self._encode(key, "")
+        return fragment
+
+    def join(self, fragments: Iterable[str]) -> str:
+        if self.kind == "json":
+            return "{" + ",".join(fragments) + "}"
+        return "&".join(fragments)
+
+
+class HeaderFragments:
+    """固定请求头预先转换为字典、候选请求头预先取出名称与值，探测时只需复制并追加。
+
+    结果与对 ``fixed + active`` 调用 ``_headers_list_to_dict`` 一致：同名请求头
+    以后出现的值为准、位置保持首次出现处，缺少名称的请求头被忽略。
+    """
+
+    def __init__(self, fixed: Sequence[Dict[str, str]], candidates: Sequence[Dict[str, str]]):
+        self._fixed = dict(pair for pair in map(_pair, fixed) if pair[0])
+        self._pairs = {id(header): _pair(header) for header in candidates}
+
+    def build(self, active: Sequence[Dict[str, str]]) -> Dict[str, str]:
+        headers = self._fixed.copy()
+        for header in active:
+            name, value = self._pairs.get(id(header)) or _pair(header)
+            if name:
+                headers[name] = value
+        return headers
+
+
+def _pair(header: Dict[str, str]) -> Tuple[Optional[str], str]:
+    return header.get("name"), header.get("value", "")
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from .models import ResponseSnapshot
+
+
+def probe_key(
+    method: str, url: str, headers: Dict[str, str], body: Optional[str], reference: Optional[str] = None
+) -> str:
+    """计算探测请求的缓存键：方法、URL、规范化后的头部集合与请求体摘要。
+
+    紧凑探测的比较特征是相对基线惰性计算的，``reference`` 为该基线的标识
+    （见 ``HttpClient._reference_token``），相对不同基线的探测不共享缓存。
+    """
+    digest = hashlib.sha256()
+    digest.update(method.upper().encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(url.encode("utf-8"))
+    digest.update(b"\0")
+    for name, value in sorted((str(k).lower(), str(v)) for k, v in headers.items()):
+        digest.update(name.encode("utf-8"))
+        digest.update(b":")
+        digest.update(value.encode("utf-8"))
+        digest.update(b"\n")
+    digest.update(b"\0")
+    if body is not None:
+        digest.update(hashlib.sha256(body.encode("utf-8")).digest())
+    if reference is not None:
+        digest.update(b"\0")
+        digest.update(reference.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ProbeCache:
+    """线程安全的 LRU 缓存，保存已成功返回的探测响应。"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, ResponseSnapshot]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[ResponseSnapshot]:
+        with self._lock:
+            snapshot = self._entries.get(key)
+            if snapshot is not None:
+                self._entries.move_to_end(key)
+            return snapshot
+
+    def put(self, key: str, snapshot: ResponseSnapshot) -> None:
+        # 网络错误多为瞬时故障，不缓存
+        if not snapshot.ok() or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = snapshot
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+from urllib.parse import parse_qs, unquote_plus, urlsplit
+
+from .config import QueryMinConfig
+
+
+class QueryParam(NamedTuple):
+    position: int
+    name: str  # 解码后的参数名
+    raw: str  # URL 中的原始片段（保持原有编码）
+
+
+class QueryString:
+    """只拆分一次的 URL：查询串之前的部分、按 ``&`` 切开的原始参数片段与 ``#`` 片段。
+
+    探测时直接按原始顺序拼接所选片段，保持原有编码，不再重新解析或编码。
+    空片段（如 ``a=1&&b=2`` 中间的部分）不作为参数，重新拼接时被省略。
+    """
+
+    def __init__(self, url: str):
+        head, hash_mark, fragment = url.partition("#")
+        self.base, _, query = head.partition("?")
+        self.fragment = hash_mark + fragment
+        self.params = [
+            QueryParam(position, unquote_plus(raw.partition("=")[0]), raw)
+            for position, raw in enumerate(query.split("&"))
+            if raw
+        ]
+
+    def build(self, params: Iterable[QueryParam]) -> str:
+        query = "&".join(param.raw for param in sorted(params))
+        return self.base + ("?" + query if query else "") + self.fragment
+
+    def without(self, names: Iterable[str]) -> str:
+        """删除给定名称的全部参数后的 URL。"""
+        removed = set(names)
+        return self.build(param for param in self.params if param.name not in removed)
+
+
+def split_query_candidates(
+    params: Sequence[QueryParam], cfg: QueryMinConfig
+) -> Tuple[List[QueryParam], List[QueryParam]]:
+    """按 ``protected``/``candidate_regex`` 把查询参数分为（固定, 候选），参数名区分大小写。"""
+    protected = set(cfg.protected)
+    regexes = [re.compile(pattern) for pattern in cfg.candidate_regex]
+    fixed: List[QueryParam] = []
+    candidates: List[QueryParam] = []
+    for param in params:
+        if param.name in protected or (regexes and not any(r.search(param.name) for r in regexes)):
+            fixed.append(param)
+        else:
+            candidates.append(param)
+    return fixed, candidates
+
+
+def query_dict(url: str) -> Dict[str, Any]:
+    """与 ``HarLoader`` 相同的 ``RequestData.query`` 形式：单值参数为字符串，重复参数为列表。"""
+    return {k: v[0] if len(v) == 1 else v for k, v in parse_qs(urlsplit(url).query).items()}
+
+
+def filter_query_string(items: Sequence[Dict[str, Any]], original_url: str, final_url: str) -> List[Dict[str, Any]]:
+    """从 HAR 的 ``queryString`` 中去掉精简 URL 里已删除的参数，保留其余条目的原有写法。
+
+    按（名称, 值）计数匹配，HAR 中的名称与值是否已解码均可匹配；同名同值的
+    参数被删除几个，就从前往后去掉几个对应条目。
+    """
+    removed = Counter(_decoded(param.raw) for param in QueryString(original_url).params)
+    removed.subtract(_decoded(param.raw) for param in QueryString(final_url).params)
+    kept: List[Dict[str, Any]] = []
+    for item in items:
+        name, value = str(item.get("name", "")), str(item.get("value", ""))
+        key = next((k for k in ((name, value), (unquote_plus(name), unquote_plus(value))) if removed[k] > 0), None)
+        if key is None:
+            kept.append(item)
+        else:
+            removed[key] -= 1
+    return kept
+
+
+def _decoded(raw: str) -> Tuple[str, str]:
+    name, _, value = raw.partition("=")
+    return unquote_plus(name), unquote_plus(value)
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import json
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import yaml
+
+from .har_loader import HarLoader, decode_content
+from .http_client import ScanFactory, Transport
+from .models import ResponseSnapshot
+
+logger = logging.getLogger(__name__)
+
+# 重放时由传输层重新计算的响应头
+_DROPPED_HEADERS = {"content-length", "content-encoding", "transfer-encoding"}
+
+
+@dataclass
+class CannedResponse:
+    status: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], default_status: int) -> "CannedResponse":
+        body = data.get("body", "")
+        if not isinstance(body, str):
+            body = json.dumps(body, ensure_ascii=False)
+        return cls(
+            status=int(data.get("status", default_status)),
+            headers={str(k): str(v) for k, v in (data.get("headers") or {}).items()},
+            body=body.encode("utf-8"),
+        )
+
+
+@dataclass
+class ReplayRule:
+    """一个端点的判定规则：请求缺少任一必需项时返回 ``reject``。"""
+
+    url: re.Pattern
+    method: Optional[str] = None
+    required_headers: List[str] = field(default_factory=list)
+    required_body_keys: List[str] = field(default_factory=list)
+    required_query: List[str] = field(default_factory=list)
+    reject: CannedResponse = field(default_factory=lambda: CannedResponse(status=403))
+    response: Optional[CannedResponse] = None
+
+    def matches(self, method: str, url: str) -> bool:
+        if self.method and self.method != method.upper():
+            return False
+        return self.url.search(url) is not None
+
+    def accepts(self, url: str, headers: Dict[str, str], body: Optional[str]) -> bool:
+        names = {name.lower() for name, value in headers.items() if value is not None}
+        if any(name not in names for name in self.required_headers):
+            return False
+        if self.required_query:
+            query = parse_qs(urlsplit(url).query, keep_blank_values=True)
+            if any(not any(query.get(name, [])) for name in self.required_query):
+                return False
+        if self.required_body_keys:
+            fields = _parse_body(body)
+            if any(_lookup_path(fields, path) in (None, "") for path in self.required_body_keys):
+                return False
+        return True
+
+
+def _parse_body(body: Optional[str]) -> Any:
+    if not body:
+        return {}
+    try:
+        return json.loads(body)
+    except json.JSONDecodeError:
+        return {key: values[0] for key, values in parse_qs(body, keep_blank_values=True).items()}
+
+
+def _lookup_path(data: Any, path: str) -> Any:
+    """按 ``a.b.0`` 形式的点分路径取值，缺失时返回 None。"""
+    for part in path.split("."):
+        if isinstance(data, dict):
+            data = data.get(part)
+        elif isinstance(data, list) and part.isdigit() and int(part) < len(data):
+            data = data[int(part)]
+        else:
+            return None
+    return data
+
+
+def load_rules(path: str) -> Tuple[List[ReplayRule], CannedResponse]:
+    """读取规则文件（YAML 或 JSON），返回规则列表与缺少录制响应时的默认响应。"""
+    with Path(path).open("r", encoding="utf-8") as handle:
+        raw = yaml.safe_load(handle) or {}
+    rules = []
+    for item in raw.get("rules", []):
+        rules.append(
+            ReplayRule(
+                url=re.compile(item.get("url", "")),
+                method=str(item["method"]).upper() if item.get("method") else None,
+                required_headers=[str(name).lower() for name in item.get("required_headers", [])],
+                required_body_keys=[str(key) for key in item.get("required_body_keys", [])],
+                required_query=[str(name) for name in item.get("required_query", [])],
+                reject=CannedResponse.from_dict(item.get("reject") or {}, 403),
+                response=CannedResponse.from_dict(item["response"], 200) if item.get("response") else None,
+            )
+        )
+    default = CannedResponse.from_dict(raw.get("default_response") or {}, 404)
+    return rules, default
+
+
+def _recorded_response(entry: Dict[str, Any]) -> CannedResponse:
+    response = entry.get("response") or {}
+    body = decode_content(response.get("content") or {}) or b""
+    headers = {
+        h["name"]: h.get("value", "")
+        for h in response.get("headers", [])
+        if h.get("name", "").lower() not in _DROPPED_HEADERS
+    }
+    return CannedResponse(status=int(response.get("status") or 200), headers=headers, body=body)
+
+
+class ReplayTransport(Transport):
+    """离线重放传输：按 HAR 中的录制响应和规则文件应答探测，不访问网络。
+
+    满足规则的请求返回录制响应（或规则指定的 ``response``），否则返回规则的
+    ``reject``；未命中任何规则的请求一律视为满足。录制响应先按方法 + 完整 URL
+    查找，再按方法 + 不含查询串的 URL 查找，都找不到时返回 ``default_response``。
+    """
+
+    def __init__(self, har_path: str, rules_path: Optional[str] = None):
+        self.rules: List[ReplayRule] = []
+        self.default = CannedResponse(status=404)
+        if rules_path:
+            self.rules, self.default = load_rules(rules_path)
+        self._exact: Dict[Tuple[str, str], CannedResponse] = {}
+        self._by_path: Dict[Tuple[str, str], CannedResponse] = {}
+        for entry in HarLoader(har_path, keep_response_body=True).iter_entries():
+            method = entry.request.method.upper()
+            recorded = _recorded_response(entry.request.raw_entry)
+            self._exact.setdefault((method, entry.request.url), recorded)
+            self._by_path.setdefault((method, _without_query(entry.request.url)), recorded)
+        logger.info("离线重放：载入 %s 个录制响应、%s 条规则", len(self._exact), len(self.rules))
+
+    def send(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        body: Optional[str],
+        scan: Optional[ScanFactory] = None,
+    ) -> ResponseSnapshot:
+        start = time.monotonic()
+        canned = self._answer(method.upper(), url, headers, body)
+        response_headers = dict(canned.headers)
+        response_headers["Content-Length"] = str(len(canned.body))
+        return self._respond(method, canned.status, response_headers, canned.body, scan, start)
+
+    def _answer(self, method: str, url: str, headers: Dict[str, str], body: Optional[str]) -> CannedResponse:
+        rule = next((rule for rule in self.rules if rule.matches(method, url)), None)
+        if rule is not None and not rule.accepts(url, headers, body):
+            return rule.reject
+        if rule is not None and rule.response is not None:
+            return rule.response
+        recorded = self._exact.get((method, url)) or self._by_path.get((method, _without_query(url)))
+        return recorded or self.default
+
+
+def _without_query(url: str) -> str:
+    return urlsplit(url)._replace(query="", fragment="").geturl()
@@ -1,13 +1,51 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import threading
 from copy import deepcopy
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Tuple
 from urllib.parse import urlparse, parse_qs
 
-from .models import MinimizationResult, ProcessedRequest, ReportEntry
+from .models import ProcessedRequest, ReportEntry
 from .filtering import build_dedup_key
+from .har_loader import HarLoader
+from .query_string import filter_query_string
+
+
+def report_entry_to_dict(entry: ReportEntry) -> Dict:
+    return {
+        "index": entry.index,
+        "method": entry.method,
+        "url": entry.url,
+        "path": entry.path,
+        "query": entry.query,
+        "baseline": {
+            "status": entry.baseline_status,
+            "length": entry.baseline_length,
+        },
+        "final": {
+            "status": entry.final_status,
+            "length": entry.final_length,
+        },
+        "matched_baseline": entry.matched,
+        "headers": entry.header_counts,
+        "body": entry.body_counts,
+        "query_params": entry.query_counts,
+        "minimized_url": entry.minimized_url or entry.url,
+        "minimized_query": entry.minimized_query,
+        "minimized_headers": entry.minimized_headers,
+        "minimized_body": entry.minimized_body,
+        "error": entry.error,
+        "probes": entry.probes,
+        "minimization": {
+            "algorithm": entry.algorithm,
+            "tests": entry.tests,
+            "budget": entry.budget,
+            "calibration": entry.calibration,
+        },
+    }
 
 
 class ReportWriter:
@@ -15,33 +53,86 @@ class ReportWriter:
         self.path = Path(path)
 
     def write(self, entries: Iterable[ReportEntry]) -> None:
-        data = [self._to_dict(entry) for entry in entries]
+        self.write_dicts(self._to_dict(entry) for entry in entries)
+
+    def write_dicts(self, data: Iterable[Dict]) -> None:
+        data = list(data)
         if self.path.parent and not self.path.parent.exists():
             self.path.parent.mkdir(parents=True, exist_ok=True)
         self.path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
 
     def _to_dict(self, entry: ReportEntry) -> Dict:
-        return {
-            "index": entry.index,
-            "method": entry.method,
-            "url": entry.url,
-            "path": entry.path,
-            "query": entry.query,
-            "baseline": {
-                "status": entry.baseline_status,
-                "length": entry.baseline_length,
-            },
-            "final": {
-                "status": entry.final_status,
-                "length": entry.final_length,
-            },
-            "matched_baseline": entry.matched,
-            "headers": entry.header_counts,
-            "body": entry.body_counts,
-            "minimized_headers": entry.minimized_headers,
-            "minimized_body": entry.minimized_body,
-            "error": entry.error,
-        }
+        return report_entry_to_dict(entry)
+
+
+class JsonlReportWriter:
+    """逐条追加写入报告（每行一个 JSON 对象），每条写完立即刷新到磁盘。"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        if self.path.parent and not self.path.parent.exists():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._handle = self.path.open("w", encoding="utf-8")
+
+    def append(self, entry: ReportEntry) -> None:
+        line = json.dumps(report_entry_to_dict(entry), ensure_ascii=False)
+        with self._lock:
+            self._handle.write(line + "\n")
+            self._handle.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._handle.close()
+
+
+def convert_jsonl_report(source: str, target: str) -> int:
+    """把 JSONL 报告转换为按 index 排序的 JSON 数组格式，返回条目数。"""
+    with Path(source).open("r", encoding="utf-8") as handle:
+        data = [json.loads(line) for line in handle if line.strip()]
+    data.sort(key=lambda item: item["index"])
+    ReportWriter(target).write_dicts(data)
+    return len(data)
+
+
+def _patch_entry(entry: Dict, item: ProcessedRequest, include_metadata: bool) -> None:
+    request_block = entry.setdefault("request", {})
+    request_block["headers"] = deepcopy(item.result.headers)
+    if item.result.body_text is not None:
+        post_data = request_block.setdefault("postData", {})
+        post_data["text"] = item.result.body_text
+        if item.request.mime_type:
+            post_data.setdefault("mimeType", item.request.mime_type)
+    elif request_block.get("postData") and "text" in request_block["postData"]:
+        request_block["postData"]["text"] = item.request.body_text or ""
+    if item.result.url is not None:
+        request_block["queryString"] = filter_query_string(
+            request_block.get("queryString") or [], item.request.url, item.result.url
+        )
+        request_block["url"] = item.result.url
+    if include_metadata:
+        meta = entry.setdefault("_minimized", {})
+        meta.update(
+            {
+                "original_header_count": len(item.request.headers),
+                "final_header_count": len(item.result.headers),
+                "header_candidates": item.result.header_candidates,
+                "body_candidates": item.result.body_candidates,
+                "query_candidates": item.result.query_candidates,
+                "matched": item.result.matched,
+            }
+        )
+
+
+def _raw_dedup_key(entry: Dict) -> Tuple:
+    request = entry.get("request", {}) or {}
+    url = request.get("url", "") or ""
+    method = request.get("method", "") or ""
+    post_data = request.get("postData", {}) or {}
+    body_text = post_data.get("text")
+    parsed = urlparse(url)
+    query_dict = {k: v[0] if len(v) == 1 else v for k, v in parse_qs(parsed.query).items()}
+    return build_dedup_key(method=method, url=url, query=query_dict, body_text=body_text)
 
 
 class HarExporter:
@@ -61,27 +152,7 @@ class HarExporter:
             index = item.request.index
             if index >= len(entries):
                 continue
-            entry = entries[index]
-            request_block = entry.setdefault("request", {})
-            request_block["headers"] = deepcopy(item.result.headers)
-            if item.result.body_text is not None:
-                post_data = request_block.setdefault("postData", {})
-                post_data["text"] = item.result.body_text
-                if item.request.mime_type:
-                    post_data.setdefault("mimeType", item.request.mime_type)
-            elif request_block.get("postData") and "text" in request_block["postData"]:
-                request_block["postData"]["text"] = item.request.body_text or ""
-            if include_metadata:
-                meta = entry.setdefault("_minimized", {})
-                meta.update(
-                    {
-                        "original_header_count": len(item.request.headers),
-                        "final_header_count": len(item.result.headers),
-                        "header_candidates": item.result.header_candidates,
-                        "body_candidates": item.result.body_candidates,
-                        "matched": item.result.matched,
-                    }
-                )
+            _patch_entry(entries[index], item, include_metadata)
         if deduplicate_identical:
             self._deduplicate_entries()
 
@@ -97,16 +168,88 @@ class HarExporter:
         seen = set()
         deduped: List[Dict] = []
         for entry in entries:
-            request = entry.get("request", {}) or {}
-            url = request.get("url", "") or ""
-            method = request.get("method", "") or ""
-            post_data = request.get("postData", {}) or {}
-            body_text = post_data.get("text")
-            parsed = urlparse(url)
-            query_dict = {k: v[0] if len(v) == 1 else v for k, v in parse_qs(parsed.query).items()}
-            key = build_dedup_key(method=method, url=url, query=query_dict, body_text=body_text)
+            key = _raw_dedup_key(entry)
             if key in seen:
                 continue
             seen.add(key)
             deduped.append(entry)
         log["entries"] = deduped
+
+
+class _JsonStreamWriter:
+    """逐个写出 JSON 成员，输出与 ``json.dumps(..., indent=2)`` 逐字节一致。"""
+
+    def __init__(self, handle: TextIO):
+        self._handle = handle
+        self._stack: List[List] = []  # [结束符, 是否已有成员]
+
+    def begin(self, opener: str, key: Optional[str] = None) -> None:
+        self._prefix(key)
+        self._handle.write(opener)
+        self._stack.append(["}" if opener == "{" else "]", False])
+
+    def value(self, value: Any, key: Optional[str] = None) -> None:
+        self._prefix(key)
+        text = json.dumps(value, indent=2, ensure_ascii=False)
+        # JSON 字符串内的换行已被转义，可以安全地整体缩进
+        self._handle.write(text.replace("\n", "\n" + "  " * len(self._stack)))
+
+    def end(self) -> None:
+        closer, has_items = self._stack.pop()
+        if has_items:
+            self._handle.write("\n" + "  " * len(self._stack))
+        self._handle.write(closer)
+
+    def _prefix(self, key: Optional[str]) -> None:
+        if not self._stack:
+            return
+        frame = self._stack[-1]
+        self._handle.write(("," if frame[1] else "") + "\n" + "  " * len(self._stack))
+        frame[1] = True
+        if key is not None:
+            self._handle.write(json.dumps(key, ensure_ascii=False) + ": ")
+
+
+class StreamingHarExporter:
+    """第二次流式读取输入 HAR，逐条替换已处理的 entry 并直接写入输出文件。
+
+    内存占用与 HAR 大小无关：任意时刻只持有一个 entry，去重时也只保存
+    每个 entry 的键摘要。
+    """
+
+    def __init__(self, loader: HarLoader):
+        self.loader = loader
+
+    def write(
+        self,
+        path: str,
+        processed: Iterable[ProcessedRequest],
+        include_metadata: bool = True,
+        deduplicate_identical: bool = False,
+    ) -> None:
+        patches = {item.request.index: item for item in processed if item.result.matched}
+        seen: set = set()
+        target = Path(path)
+        if target.parent and not target.parent.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+        with target.open("w", encoding="utf-8") as handle:
+            writer = _JsonStreamWriter(handle)
+            writer.begin("{")
+            for kind, key, value in self.loader.iter_events():
+                if kind == "begin":
+                    writer.begin("{" if key == "log" else "[", key)
+                elif kind == "end":
+                    writer.end()
+                elif kind == "entry":
+                    item = patches.get(key)
+                    if item is not None:
+                        _patch_entry(value, item, include_metadata)
+                    if deduplicate_identical:
+                        digest = hashlib.sha1(repr(_raw_dedup_key(value)).encode("utf-8")).digest()
+                        if digest in seen:
+                            continue
+                        seen.add(digest)
+                    writer.value(value)
+                else:
+                    writer.value(value, key)
+            writer.end()
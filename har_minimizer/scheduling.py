@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import threading
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+
+from .budget import expected_probes
+from .config import Config
+from .har_loader import HarEntry
+from .minimizer import count_candidates
+
+
+class LatencyTracker:
+    """按主机记录探测延迟的指数滑动平均，未观测过的主机按全局均值估计。"""
+
+    def __init__(self, default: float = 0.1, alpha: float = 0.3):
+        self.default = default
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, float] = {}
+
+    def observe(self, url: str, seconds: float) -> None:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            current = self._hosts.get(host)
+            self._hosts[host] = seconds if current is None else (1 - self.alpha) * current + self.alpha * seconds
+
+    def latency(self, url: str) -> float:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host in self._hosts:
+                return self._hosts[host]
+            if self._hosts:
+                return sum(self._hosts.values()) / len(self._hosts)
+            return self.default
+
+
+class EntryQueue:
+    """待派发条目的前瞻窗口，每次取出预计耗时最长的条目（LPT 调度）。
+
+    探测数估计在入队时计算一次；延迟在出队时按最新观测重新取值，
+    因此窗口内的相对顺序会随各主机的实际延迟调整。
+    """
+
+    def __init__(self, config: Config, latency: LatencyTracker):
+        self.config = config
+        self.latency = latency
+        self._items: List[Tuple[HarEntry, float]] = []
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def push(self, entry: HarEntry) -> None:
+        counts = count_candidates(entry.request, self.config)
+        budget = self.config.max_rounds_per_request
+        # 基线、最终校验各一次，各阶段共享单条目预算
+        probes = 2 + min(float(budget), sum(expected_probes(count, budget) for count in counts))
+        self._items.append((entry, probes))
+
+    def pop(self) -> HarEntry:
+        position = max(
+            range(len(self._items)),
+            key=lambda i: (self._items[i][1] * self.latency.latency(self._items[i][0].request.url), -i),
+        )
+        return self._items.pop(position)[0]
+
+
+class WorkerSlots:
+    """记录在途条目数；队列排空后把空闲的工作线程名额分给仍在运行的条目。
+
+    ``width`` 返回单个条目当前可同时发出的探测数：队列未排空时为 1；
+    排空后空闲名额平均分给在途条目，由并行 ddmin 按批发出补集探测。
+    """
+
+    def __init__(self, workers: int):
+        self.workers = max(1, workers)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._drained = False
+
+    def start(self) -> None:
+        with self._lock:
+            self._active += 1
+
+    def finish(self) -> None:
+        with self._lock:
+            self._active -= 1
+
+    def drain(self) -> None:
+        with self._lock:
+            self._drained = True
+
+    def width(self) -> int:
+        with self._lock:
+            if not self._drained or self._active <= 0:
+                return 1
+            return max(1, self.workers // self._active)
+
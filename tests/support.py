@@ -0,0 +1,136 @@
+"""测试用的本地 HTTP 服务、内存传输与构造辅助函数：探测由判定函数直接给出响应。"""
+
+from __future__ import annotations
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+from har_minimizer.comparator import ResponseComparator
+from har_minimizer.config import Config
+from har_minimizer.http_client import HttpClient, ScanFactory, Transport
+from har_minimizer.models import RequestData, ResponseSnapshot
+
+# (method, url, headers, body) -> (status, 正文)
+Oracle = Callable[[str, str, Dict[str, str], Optional[str]], Tuple[int, bytes]]
+
+
+class OracleServer:
+    """在后台线程中运行的 keep-alive HTTP 服务，按判定函数应答并记录每个请求。"""
+
+    def __init__(self, oracle: Oracle):
+        self.oracle = oracle
+        self.sent: List[Tuple[str, Dict[str, str], Optional[str]]] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1/items"
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "OracleServer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _handler(self):
+        owner = self
+        # 只转发调用方设置的请求头，不包括 requests/aiohttp 自动添加的默认头
+        automatic = {"host", "accept", "accept-encoding", "connection", "user-agent", "content-length", "content-type"}
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length).decode("utf-8") if length else None
+                headers = {name: value for name, value in self.headers.items() if name.lower() not in automatic}
+                url = f"http://{self.headers.get('Host')}{self.path}"
+                with owner._lock:
+                    owner.sent.append((url, headers, body))
+                status, content = owner.oracle(self.command, url, headers, body)
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _respond
+
+            def log_message(self, format, *args):  # noqa: A002 - 保持基类签名
+                return
+
+        return Handler
+
+
+class OracleTransport(Transport):
+    """按判定函数应答的传输，记录每个实际发出的探测。"""
+
+    def __init__(self, oracle: Oracle):
+        self.oracle = oracle
+        self.sent: List[Tuple[str, Dict[str, str], Optional[str]]] = []
+        self._lock = threading.Lock()
+
+    def send(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        body: Optional[str],
+        scan: Optional[ScanFactory] = None,
+    ) -> ResponseSnapshot:
+        start = time.monotonic()
+        with self._lock:
+            self.sent.append((url, dict(headers), body))
+        status, content = self.oracle(method, url, headers, body)
+        return self._respond(method, status, {"Content-Length": str(len(content))}, content, scan, start)
+
+
+def require_headers(*names: str, ok: bytes = b'{"ok":true}', denied: bytes = b'{"error":"denied"}') -> Oracle:
+    """只有带齐 ``names`` 中全部请求头时才返回 200 的判定函数。"""
+    required = {name.lower() for name in names}
+
+    def oracle(method: str, url: str, headers: Dict[str, str], body: Optional[str]) -> Tuple[int, bytes]:
+        present = {name.lower() for name in headers}
+        return (200, ok) if required <= present else (403, denied)
+
+    return oracle
+
+
+def make_request(headers: List[str], url: str = "http://api.test/v1/items", raw_entry: Optional[Dict] = None) -> RequestData:
+    return RequestData(
+        index=0,
+        method="GET",
+        url=url,
+        path="/v1/items",
+        query={},
+        headers=[{"name": name, "value": "v"} for name in headers],
+        body_text=None,
+        mime_type=None,
+        raw_entry=raw_entry or {},
+    )
+
+
+def make_config(**overrides) -> Config:
+    config = Config(input_har="unused.har")
+    config.minimization.headers.protected = []
+    config.minimization.headers.ignore = []
+    for name, value in overrides.items():
+        setattr(config, name, value)
+    return config
+
+
+def make_client(config: Config, transport: Transport) -> Tuple[HttpClient, ResponseComparator]:
+    comparator = ResponseComparator(config.comparator)
+    return HttpClient(config.client, comparator=comparator, transport=transport), comparator
+
+
+def header_names(headers: List[Dict[str, str]]) -> List[str]:
+    return [header["name"] for header in headers]
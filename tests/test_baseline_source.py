@@ -0,0 +1,89 @@
+from har_minimizer.minimizer import RequestMinimizer
+
+from support import OracleTransport, header_names, make_client, make_config, make_request, require_headers
+
+HEADERS = ["a", "b", "c", "d", "e", "f", "g"]
+
+
+def _recorded_entry(status: int, text: str) -> dict:
+    return {"response": {"status": status, "content": {"size": len(text), "mimeType": "application/json", "text": text}}}
+
+
+def _minimize(source, entry):
+    config = make_config(baseline_source=source)
+    transport = OracleTransport(require_headers("a"))
+    client, comparator = make_client(config, transport)
+    baseline, result = RequestMinimizer(config, client, comparator).minimize(make_request(HEADERS, raw_entry=entry))
+    return baseline, result, transport
+
+
+def test_recorded_baseline_is_not_sent():
+    baseline, result, transport = _minimize("recorded", _recorded_entry(200, '{"ok":true}'))
+
+    assert baseline.body == b'{"ok":true}'
+    assert header_names(result.headers) == ["a"]
+    assert {name: "v" for name in HEADERS} not in [headers for _, headers, _ in transport.sent]
+
+
+def test_stale_recording_is_reported_as_unmatched():
+    _, result, _ = _minimize("recorded", _recorded_entry(302, ""))
+
+    assert not result.matched
+    assert header_names(result.headers) == HEADERS
+
+
+def test_verify_on_mismatch_switches_to_a_live_baseline():
+    baseline, result, _ = _minimize("recorded-then-verify-on-mismatch", _recorded_entry(302, ""))
+
+    assert baseline.status_code == 200
+    assert result.matched
+    assert header_names(result.headers) == ["a"]
+
+
+def test_verify_on_mismatch_does_not_reuse_probes_judged_against_stale_recording():
+    config = make_config(baseline_source="recorded-then-verify-on-mismatch")
+    # 正文特征相对基线惰性计算：相对录制的 302 基线，状态码已决定结论，关键字不会被扫描
+    config.comparator.need_all = ["ok"]
+    transport = OracleTransport(require_headers("a"))
+    client, comparator = make_client(config, transport)
+    request = make_request(HEADERS, raw_entry=_recorded_entry(302, ""))
+
+    baseline, result = RequestMinimizer(config, client, comparator).minimize(request)
+
+    assert baseline.status_code == 200
+    assert result.matched
+    assert header_names(result.headers) == ["a"]
+
+
+def _bodyless_entry(status: int, size: int) -> dict:
+    # 流式加载默认丢弃 content.text，只剩长度
+    return {"response": {"status": status, "content": {"size": size, "mimeType": "application/json"}}}
+
+
+def test_bodyless_recording_falls_back_to_live_baseline_for_body_checks():
+    config = make_config(baseline_source="recorded")
+    config.comparator.status_code = False
+    config.comparator.need_all = ["ok"]
+    config.calibration.enabled = True
+    client, comparator = make_client(config, OracleTransport(require_headers("a")))
+    request = make_request(HEADERS, raw_entry=_bodyless_entry(200, len(b'{"ok":true}')))
+
+    baseline, result = RequestMinimizer(config, client, comparator).minimize(request)
+
+    assert baseline.body == b'{"ok":true}'
+    assert result.calibration["nondeterministic"] is False
+    assert result.matched
+    assert header_names(result.headers) == ["a"]
+
+
+def test_bodyless_recording_is_used_when_only_status_is_compared():
+    config = make_config(baseline_source="recorded")
+    transport = OracleTransport(require_headers("a"))
+    client, comparator = make_client(config, transport)
+    request = make_request(HEADERS, raw_entry=_bodyless_entry(200, 11))
+
+    baseline, result = RequestMinimizer(config, client, comparator).minimize(request)
+
+    assert baseline.body is None
+    assert header_names(result.headers) == ["a"]
+    assert transport.sent[0][1] != {name: "v" for name in HEADERS}
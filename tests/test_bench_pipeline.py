@@ -0,0 +1,31 @@
+import argparse
+
+import pytest
+
+from benchmarks.bench_pipeline import run
+
+
+@pytest.mark.parametrize("server", ["threaded", "asyncio"])
+def test_pipeline_recovers_the_synthetic_minimal_sets(server):
+    args = argparse.Namespace(
+        entries=6,
+        headers=6,
+        body_keys=4,
+        response_bytes=256,
+        required_headers=2,
+        required_body_keys=1,
+        server=server,
+        latency=0.0,
+        flakiness=0.0,
+        concurrency=2,
+        seed=3,
+        templates=None,
+        heavy=0,
+        heavy_headers=60,
+        log_level="WARNING",
+    )
+
+    metrics = run(args)["metrics"]
+
+    assert metrics["accuracy"] == {"entries": 6, "exact_rate": 1.0, "precision": 1.0, "recall": 1.0}
+    assert metrics["probes"] > 6
@@ -0,0 +1,73 @@
+import time
+
+from har_minimizer.budget import ProbeBudget, phase_allowance
+from har_minimizer.config import BudgetConfig
+from har_minimizer.knowledge import REQUIRED, KnowledgeBase
+from har_minimizer.minimizer import RequestMinimizer
+
+from support import OracleTransport, header_names, make_client, make_config, make_request, require_headers
+
+HEADERS = ["a"] + [f"x{i}" for i in range(8)]
+
+
+def test_phase_allowance_reserves_for_later_phases_or_splits_by_weight():
+    phases = [("headers", 10.0, 100.0), ("body", 20.0, 300.0)]
+
+    # 预算充足：只为后续阶段预留所需
+    assert phase_allowance(50, phases) == 30
+    # 预算不足：按可删除字节数的比例分配
+    assert phase_allowance(20, phases) == 5
+    assert phase_allowance(0, phases) == 0
+
+
+def test_pool_is_shared_in_proportion_and_unused_probes_return():
+    budget = ProbeBudget(BudgetConfig(total_probes=30), per_entry=100)
+    budget.expect(3)
+
+    first = budget.open(10.0)
+    assert first.granted == 10
+    first.spend("headers", 4)
+    budget.close(first)
+
+    assert budget.remaining() == 26
+    assert budget.phases() == [("headers", 4)]
+
+
+def test_entry_stays_within_its_granted_probes():
+    config = make_config()
+    budget = ProbeBudget(BudgetConfig(total_probes=100), per_entry=config.max_rounds_per_request)
+    client, comparator = make_client(config, OracleTransport(require_headers("a")))
+
+    _, result = RequestMinimizer(config, client, comparator, budget=budget).minimize(make_request(HEADERS))
+
+    assert header_names(result.headers) == ["a"]
+    assert sum(result.budget["spent"].values()) <= result.budget["granted"]
+    assert budget.remaining() == 100 - sum(result.budget["spent"].values())
+    assert result.budget["truncated"] is False
+
+
+def test_deadline_aborts_search_instead_of_failing_tests(tmp_path):
+    config = make_config()
+    budget = ProbeBudget(BudgetConfig(deadline_seconds=60), per_entry=config.max_rounds_per_request)
+    oracle = require_headers("a")
+
+    def expiring_oracle(method, url, headers, body):
+        # 基线与第一个探测之后截止时间到达，搜索还远未完成
+        if len(transport.sent) >= 2:
+            budget.deadline = time.monotonic() - 1
+        return oracle(method, url, headers, body)
+
+    transport = OracleTransport(expiring_oracle)
+    knowledge = KnowledgeBase(str(tmp_path / "kb.json"))
+    client, comparator = make_client(config, transport)
+    minimizer = RequestMinimizer(config, client, comparator, knowledge=knowledge, budget=budget)
+
+    _, result = minimizer.minimize(make_request(HEADERS))
+
+    assert result.matched
+    assert "a" in header_names(result.headers)
+    assert result.budget["truncated"] is True
+    # 被截断的搜索只发出了一个测试，不能把未测试的项记为必需
+    assert result.tests["headers"] == 1
+    verdicts = knowledge.verdicts("api.test/v1", "headers")
+    assert not [name for name, verdict in verdicts.items() if verdict == REQUIRED]
@@ -0,0 +1,64 @@
+import itertools
+import json
+
+from har_minimizer.minimizer import RequestMinimizer
+
+from support import OracleTransport, header_names, make_client, make_config, make_request
+
+HEADERS = ["a", "b", "c", "d"]
+
+
+def _minimize(oracle, **comparator):
+    config = make_config()
+    config.calibration.enabled = True
+    config.calibration.samples = 3
+    for name, value in comparator.items():
+        setattr(config.comparator, name, value)
+    transport = OracleTransport(oracle)
+    client, checker = make_client(config, transport)
+    _, result = RequestMinimizer(config, client, checker).minimize(make_request(HEADERS))
+    return result, transport
+
+
+def test_length_noise_widens_the_tolerance():
+    sizes = itertools.cycle([100, 110, 95, 105])
+
+    def oracle(method, url, headers, body):
+        status = 200 if "a" in headers else 403
+        return status, b"x" * next(sizes)
+
+    result, _ = _minimize(oracle, length_check=True)
+
+    assert result.matched
+    assert header_names(result.headers) == ["a"]
+    assert result.calibration["length_tolerance"] > 0.1
+    assert result.calibration["nondeterministic"] is False
+
+
+def test_unstable_status_skips_minimization():
+    statuses = itertools.cycle([200, 500])
+
+    def oracle(method, url, headers, body):
+        return next(statuses), b"{}"
+
+    result, transport = _minimize(oracle)
+
+    assert result.calibration["nondeterministic"] is True
+    assert header_names(result.headers) == HEADERS
+    # 只发出了基线与校准请求
+    assert len(transport.sent) == 4
+
+
+def test_json_paths_that_vary_between_samples_are_marked_volatile():
+    counter = itertools.count()
+
+    def oracle(method, url, headers, body):
+        if "a" not in headers:
+            return 200, b'{"error": "denied"}'
+        payload = {"id": 1, "items": [{"n": i} for i in range(next(counter) % 3 + 1)]}
+        return 200, json.dumps(payload).encode("utf-8")
+
+    result, _ = _minimize(oracle, json_structure=True)
+
+    assert result.calibration["volatile_paths"] == ["$.items"]
+    assert header_names(result.headers) == ["a"]
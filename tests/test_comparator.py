@@ -0,0 +1,115 @@
+from har_minimizer.comparator import ResponseComparator
+from har_minimizer.config import ComparatorConfig
+from har_minimizer.models import ResponseSnapshot
+
+
+def test_checks_run_on_raw_bytes():
+    comparator = ResponseComparator(ComparatorConfig(length_check=True, need_all=["令牌"], regex=[r"id=\d+"]))
+    # 正文不是合法的 UTF-8，检查依然直接在字节上进行
+    body = "令牌".encode("utf-8") + b"\xff\xfe id=42"
+    baseline = ResponseSnapshot(200, body, None, 0.0)
+    candidate = ResponseSnapshot(200, None, None, 0.0, length=len(body), features=comparator.extract_features(body))
+
+    assert baseline.length == len(body)
+    assert comparator.extract_features(body)[:3] == (True, False, True)
+    assert comparator.equivalent(baseline, candidate)
+    assert not comparator.equivalent(baseline, ResponseSnapshot(200, b"id=42", None, 0.0))
+
+
+def _scan(comparator, baseline, body, content_length=None, max_bytes=None, chunk=8):
+    scanner = comparator.scanner(baseline, 200, content_length, max_bytes)
+    for offset in range(0, len(body), chunk):
+        if scanner.done:
+            break
+        scanner.feed(body[offset : offset + chunk])
+    if not scanner.done:
+        scanner.finish()
+    snapshot = ResponseSnapshot(200, None, None, 0.0, length=scanner.length, features=scanner.features)
+    return scanner, comparator.equivalent(baseline, snapshot)
+
+
+def test_incremental_scan_agrees_with_full_comparison():
+    baseline = ResponseSnapshot(200, b'{"token": "abc", "id": 7}', None, 0.0)
+    bodies = [baseline.body, b'{"error": "denied"}', b"x" * 30 + b"token" + b"id: 7", b"tok" + b"en"]
+    configs = [
+        ComparatorConfig(need_all=["token"]),
+        ComparatorConfig(need_any=["denied", "abc"], regex=[r"id\D+\d"]),
+        ComparatorConfig(length_check=True, need_all=["token"], logic="OR"),
+    ]
+    for config in configs:
+        comparator = ResponseComparator(config)
+        for body in bodies:
+            # 1 字节的分块保证每个标记都跨越块边界
+            _, equivalent = _scan(comparator, baseline, body, chunk=1)
+            assert equivalent == comparator.equivalent(baseline, ResponseSnapshot(200, body, None, 0.0)), (config, body)
+
+
+def test_scan_stops_once_the_verdict_is_known():
+    comparator = ResponseComparator(ComparatorConfig(need_all=["ok"]))
+    baseline = ResponseSnapshot(200, b"ok", None, 0.0)
+
+    scanner, equivalent = _scan(comparator, baseline, b"ok" + b"x" * 1000)
+
+    assert equivalent
+    assert scanner.length == 8
+
+
+def test_read_cap_below_baseline_length_does_not_fail_length_check():
+    comparator = ResponseComparator(ComparatorConfig(length_check=True, need_all=["tail"]))
+    body = b"x" * 100 + b"tail"
+    baseline = ResponseSnapshot(200, body, None, 0.0)
+
+    scanner, equivalent = _scan(comparator, baseline, body, max_bytes=16)
+
+    assert not scanner.truncated
+    assert equivalent
+
+
+def test_read_cap_still_stops_oversized_responses():
+    comparator = ResponseComparator(ComparatorConfig(length_check=True))
+    baseline = ResponseSnapshot(200, b"x" * 100, None, 0.0)
+
+    scanner, equivalent = _scan(comparator, baseline, b"x" * 10_000, max_bytes=16)
+
+    assert scanner.length < 200
+    assert not equivalent
+
+
+class _CountingBody(bytes):
+    scans = 0
+
+    def __contains__(self, token):
+        type(self).scans += 1
+        return super().__contains__(token)
+
+
+def test_body_is_not_scanned_once_a_cheap_check_decides():
+    comparator = ResponseComparator(ComparatorConfig(need_all=["ok"]))
+    baseline = ResponseSnapshot(200, b"ok", None, 0.0)
+    _CountingBody.scans = 0
+
+    assert not comparator.equivalent(baseline, ResponseSnapshot(500, _CountingBody(b"ok"), None, 0.0))
+    assert _CountingBody.scans == 0
+    assert comparator.equivalent(baseline, ResponseSnapshot(200, _CountingBody(b"ok"), None, 0.0))
+    assert _CountingBody.scans == 1
+
+
+def test_lazy_features_match_full_comparison():
+    comparator = ResponseComparator(ComparatorConfig(need_all=["a", "b"], need_any=["c", "d"], regex=[r"e+"]))
+    baseline = ResponseSnapshot(200, b"a b c eee", None, 0.0)
+    for body in (b"a b c eee", b"a c eee", b"a b eee", b"a b d e", b"b a d", b""):
+        full = ResponseSnapshot(200, body, None, 0.0)
+        features = comparator.extract_features(body, baseline, full)
+        compact = ResponseSnapshot(200, None, None, 0.0, length=len(body), features=features)
+        assert comparator.equivalent(baseline, compact) == comparator.equivalent(baseline, full), body
+
+
+def test_scans_do_not_reorder_shared_patterns():
+    comparator = ResponseComparator(ComparatorConfig(need_all=["a", "b", "c"], need_any=["x", "y"], regex=["p", "q"]))
+    baseline = ResponseSnapshot(200, b"a b c y p q", None, 0.0)
+    before = (list(comparator._need_all_tokens), list(comparator._need_any_tokens), list(comparator._regex))
+
+    for body in (b"a b y p", b"c y q", b"a b c y p q"):
+        comparator.equivalent(baseline, ResponseSnapshot(200, body, None, 0.0))
+
+    assert (comparator._need_all_tokens, comparator._need_any_tokens, comparator._regex) == before
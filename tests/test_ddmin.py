@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from har_minimizer.minimizer import ALGORITHMS, _ddmin, _ddmin_parallel
+
+
+def batch(test):
+    return lambda candidates: next((index for index, candidate in enumerate(candidates) if test(candidate)), None)
+
+
+def predicates():
+    rng = random.Random(7)
+    for size in (1, 2, 5, 9, 16, 33):
+        for _ in range(4):
+            required = set(rng.sample(range(size), rng.randint(0, min(size, 4))))
+            yield size, lambda active, required=required: required <= set(active)
+        # 非单调判定：任选一对元素中的一个即可
+        pair = set(rng.sample(range(size), min(size, 2)))
+        yield size, lambda active, pair=pair: bool(pair & set(active))
+
+
+@pytest.mark.parametrize("width", [None, 1, 3])
+def test_parallel_complements_match_serial_ddmin(width):
+    for size, test in predicates():
+        items = list(range(size))
+        serial = _ddmin(items, test, None)
+        parallel = _ddmin_parallel(items, batch(test), None, width=(lambda: width) if width else None)
+        assert parallel[0] == serial[0], size
+        if width == 1:
+            # 逐个发出时不会多发探测
+            assert parallel[1] == serial[1], size
+
+
+def test_parallel_with_subsets_is_one_minimal():
+    for size, test in predicates():
+        minimized, _ = _ddmin_parallel(list(range(size)), batch(test), None, include_subsets=True)
+        assert test(minimized)
+        assert all(not test([item for item in minimized if item != drop]) for drop in minimized)
+
+
+@pytest.mark.parametrize("name", ["ddmin", "probdd", "binary"])
+def test_algorithms_find_the_required_set_of_monotone_predicates(name):
+    rng = random.Random(11)
+    for size in (1, 4, 10, 25, 40):
+        for _ in range(5):
+            required = set(rng.sample(range(size), rng.randint(0, min(size, 5))))
+            calls = []
+
+            def test(active):
+                calls.append(active)
+                return required <= set(active)
+
+            minimized, tests = ALGORITHMS[name](list(range(size)), test, None)
+            assert sorted(minimized) == sorted(required), (size, required)
+            assert tests == len(calls)
+
+
+@pytest.mark.parametrize("name", ["ddmin", "probdd", "binary"])
+def test_algorithms_respect_max_tests(name):
+    minimized, tests = ALGORITHMS[name](list(range(30)), lambda active: {3, 17} <= set(active), 4)
+    assert tests <= 4
+    assert {3, 17} <= set(minimized)
@@ -0,0 +1,88 @@
+import json
+
+from har_minimizer.config import GroupingConfig
+from har_minimizer.grouping import TemplateGroups
+from har_minimizer.orchestrator import MinimizationOrchestrator
+
+from support import make_config, make_request
+
+
+def _member(index, item):
+    request = make_request(["a", "b"], url=f"http://api.test/v1/items/{item}")
+    request.index = index
+    return request
+
+
+def test_requests_differing_only_in_ids_share_a_template():
+    groups = TemplateGroups(GroupingConfig(enabled=True))
+    uuid = "3f2b8c1e-9a4d-4e2f-8b1a-0c9d8e7f6a5b"
+
+    assert groups.template_key(_member(0, 1), "raw") == groups.template_key(_member(1, uuid), "raw")
+    assert groups.template_key(_member(0, 1), "raw") != groups.template_key(_member(2, "profile"), "raw")
+
+
+def test_members_are_resumed_only_after_the_representative_publishes():
+    groups = TemplateGroups(GroupingConfig(enabled=True))
+    resumed = []
+    representative, member = _member(0, 1), _member(1, 2)
+
+    assert not groups.defer(representative, "raw", lambda: resumed.append(0))
+    assert groups.defer(member, "raw", lambda: resumed.append(1))
+    group, is_representative = groups.join(representative, "raw")
+    assert is_representative and resumed == []
+
+    group.publish(None)
+
+    assert resumed == [1]
+    assert not groups.defer(_member(2, 3), "raw", lambda: resumed.append(2))
+
+
+def test_representative_without_a_plan_hands_over_to_a_waiting_member():
+    groups = TemplateGroups(GroupingConfig(enabled=True))
+    resumed = []
+    representative, first, second = _member(0, 1), _member(1, 2), _member(2, 3)
+    groups.defer(representative, "raw", lambda: resumed.append(0))
+    groups.defer(first, "raw", lambda: resumed.append(1))
+    groups.defer(second, "raw", lambda: resumed.append(2))
+
+    # 例如基线失败：代表没有走到最小化
+    groups.release(representative, "raw")
+
+    assert resumed == [1]
+    assert groups.join(first, "raw")[1]
+
+
+def _entry(item):
+    return {
+        "request": {
+            "method": "GET",
+            "url": f"http://api.test/v1/items/{item}",
+            "httpVersion": "HTTP/1.1",
+            "headers": [{"name": name, "value": "v"} for name in ("a", "b", "c", "d")],
+            "queryString": [],
+        },
+        "response": {
+            "status": 200,
+            "headers": [],
+            "content": {"size": 11, "mimeType": "application/json", "text": '{"ok":true}'},
+        },
+    }
+
+
+def test_grouped_run_minimizes_each_template_once(tmp_path):
+    har = tmp_path / "input.har"
+    har.write_text(json.dumps({"log": {"entries": [_entry(item) for item in range(1, 7)]}}), encoding="utf-8")
+    rules = tmp_path / "rules.yaml"
+    rules.write_text(
+        'rules:\n  - url: "/v1/items"\n    required_headers: [a]\n    reject:\n      status: 403\n', encoding="utf-8"
+    )
+    config = make_config(input_har=str(har), report_path=str(tmp_path / "report.json"))
+    config.client.backend = "replay"
+    config.client.replay.rules_path = str(rules)
+    config.client.rate_limit.max_concurrent = 3
+    config.minimization.grouping.enabled = True
+
+    reports = MinimizationOrchestrator(config).run()
+
+    assert [report.algorithm for report in reports].count("template") == 5
+    assert all([header["name"] for header in report.minimized_headers] == ["a"] for report in reports)
@@ -0,0 +1,54 @@
+import io
+import json
+
+from har_minimizer.har_loader import HarLoader, _JsonStream, iter_har_events
+
+HAR = {
+    "version": "1.2",
+    "log": {
+        "creator": {"name": "test"},
+        "entries": [
+            {
+                "request": {"method": "POST", "url": f"http://api.test/v1/items?page={index}", "headers": []},
+                "response": {"status": 200, "content": {"text": "x" * 50, "size": 1.5e3}},
+            }
+            for index in range(5)
+        ],
+        "pages": [],
+    },
+    "extra": -12.25,
+}
+
+
+def test_streamed_events_match_the_parsed_document():
+    # 极小的分块迫使每个值都跨越缓冲区边界
+    stream = _JsonStream(io.StringIO(json.dumps(HAR)), chunk_size=3)
+    events = []
+    for top_key in stream.members():
+        if top_key != "log":
+            events.append(("top", top_key, stream.value()))
+            continue
+        for log_key in stream.members():
+            if log_key != "entries":
+                events.append(("log", log_key, stream.value()))
+                continue
+            for index, _ in enumerate(stream.items()):
+                events.append(("entry", index, stream.value()))
+
+    streamed = list(iter_har_events(io.StringIO(json.dumps(HAR))))
+    assert [event for event in streamed if event[0] not in ("begin", "end")] == events
+    assert [value for kind, _, value in events if kind == "entry"] == HAR["log"]["entries"]
+    assert ("top", "extra", -12.25) in events
+    assert ("log", "pages", []) in events
+
+
+def test_iter_entries_drops_response_text(tmp_path):
+    path = tmp_path / "in.har"
+    path.write_text(json.dumps(HAR), encoding="utf-8")
+
+    entries = list(HarLoader(str(path)).iter_entries())
+
+    assert [entry.request.query for entry in entries] == [{"page": str(index)} for index in range(5)]
+    assert "text" not in entries[0].request.raw_entry["response"]["content"]
+    kept = next(HarLoader(str(path), keep_response_body=True).iter_entries())
+    assert kept.request.raw_entry["response"]["content"]["text"] == "x" * 50
@@ -0,0 +1,69 @@
+import json
+
+from har_minimizer.json_tree import parse_path
+from har_minimizer.minimizer import RequestMinimizer
+from har_minimizer.models import RequestData
+
+from support import OracleTransport, make_client, make_config
+
+BODY = {
+    "query": "q",
+    "variables": {"input": {"id": 1, "extra": "x", "tags": [1, 2, 3]}, "debug": True},
+    "meta": {"trace": "t", "client": "web"},
+}
+
+
+def _request():
+    return RequestData(
+        index=0,
+        method="POST",
+        url="http://api.test/graphql",
+        path="/graphql",
+        query={},
+        headers=[],
+        body_text=json.dumps(BODY),
+        mime_type="application/json",
+        raw_entry={},
+    )
+
+
+def _oracle(method, url, headers, body):
+    data = json.loads(body or "{}")
+    ok = data.get("query") == "q" and (data.get("variables") or {}).get("input", {}).get("id") == 1
+    return (200, b'{"ok":true}') if ok else (400, b"{}")
+
+
+def _minimize(**body_options):
+    config = make_config()
+    config.minimization.order = ["body"]
+    config.minimization.body.hierarchical = True
+    for name, value in body_options.items():
+        setattr(config.minimization.body, name, value)
+    client, comparator = make_client(config, OracleTransport(_oracle))
+    _, result = RequestMinimizer(config, client, comparator).minimize(_request())
+    return result
+
+
+def test_nested_members_are_removed_level_by_level():
+    result = _minimize()
+
+    assert result.matched
+    assert json.loads(result.body_text) == {"query": "q", "variables": {"input": {"id": 1}}}
+
+
+def test_protected_paths_keep_their_subtree_and_ancestors():
+    result = _minimize(protected_keys=["$.meta.trace"])
+
+    assert json.loads(result.body_text) == {"query": "q", "variables": {"input": {"id": 1}}, "meta": {"trace": "t"}}
+
+
+def test_max_depth_stops_expanding_deeper_levels():
+    result = _minimize(max_depth=1)
+
+    assert json.loads(result.body_text) == {"query": "q", "variables": BODY["variables"]}
+
+
+def test_parse_path_accepts_dotted_bracketed_and_quoted_forms():
+    assert parse_path("$.a.b[0].c") == ("a", "b", "0", "c")
+    assert parse_path("items[*].id") == ("items", "*", "id")
+    assert parse_path("$['x.y']") == ("x.y",)
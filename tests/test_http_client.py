@@ -0,0 +1,110 @@
+import json
+from dataclasses import replace
+
+from har_minimizer.comparator import ResponseComparator
+from har_minimizer.config import CacheConfig, ClientConfig, ComparatorConfig
+from har_minimizer.http_client import HttpClient
+from har_minimizer.minimizer import RequestMinimizer
+from har_minimizer.models import ResponseSnapshot
+from har_minimizer.probe_cache import ProbeCache, probe_key
+
+from support import OracleServer, OracleTransport, header_names, make_client, make_config, make_request, require_headers
+
+
+def test_identical_probes_are_answered_from_cache():
+    with OracleServer(require_headers("a")) as server:
+        client = HttpClient(ClientConfig())
+        request = make_request(["a"], url=server.url)
+
+        first = client.send(request, {"a": "v"}, None)
+        # 头部顺序与大小写不影响缓存键
+        second = client.send(request, {"A": "v"}, None)
+        client.close()
+
+    assert len(server.sent) == 1
+    assert second.status_code == first.status_code == 200
+    assert client.totals.cache_hits == 1
+    assert client.pop_stats(request.index).cache_misses == 1
+
+
+def test_cache_evicts_least_recently_used_and_skips_failures():
+    cache = ProbeCache(2)
+    ok = ResponseSnapshot(status_code=200, body=b"{}", error=None, elapsed=0.0)
+    keys = [probe_key("GET", "http://api.test/", {"h": str(index)}, None) for index in range(3)]
+
+    cache.put(keys[0], ok)
+    cache.put(keys[1], ok)
+    cache.get(keys[0])
+    cache.put(keys[2], ok)
+    cache.put("failed", ResponseSnapshot(status_code=None, body=None, error="timeout", elapsed=0.0))
+
+    assert cache.get(keys[0]) is ok
+    assert cache.get(keys[1]) is None
+    assert cache.get("failed") is None
+
+
+def test_probes_are_compacted_after_feature_extraction():
+    comparator = ResponseComparator(ComparatorConfig(length_check=True, need_all=["ok"], regex=[r"true"]))
+    with OracleServer(require_headers("a")) as server:
+        client = HttpClient(ClientConfig(cache=CacheConfig(enabled=False)), comparator=comparator)
+        request = make_request(["a"], url=server.url)
+        baseline = client.send(request, {"a": "v"}, None, keep_body=True)
+        probe = client.send(request, {"a": "v"}, None)
+        denied = client.send(request, {}, None)
+        client.close()
+
+    assert baseline.body == b'{"ok":true}'
+    assert probe.body is None
+    assert (probe.length, probe.digest) == (baseline.length, baseline.digest)
+    assert comparator.equivalent(baseline, probe)
+    assert not comparator.equivalent(baseline, denied)
+
+
+def test_keep_body_does_not_return_compact_cached_snapshot():
+    transport = OracleTransport(require_headers("a"))
+    client, _ = make_client(make_config(), transport)
+    request = make_request(["a"])
+
+    probe = client.send(request, {"a": "v"}, None)
+    full = client.send(request, {"a": "v"}, None, keep_body=True)
+
+    assert probe.body is None
+    assert full.body == b'{"ok":true}'
+    assert len(transport.sent) == 2
+    # 保留正文的响应随后也可以直接满足紧凑探测
+    assert client.send(request, {"a": "v"}, None).status_code == 200
+    assert len(transport.sent) == 2
+
+
+def test_final_check_reuses_the_probe_verified_during_minimization():
+    config = make_config()
+    transport = OracleTransport(require_headers("a"))
+    client, comparator = make_client(config, transport)
+
+    _, result = RequestMinimizer(config, client, comparator).minimize(make_request(["a", "b", "c", "d"]))
+
+    assert header_names(result.headers) == ["a"]
+    sent = [sorted(headers) for _, headers, _ in transport.sent]
+    assert sent.count(["a"]) == 1
+    assert client.totals.cache_hits >= 1
+
+
+def test_blank_value_recheck_is_not_sent_twice():
+    config = make_config()
+    config.minimization.order = ["body"]
+    config.minimization.body.try_blank_values = True
+
+    def oracle(method, url, headers, body):
+        return (200, b'{"ok":true}') if json.loads(body or "{}").get("k") == "1" else (400, b"{}")
+
+    transport = OracleTransport(oracle)
+    client, comparator = make_client(config, transport)
+    request = replace(
+        make_request([]), method="POST", body_text='{"k": "1", "x": "2", "y": "3"}', mime_type="application/json"
+    )
+
+    _, result = RequestMinimizer(config, client, comparator).minimize(request)
+
+    assert json.loads(result.body_text) == {"k": "1"}
+    bodies = [body for _, _, body in transport.sent]
+    assert len(bodies) == len(set(bodies))
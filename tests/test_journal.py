@@ -0,0 +1,42 @@
+from har_minimizer.config import CacheConfig, ClientConfig
+from har_minimizer.http_client import HttpClient
+from har_minimizer.journal import ProbeJournal
+
+from support import OracleServer, make_request, require_headers
+
+
+def _client(journal):
+    return HttpClient(ClientConfig(cache=CacheConfig(enabled=False)), journal=journal)
+
+
+def test_resume_replays_recorded_probes(tmp_path):
+    path = tmp_path / "run.jsonl"
+    with OracleServer(require_headers("a")) as server:
+        request = make_request(["a"], url=server.url)
+        journal = ProbeJournal(str(path))
+        client = _client(journal)
+        client.send(request, {"a": "v"}, None)
+        client.close()
+        journal.close()
+
+        resumed = ProbeJournal(str(path), resume=True)
+        client = _client(resumed)
+        replayed = client.send(request, {"a": "v"}, None)
+        client.close()
+        resumed.close()
+
+    assert len(server.sent) == 1
+    assert replayed.status_code == 200
+    assert client.totals.journal_hits == 1
+
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    path = tmp_path / "run.jsonl"
+    path.write_text('{"type": "probe", "key": "k", "response": {"status_code": 200}}\n{"type": "pro', encoding="utf-8")
+
+    journal = ProbeJournal(str(path), resume=True)
+    journal.record_probe("k2", journal.replay("k"))
+    journal.close()
+
+    assert journal.replay("k").status_code == 200
+    assert path.read_text(encoding="utf-8").splitlines()[-1].startswith('{"type": "probe", "key": "k2"')
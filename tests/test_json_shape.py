@@ -0,0 +1,53 @@
+import json
+
+from har_minimizer.comparator import ResponseComparator
+from har_minimizer.config import ComparatorConfig
+from har_minimizer.models import ResponseSnapshot
+
+BASELINE = {"id": 17, "created": "2024-01-01T00:00:00Z", "items": [{"sku": "a", "qty": 1}, {"sku": "b", "qty": 2}], "next": None}
+
+
+def _snapshot(data):
+    body = data if isinstance(data, bytes) else json.dumps(data).encode("utf-8")
+    return ResponseSnapshot(200, body, None, 0.0)
+
+
+def _variant(**changes):
+    data = json.loads(json.dumps(BASELINE))
+    data.update(changes)
+    return data
+
+
+def test_structure_ignores_values_but_not_keys_types_or_cardinality():
+    comparator = ResponseComparator(ComparatorConfig(json_structure=True))
+    baseline = _snapshot(BASELINE)
+
+    assert comparator.equivalent(baseline, _snapshot(_variant(id=99, created="2025-06-30T12:00:00Z")))
+    assert not comparator.equivalent(baseline, _snapshot({key: value for key, value in BASELINE.items() if key != "next"}))
+    assert not comparator.equivalent(baseline, _snapshot(_variant(id="17")))
+    assert not comparator.equivalent(baseline, _snapshot(_variant(items=BASELINE["items"][:1])))
+    assert not comparator.equivalent(baseline, _snapshot(b"<html>error</html>"))
+
+
+def test_non_json_baseline_leaves_the_other_checks_in_charge():
+    comparator = ResponseComparator(ComparatorConfig(json_structure=True, need_all=["ok"]))
+    baseline = _snapshot(b"plain ok")
+
+    assert comparator.equivalent(baseline, _snapshot(b"still ok"))
+    assert not comparator.equivalent(baseline, _snapshot(b"denied"))
+
+
+def test_streamed_scan_stops_at_the_first_structural_difference():
+    comparator = ResponseComparator(ComparatorConfig(status_code=False, json_structure=True))
+    baseline = _snapshot(BASELINE)
+    body = json.dumps({"error": "denied", "pad": "x" * 100000}).encode("utf-8")
+    scanner = comparator.scanner(baseline, 200, None)
+
+    for offset in range(0, len(body), 64):
+        scanner.feed(body[offset : offset + 64])
+        if scanner.done:
+            break
+
+    assert scanner.done
+    assert scanner.length < 1000
+    assert scanner.features[3] is False
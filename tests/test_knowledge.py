@@ -0,0 +1,75 @@
+from har_minimizer.knowledge import IRRELEVANT, REQUIRED, KnowledgeBase
+from har_minimizer.minimizer import RequestMinimizer
+
+from support import OracleTransport, header_names, make_client, make_config, make_request, require_headers
+
+
+def _seed(path, verdicts):
+    knowledge = KnowledgeBase(str(path))
+    knowledge.record(
+        "api.test/v1",
+        "headers",
+        removed=[name for name, verdict in verdicts.items() if verdict == IRRELEVANT],
+        kept=[name for name, verdict in verdicts.items() if verdict == REQUIRED],
+    )
+    return knowledge
+
+
+def _run(knowledge, oracle, headers):
+    config = make_config()
+    transport = OracleTransport(oracle)
+    client, comparator = make_client(config, transport)
+    _, result = RequestMinimizer(config, client, comparator, knowledge=knowledge).minimize(make_request(headers))
+    return result, transport
+
+
+def test_second_run_reuses_saved_verdicts(tmp_path):
+    path = tmp_path / "kb.json"
+    headers = ["a"] + [f"x{index}" for index in range(8)]
+    knowledge = KnowledgeBase(str(path))
+    first, cold = _run(knowledge, require_headers("a"), headers)
+    knowledge.save()
+
+    second, warm = _run(KnowledgeBase(str(path)), require_headers("a"), headers)
+
+    assert header_names(first.headers) == header_names(second.headers) == ["a"]
+    assert len(warm.sent) < len(cold.sent)
+    assert KnowledgeBase(str(path)).verdicts("api.test/v1", "headers")["x0"] == IRRELEVANT
+
+
+def test_stale_irrelevant_verdict_is_invalidated(tmp_path):
+    knowledge = _seed(tmp_path / "kb.json", {"b": IRRELEVANT, "c": IRRELEVANT})
+
+    result, _ = _run(knowledge, require_headers("a", "b"), ["a", "b", "c", "d"])
+
+    assert header_names(result.headers) == ["a", "b"]
+    assert knowledge.verdicts("api.test/v1", "headers").get("b") == REQUIRED
+
+
+def test_conflicting_verdicts_are_dropped(tmp_path):
+    knowledge = _seed(tmp_path / "kb.json", {"a": REQUIRED, "b": IRRELEVANT})
+    knowledge.record("api.test/v1", "headers", removed=["a"], kept=["b"])
+
+    assert knowledge.verdicts("api.test/v1", "headers") == {}
+    assert knowledge.scope_for("https://API.test/v1/items/7?q=1") == "api.test/v1"
+
+
+def test_stale_required_verdict_is_retested_and_dropped(tmp_path):
+    knowledge = _seed(tmp_path / "kb.json", {"a": REQUIRED, "b": REQUIRED})
+
+    result, _ = _run(knowledge, require_headers("a"), ["a", "b", "c", "d"])
+
+    assert header_names(result.headers) == ["a"]
+    verdicts = knowledge.verdicts("api.test/v1", "headers")
+    assert verdicts.get("a") == REQUIRED
+    assert verdicts.get("b") != REQUIRED
+
+
+def test_known_verdicts_save_probes_when_still_valid(tmp_path):
+    knowledge = _seed(tmp_path / "kb.json", {"a": REQUIRED, "b": IRRELEVANT, "c": IRRELEVANT, "d": IRRELEVANT})
+
+    result, transport = _run(knowledge, require_headers("a"), ["a", "b", "c", "d"])
+
+    assert header_names(result.headers) == ["a"]
+    # 基线、整体删除已知无关项、复核已知必需项；最终校验复用整体删除时的结论
+    assert len(transport.sent) == 3
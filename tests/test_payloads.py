@@ -0,0 +1,36 @@
+import json
+import random
+from urllib.parse import urlencode
+
+import pytest
+
+from har_minimizer.minimizer import _headers_list_to_dict
+from har_minimizer.payloads import BodyFragments, HeaderFragments
+
+DATA = {"id": 7, "name": "中文 & spaces", "nested": {"a": [1, None, True]}, "ratio": 0.5, "quote": 'say "hi"'}
+
+
+@pytest.mark.parametrize("kind", ["json", "form"])
+def test_joined_fragments_match_encoding_the_merged_dict(kind):
+    data = DATA if kind == "json" else {key: str(value) for key, value in DATA.items()}
+    fragments = BodyFragments(kind, data)
+    rng = random.Random(5)
+    for _ in range(20):
+        kept = [key for key in data if rng.random() < 0.5]
+        blanked = [key for key in data if key not in kept]
+        merged = {key: data[key] for key in kept}
+        merged.update({key: "" for key in blanked})
+        expected = json.dumps(merged, separators=(",", ":")) if kind == "json" else urlencode(merged)
+
+        actual = fragments.join([fragments.fragment(key) for key in kept] + [fragments.blank(key) for key in blanked])
+
+        assert actual == expected
+
+
+def test_header_fragments_match_the_list_conversion():
+    fixed = [{"name": "Host", "value": "api.test"}, {"name": "", "value": "ignored"}]
+    candidates = [{"name": "a", "value": "1"}, {"name": "Host", "value": "override"}, {"name": "b", "value": "2"}]
+    builder = HeaderFragments(fixed, candidates)
+
+    for active in (candidates, candidates[::2], candidates[1:], []):
+        assert builder.build(active) == _headers_list_to_dict(fixed + list(active))
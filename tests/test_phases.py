@@ -0,0 +1,81 @@
+from urllib.parse import parse_qs, urlsplit
+
+from har_minimizer.minimizer import RequestMinimizer
+from har_minimizer.query_string import QueryString, filter_query_string
+
+from support import OracleTransport, header_names, make_client, make_config, make_request, require_headers
+
+URL = "http://api.test/v1/items?utm_source=x&need=1&_=123&debug=0#top"
+
+
+def require_query(oracle, name, value):
+    def wrapped(method, url, headers, body):
+        if parse_qs(urlsplit(url).query).get(name) != [value]:
+            return 400, b'{"error":"bad query"}'
+        return oracle(method, url, headers, body)
+
+    return wrapped
+
+
+def test_query_string_keeps_raw_encoding():
+    query = QueryString("http://h/p?a=%20x&&b=1+2#f")
+
+    assert [param.name for param in query.params] == ["a", "b"]
+    assert query.build(query.params[1:]) == "http://h/p?b=1+2#f"
+    assert query.without(["a", "b"]) == "http://h/p#f"
+
+
+def test_filter_query_string_drops_removed_parameters():
+    items = [{"name": "a", "value": " x"}, {"name": "b", "value": "1 2"}]
+
+    assert filter_query_string(items, "http://h/p?a=%20x&b=1+2", "http://h/p?b=1+2") == items[1:]
+
+
+def test_query_phase_keeps_only_required_parameters():
+    config = make_config()
+    config.minimization.order = ["query", "headers", "body"]
+    transport = OracleTransport(require_query(require_headers("a"), "need", "1"))
+    client, comparator = make_client(config, transport)
+
+    _, result = RequestMinimizer(config, client, comparator).minimize(make_request(["a", "b", "c"], url=URL))
+
+    assert result.matched
+    assert result.url == "http://api.test/v1/items?need=1#top"
+    assert header_names(result.headers) == ["a"]
+    assert list(result.tests)[:2] == ["query", "headers"]
+
+
+def test_headers_phase_still_runs_before_body():
+    config = make_config()
+    config.minimization.order = ["body", "headers"]
+    client, comparator = make_client(config, OracleTransport(require_headers("a")))
+
+    _, result = RequestMinimizer(config, client, comparator).minimize(make_request(["a", "b"]))
+
+    assert list(result.tests)[:1] == ["headers"]
+
+
+def test_failed_final_check_falls_back_to_last_phase_state():
+    config = make_config()
+    config.minimization.order = ["query", "headers"]
+    # 关闭缓存，最终校验才会真正重新发送
+    config.client.cache.enabled = False
+    seen = set()
+    oracle = require_query(require_headers("a"), "need", "1")
+
+    def flaky(method, url, headers, body):
+        # 同一探测第二次发出（即最终校验）时失败
+        key = (url, tuple(sorted(headers)))
+        if key in seen:
+            return 500, b"{}"
+        seen.add(key)
+        return oracle(method, url, headers, body)
+
+    client, comparator = make_client(config, OracleTransport(flaky))
+
+    _, result = RequestMinimizer(config, client, comparator).minimize(make_request(["a", "b"], url=URL))
+
+    assert result.matched
+    assert header_names(result.headers) == ["a"]
+    assert result.url == "http://api.test/v1/items?need=1#top"
+    assert result.response.status_code == 200
@@ -0,0 +1,29 @@
+import time
+
+from har_minimizer.config import AdaptiveRateConfig
+from har_minimizer.http_client import HostLimiter
+from har_minimizer.models import ResponseSnapshot
+
+
+def test_sporadic_errors_within_a_cooldown_window_decrease_the_rate_once(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+    limiter = HostLimiter(8.0, None, AdaptiveRateConfig(enabled=True, max_rps=8.0))
+    # 间隔超过发送间隔但仍在 1 秒冷却窗口内
+    for _ in range(4):
+        assert limiter.observe(ResponseSnapshot(503, None, None, 0.01))
+        clock[0] += 0.3
+
+    assert limiter.rate == 4.0
+
+    # 持续限流时下一个窗口再降速一次
+    assert limiter.observe(ResponseSnapshot(503, None, None, 0.01))
+    assert limiter.rate == 2.0
+
+
+def test_successful_responses_raise_the_rate():
+    limiter = HostLimiter(2.0, None, AdaptiveRateConfig(enabled=True, max_rps=8.0))
+    for _ in range(4):
+        assert not limiter.observe(ResponseSnapshot(200, None, None, 0.01))
+
+    assert 2.0 < limiter.rate <= 8.0
@@ -0,0 +1,69 @@
+import json
+
+from har_minimizer.replay import ReplayTransport
+
+from support import OracleTransport, make_client, make_config, make_request, require_headers
+
+RULES = """
+default_response:
+  status: 404
+  body: "missing"
+rules:
+  - url: "/v1/orders"
+    method: POST
+    required_headers: [authorization]
+    required_body_keys: [items.0.sku]
+    reject:
+      status: 401
+      body: {"error": "unauthorized"}
+  - url: "/v1/profile"
+    required_query: [lang]
+    response:
+      status: 200
+      body: {"ok": true}
+"""
+
+
+def _har(tmp_path):
+    entry = {
+        "request": {"method": "POST", "url": "http://api.test/v1/orders?page=1", "headers": []},
+        "response": {"status": 201, "headers": [{"name": "Content-Length", "value": "1"}], "content": {"text": "created"}},
+    }
+    path = tmp_path / "in.har"
+    path.write_text(json.dumps({"log": {"entries": [entry]}}), encoding="utf-8")
+    rules = tmp_path / "rules.yaml"
+    rules.write_text(RULES, encoding="utf-8")
+    return ReplayTransport(str(path), str(rules))
+
+
+def test_replay_answers_from_rules_and_recorded_responses(tmp_path):
+    transport = _har(tmp_path)
+    order = '{"items": [{"sku": "a1"}]}'
+
+    accepted = transport.send("POST", "http://api.test/v1/orders?page=2", {"Authorization": "t"}, order)
+    no_auth = transport.send("POST", "http://api.test/v1/orders?page=1", {}, order)
+    blank_sku = transport.send("POST", "http://api.test/v1/orders?page=1", {"Authorization": "t"}, '{"items": [{"sku": ""}]}')
+    profile = transport.send("GET", "http://api.test/v1/profile?lang=zh", {}, None)
+    no_lang = transport.send("GET", "http://api.test/v1/profile", {}, None)
+    unknown = transport.send("GET", "http://api.test/v1/other", {}, None)
+
+    # 查询串不同时按不含查询串的 URL 找到录制响应
+    assert (accepted.status_code, accepted.body) == (201, b"created")
+    assert accepted.headers["Content-Length"] == "7"
+    assert (no_auth.status_code, no_auth.body) == (401, b'{"error": "unauthorized"}')
+    assert blank_sku.status_code == 401
+    assert (profile.status_code, profile.body) == (200, b'{"ok": true}')
+    assert no_lang.status_code == 403
+    assert (unknown.status_code, unknown.body) == (404, b"missing")
+
+
+def test_client_sends_through_a_custom_transport():
+    transport = OracleTransport(require_headers("a"))
+    client, comparator = make_client(make_config(), transport)
+
+    baseline = client.send(make_request(["a"]), {"a": "v"}, None, keep_body=True)
+    probe = client.send(make_request(["a"]), {}, None)
+
+    assert baseline.body == b'{"ok":true}'
+    assert not comparator.equivalent(baseline, probe)
+    assert [headers for _, headers, _ in transport.sent] == [{"a": "v"}, {}]
@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from har_minimizer.har_loader import HarLoader, build_request
+from har_minimizer.models import MinimizationResult, ProcessedRequest, ReportEntry, ResponseSnapshot
+from har_minimizer.reporting import (
+    HarExporter,
+    JsonlReportWriter,
+    ReportWriter,
+    StreamingHarExporter,
+    convert_jsonl_report,
+)
+
+
+def _har():
+    entries = [
+        {
+            "request": {
+                "method": "POST",
+                "url": "http://api.test/v1/items",
+                "headers": [{"name": "a", "value": "1"}, {"name": "b", "value": "2"}],
+                "postData": {"mimeType": "application/json", "text": '{"k": "中"}'},
+            },
+            "response": {"status": 200, "content": {"text": "line\nbreak"}},
+        }
+        for _ in range(3)
+    ]
+    return {"log": {"version": "1.2", "entries": entries, "pages": []}, "extra": {"nested": [1, {}]}}
+
+
+def _processed(index, entry):
+    result = MinimizationResult(
+        headers=[{"name": "a", "value": "1"}],
+        body_text='{"k": "中"}',
+        response=None,
+        matched=True,
+        header_candidates=2,
+        body_candidates=1,
+        minimized_headers=1,
+        minimized_body_fields=0,
+    )
+    baseline = ResponseSnapshot(status_code=200, body=None, error=None, elapsed=0.0)
+    return ProcessedRequest(request=build_request(index, entry), baseline=baseline, result=result)
+
+
+@pytest.mark.parametrize("deduplicate", [False, True])
+def test_streaming_export_matches_in_memory_export(tmp_path, deduplicate):
+    har = _har()
+    source = tmp_path / "in.har"
+    source.write_text(json.dumps(har), encoding="utf-8")
+    processed = [_processed(0, json.loads(json.dumps(har["log"]["entries"][0])))]
+
+    exporter = HarExporter(har)
+    exporter.apply(processed, deduplicate_identical=deduplicate)
+    exporter.write(str(tmp_path / "memory.har"))
+    StreamingHarExporter(HarLoader(str(source))).write(
+        str(tmp_path / "stream.har"), processed, deduplicate_identical=deduplicate
+    )
+
+    expected = (tmp_path / "memory.har").read_text(encoding="utf-8")
+    assert (tmp_path / "stream.har").read_text(encoding="utf-8") == expected
+    assert len(json.loads(expected)["log"]["entries"]) == (1 if deduplicate else 3)
+
+
+def _report(index):
+    return ReportEntry(
+        index=index,
+        method="GET",
+        url=f"http://api.test/v1/items/{index}",
+        path=f"/v1/items/{index}",
+        query={},
+        baseline_status=200,
+        baseline_length=10,
+        final_status=200,
+        final_length=10,
+        matched=True,
+        header_counts={"original": 2, "final": 1},
+        body_counts={"original": 0, "final": 0},
+        minimized_headers=[{"name": "a", "value": "中"}],
+        minimized_body=None,
+    )
+
+
+def test_jsonl_report_converts_to_the_sorted_json_report(tmp_path):
+    stream = JsonlReportWriter(str(tmp_path / "report.jsonl"))
+    for written, index in enumerate((2, 0, 1), start=1):
+        stream.append(_report(index))
+        # 每条写完即可从磁盘读到
+        assert len((tmp_path / "report.jsonl").read_text(encoding="utf-8").splitlines()) == written
+    stream.close()
+
+    assert convert_jsonl_report(str(tmp_path / "report.jsonl"), str(tmp_path / "report.json")) == 3
+    ReportWriter(str(tmp_path / "expected.json")).write(_report(index) for index in range(3))
+    assert (tmp_path / "report.json").read_text(encoding="utf-8") == (tmp_path / "expected.json").read_text(encoding="utf-8")
@@ -0,0 +1,33 @@
+from har_minimizer.har_loader import HarEntry
+from har_minimizer.scheduling import EntryQueue, LatencyTracker, WorkerSlots
+
+from support import make_config, make_request
+
+
+def _entry(index, headers, host="api.test"):
+    request = make_request([f"h{j}" for j in range(headers)], url=f"http://{host}/v1/items")
+    request.index = index
+    return HarEntry(index=index, request=request)
+
+
+def test_queue_pops_the_longest_expected_entry_first():
+    latency = LatencyTracker(default=0.1)
+    queue = EntryQueue(make_config(), latency)
+    for entry in (_entry(0, 2), _entry(1, 30), _entry(2, 8), _entry(3, 8, host="slow.test")):
+        queue.push(entry)
+    latency.observe("http://slow.test/", 5.0)
+    latency.observe("http://api.test/", 0.1)
+
+    assert [queue.pop().index for _ in range(len(queue))] == [3, 1, 2, 0]
+
+
+def test_idle_slots_are_lent_only_after_the_queue_drains():
+    slots = WorkerSlots(8)
+    slots.start()
+    slots.start()
+    assert slots.width() == 1
+
+    slots.drain()
+    assert slots.width() == 4
+    slots.finish()
+    assert slots.width() == 8
@@ -0,0 +1,120 @@
+import importlib.util
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from har_minimizer.comparator import ResponseComparator
+from har_minimizer.config import CacheConfig, ClientConfig, ComparatorConfig, load_config
+from har_minimizer.http_client import HttpClient, _AsyncioBackend
+
+from support import OracleServer, make_request, require_headers
+
+
+def _backends():
+    # 未安装 aiohttp 时只测试 requests 后端
+    return ["requests", "asyncio"] if importlib.util.find_spec("aiohttp") else ["requests"]
+
+
+@pytest.mark.parametrize("backend", _backends())
+def test_backends_return_the_same_snapshot(backend):
+    with OracleServer(require_headers("a")) as server:
+        client = HttpClient(ClientConfig(backend=backend, keep_response_bodies=True))
+        try:
+            allowed = client.send(make_request([], url=server.url), {"a": "v"}, None)
+            denied = client.send(make_request([], url=server.url), {}, None)
+        finally:
+            client.close()
+
+    assert (allowed.status_code, allowed.body) == (200, b'{"ok":true}')
+    assert (denied.status_code, denied.body) == (403, b'{"error":"denied"}')
+
+
+@pytest.mark.parametrize("backend", _backends())
+def test_send_many_keeps_probe_order(backend):
+    def echo(method, url, headers, body):
+        return 200, headers.get("X-Probe", "").encode("utf-8")
+
+    with OracleServer(echo) as server:
+        client = HttpClient(ClientConfig(backend=backend, pool_size=4, keep_response_bodies=True))
+        try:
+            probes = [({"X-Probe": str(index)}, None) for index in range(20)]
+            responses = client.send_many(make_request([], url=server.url), probes)
+        finally:
+            client.close()
+
+    assert [response.body for response in responses] == [str(index).encode("utf-8") for index in range(20)]
+
+
+@pytest.mark.parametrize("backend", _backends())
+def test_streamed_probes_match_buffered_probes(backend):
+    comparator = ResponseComparator(ComparatorConfig(length_check=True, need_all=["ok"]))
+    ok = b'{"ok":true,"pad":"' + b"x" * 200000 + b'"}'
+    config = ClientConfig(backend=backend, cache=CacheConfig(enabled=False), stream_probes=True)
+    with OracleServer(require_headers("a", ok=ok)) as server:
+        client = HttpClient(config, comparator=comparator)
+        try:
+            request = make_request([], url=server.url)
+            baseline = client.send(request, {"a": "v"}, None, keep_body=True)
+            streamed = [client.send(request, headers, None, reference=baseline) for headers in ({"a": "v"}, {})]
+        finally:
+            client.close()
+
+    assert [comparator.equivalent(baseline, probe) for probe in streamed] == [True, False]
+    assert streamed[0].length == len(ok)
+
+
+def test_unknown_backend_is_rejected(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("input_har: in.har\nclient:\n  backend: curl\n", encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        load_config(str(path))
+
+
+class _Proxy(BaseHTTPRequestHandler):
+    """记录请求行中的绝对 URL，证明请求经过了代理。"""
+
+    seen = []
+
+    def do_GET(self):
+        self.seen.append(self.path)
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, format, *args):  # noqa: A002 - 保持基类签名
+        return
+
+
+def test_asyncio_backend_honors_environment_proxy(monkeypatch):
+    pytest.importorskip("aiohttp")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Proxy)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    for name in ("NO_PROXY", "no_proxy"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("HTTP_PROXY", f"http://127.0.0.1:{server.server_address[1]}")
+    backend = _AsyncioBackend(ClientConfig(backend="asyncio"))
+    try:
+        snapshot = backend.send("GET", "http://upstream.invalid/v1/items", {}, None)
+    finally:
+        backend.close()
+        server.shutdown()
+
+    assert snapshot.status_code == 200
+    assert _Proxy.seen == ["http://upstream.invalid/v1/items"]
+
+
+def test_asyncio_backend_uses_ca_bundle_like_requests(monkeypatch):
+    pytest.importorskip("aiohttp")
+    certifi = pytest.importorskip("certifi")
+    monkeypatch.setenv("REQUESTS_CA_BUNDLE", certifi.where())
+    backend = _AsyncioBackend(ClientConfig(backend="asyncio"))
+    unverified = _AsyncioBackend(ClientConfig(backend="asyncio", verify_tls=False))
+    try:
+        assert backend._ssl_context().verify_mode.name == "CERT_REQUIRED"
+        assert unverified._ssl_context() is False
+    finally:
+        backend.close()
+        unverified.close()